@@ -1,7 +1,60 @@
 # Pose Estimation Configuration
 FEATURES_PER_HAND = 21
 
-# Name of the model
-MODEL_NAME = "nhom_2.pkl"
+# Name of the model (.aslm: định dạng memory-map, không cần sklearn; .pkl vẫn được hỗ trợ)
+MODEL_NAME = "nhom_2.aslm"
 MODEL_CONFIDENCE = 0.5
-PREDICTION_CONFIDENCE_THRESHOLD=0.5
\ No newline at end of file
+PREDICTION_CONFIDENCE_THRESHOLD=0.5
+
+# Lập lịch detector (Hz): chạy không quá MAX_HZ, và vẫn làm mới ít nhất MIN_HZ khi cảnh đứng yên
+FACE_DETECTOR_MAX_HZ = 10.0
+FACE_DETECTOR_MIN_HZ = 1.0
+HANDS_DETECTOR_MAX_HZ = 30.0
+HANDS_DETECTOR_MIN_HZ = 5.0
+# Ngưỡng chuyển động (trung bình |hiệu| ảnh xám thu nhỏ, thang 0-255)
+MOTION_THRESHOLD = 3.0
+
+# Nguồn tâm khuôn mặt: "facemesh" (giống dữ liệu huấn luyện), "facemesh_lite" hoặc "detection"
+FACE_BACKEND = "facemesh"
+# Độ lệch (theo kích thước box) cộng vào tâm của backend "detection",
+# lấy từ kết quả của scripts/benchmark_face_backend.py
+FACE_CENTER_OFFSET = (0.0, 0.0)
+
+# Mức chi tiết khi vẽ landmarks: "none", "hands", "contours" (viền khuôn mặt) hoặc "full" (toàn bộ lưới)
+# (danh sách mức nằm ở đây thay vì utils/visualizer.py để giao diện không phải import OpenCV lúc khởi động)
+VISUALIZER_DETAIL_LEVELS = ("none", "hands", "contours", "full")
+VISUALIZER_DETAIL = "full"
+
+# Hiển thị video trên Streamlit: FPS gửi tới trình duyệt (tách khỏi FPS suy luận), bề rộng ảnh (px),
+# chất lượng JPEG, giới hạn lưu lượng (KB/s, 0 = không giới hạn). Streamlit không báo khi client tụt
+# lại phía sau, nên ngân sách KB/s là giới hạn duy nhất cho dữ liệu đẩy sang trình duyệt: mặc định
+# ~1.2 MB/s, đủ cho 15 FPS với khung 640 px thông thường (30-60 KB/ảnh)
+DISPLAY_TARGET_FPS = 15.0
+DISPLAY_WIDTH = 640
+DISPLAY_JPEG_QUALITY = 80
+DISPLAY_MAX_KBPS = 1200
+
+# Làm mượt nhãn: cửa sổ trượt SMOOTHING_WINDOW khung hình, đổi nhãn khi đạt SMOOTHING_QUORUM phiếu
+SMOOTHING_WINDOW = 10
+SMOOTHING_QUORUM = 6
+
+# Cache âm thanh TTS (điền sẵn bằng scripts/prerender_speech.py) và dung lượng tối đa (MB)
+TTS_CACHE_DIR = "outputs/tts_cache"
+TTS_CACHE_MAX_MB = 50
+# Hàng đợi câu đọc: số câu chờ tối đa (1 = chỉ giữ nhãn mới nhất), câu chờ quá lâu (giây) bị huỷ
+TTS_QUEUE_SIZE = 1
+TTS_MAX_AGE_SECONDS = 3.0
+
+# Đo độ trễ từng bước: số lần đo gần nhất giữ lại, file JSONL mặc định, chu kỳ làm mới bảng (giây)
+PROFILE_WINDOW = 300
+PROFILE_JSONL_PATH = "outputs/profile.jsonl"
+PROFILE_REFRESH_SECONDS = 1.0
+
+# Dịch vụ suy luận dùng chung (scripts/serve_model.py): địa chỉ, số dòng tối đa mỗi micro-batch,
+# thời gian tối đa một request chờ để ghép batch (ms)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_MAX_BATCH = 64
+SERVER_MAX_DELAY_MS = 2.0
+# Đặt URL (vd. "http://127.0.0.1:8765") để ứng dụng gửi đặc trưng tới server thay vì tự nạp model
+INFERENCE_SERVER_URL = None
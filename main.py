@@ -1,17 +1,31 @@
-import cv2
-import mediapipe as mp
 import sys
 import time
 import warnings
+
+from utils.timeline import StartupTimeline
+
+# Mốc 0 của dòng thời gian khởi động (mỗi lần Streamlit chạy lại script)
+timeline = StartupTimeline()
+
+import numpy as np
 import streamlit as st
 
 # Import các module xử lý
-from utils.feature_extraction import extract_features
+# (OpenCV, MediaPipe và backend TTS chỉ được import khi thật sự cần - xem bên dưới)
 from utils.strings import ExpressionHandler
 from utils.tts import TextToSpeech
+from utils.audio_cache import AudioCache
 from utils.model import ASLClassificationModel
-from utils.visualizer import Visualizer
 from config import MODEL_NAME, MODEL_CONFIDENCE, PREDICTION_CONFIDENCE_THRESHOLD
+from config import (FACE_DETECTOR_MAX_HZ, FACE_DETECTOR_MIN_HZ, HANDS_DETECTOR_MAX_HZ,
+                    HANDS_DETECTOR_MIN_HZ, MOTION_THRESHOLD, FACE_BACKEND, FACE_CENTER_OFFSET)
+from config import SMOOTHING_WINDOW, SMOOTHING_QUORUM, VISUALIZER_DETAIL, VISUALIZER_DETAIL_LEVELS
+from config import PROFILE_WINDOW, PROFILE_JSONL_PATH, PROFILE_REFRESH_SECONDS
+from config import INFERENCE_SERVER_URL, TTS_CACHE_DIR, TTS_CACHE_MAX_MB, TTS_QUEUE_SIZE, TTS_MAX_AGE_SECONDS
+from config import DISPLAY_TARGET_FPS, DISPLAY_WIDTH, DISPLAY_JPEG_QUALITY, DISPLAY_MAX_KBPS
+from utils.feature_extraction import FACE_BACKENDS, FEATURE_SIZE
+
+timeline.mark("Import module")
 
 # Bỏ qua các cảnh báo không cần thiết
 warnings.filterwarnings("ignore")
@@ -44,18 +58,46 @@ st.markdown("""
 # ==========================================
 @st.cache_resource
 def load_ai_model():
-    """Load model AI"""
-    return ASLClassificationModel.load_model(f"models/{MODEL_NAME}")
+    """Load model AI (và dự đoán thử một lần để lần dự đoán thật đầu tiên không bị chậm)"""
+    if INFERENCE_SERVER_URL:
+        # Dùng chung model của scripts/serve_model.py thay vì mỗi phiên nạp một bản
+        from utils.inference_server import InferenceClient
+        model = InferenceClient(INFERENCE_SERVER_URL)
+    else:
+        model = ASLClassificationModel.load_model(f"models/{MODEL_NAME}")
+    model.predict_with_confidence(np.zeros(FEATURE_SIZE, dtype=np.float32))
+    return model
 
 @st.cache_resource
-def load_visualizer():
-    """Load công cụ vẽ"""
-    return Visualizer()
+def load_visualizer(detail=VISUALIZER_DETAIL):
+    """Load công cụ vẽ (mỗi mức chi tiết một đối tượng, dùng chung giữa các phiên)"""
+    from utils.visualizer import Visualizer
+    return Visualizer(detail=detail)
+
+def load_detectors(face_backend, detection_confidence, tracking_confidence):
+    """
+    Tạo face backend + Hands và chạy thử trên ảnh đen (lần `process` đầu tiên dựng graph).
+
+    Giữ trong `st.session_state` (không dùng `st.cache_resource` - cache đó dùng chung cho
+    mọi tab, trong khi graph MediaPipe không an toàn luồng): rerun dùng lại bộ detector của
+    phiên, đổi cấu hình thì bộ cũ được đóng sau khi luồng detect cũ trả lại.
+    """
+    from utils.pipeline import SharedDetectors, create_detectors
+
+    key = (face_backend, detection_confidence, tracking_confidence)
+    if st.session_state.get("detectors_key") != key:
+        if st.session_state.get("detectors") is not None:
+            st.session_state.detectors.close()
+        st.session_state.detectors = SharedDetectors(*create_detectors(
+            face_backend, detection_confidence, tracking_confidence,
+            FACE_CENTER_OFFSET, warm_up_size=(480, 640)))
+        st.session_state.detectors_key = key
+    return st.session_state.detectors
 
 # Khởi tạo
 try:
-    model = load_ai_model()
-    visualizer = load_visualizer()
+    with timeline.stage("Nạp model"):
+        model = load_ai_model()
 except Exception as e:
     st.error(f"⚠️ Lỗi khởi tạo: {e}")
     st.stop()
@@ -71,12 +113,54 @@ st.sidebar.markdown("---")
 st.sidebar.subheader("⚙️ Cấu hình MediaPipe")
 detection_confidence = st.sidebar.slider("Độ nhạy phát hiện (Detection)", 0.0, 1.0, MODEL_CONFIDENCE, 0.05)
 tracking_confidence = st.sidebar.slider("Độ nhạy theo dõi (Tracking)", 0.0, 1.0, MODEL_CONFIDENCE, 0.05)
+face_backend = st.sidebar.selectbox("Nguồn tâm khuôn mặt", FACE_BACKENDS,
+                                    index=FACE_BACKENDS.index(FACE_BACKEND),
+                                    help="'detection' nhẹ hơn FaceMesh nhiều, chỉ tính tâm khuôn mặt")
+render_detail = st.sidebar.selectbox("Mức chi tiết khi vẽ", VISUALIZER_DETAIL_LEVELS,
+                                     index=VISUALIZER_DETAIL_LEVELS.index(VISUALIZER_DETAIL),
+                                     help="'full' vẽ toàn bộ lưới khuôn mặt; các mức thấp hơn vẽ nhanh hơn")
+
+st.sidebar.markdown("---")
+st.sidebar.subheader("🖥️ Hiển thị video")
+display_fps = st.sidebar.slider("FPS hiển thị", 1.0, 30.0, DISPLAY_TARGET_FPS, 1.0,
+                                help="Tách khỏi FPS nhận diện; khung hình thừa không được gửi tới trình duyệt")
+display_width = st.sidebar.slider("Bề rộng ảnh (px)", 320, 1280, DISPLAY_WIDTH, 80)
+jpeg_quality = st.sidebar.slider("Chất lượng JPEG", 30, 95, DISPLAY_JPEG_QUALITY, 5)
+display_max_kbps = st.sidebar.number_input("Giới hạn lưu lượng (KB/s, 0 = không giới hạn)",
+                                           min_value=0, value=DISPLAY_MAX_KBPS, step=100)
+
+st.sidebar.markdown("---")
+st.sidebar.subheader("🧮 Ổn định kết quả")
+smoothing_window = st.sidebar.slider("Số khung hình xét (cửa sổ)", 1, 30, SMOOTHING_WINDOW, 1)
+smoothing_quorum = st.sidebar.slider("Số phiếu tối thiểu để đổi nhãn", 1, smoothing_window,
+                                     min(SMOOTHING_QUORUM, smoothing_window), 1)
+
+st.sidebar.markdown("---")
+st.sidebar.subheader("⏱️ Lập lịch detector")
+adaptive_detectors = st.sidebar.checkbox("Giảm tần suất khi đứng yên (tiết kiệm CPU)", value=True)
+face_max_hz = st.sidebar.slider("Face tối đa (Hz)", 1.0, 30.0, FACE_DETECTOR_MAX_HZ, 1.0,
+                                disabled=not adaptive_detectors)
+hands_max_hz = st.sidebar.slider("Hands tối đa (Hz)", 1.0, 30.0, HANDS_DETECTOR_MAX_HZ, 1.0,
+                                 disabled=not adaptive_detectors)
+motion_threshold = st.sidebar.slider("Ngưỡng chuyển động", 0.5, 20.0, MOTION_THRESHOLD, 0.5,
+                                     disabled=not adaptive_detectors)
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("🔊 Giọng nói (TTS)")
 tts_enabled = st.sidebar.checkbox("Bật đọc kết quả", value=False)
 tts_engine_choice = st.sidebar.selectbox("Công cụ đọc", ["pyttsx3 (Offline)", "gTTS (Vietnamese, Online)"], index=0)
 min_interval = st.sidebar.slider("Khoảng cách đọc (giây). Khuyến nghị 2 giây", 1.0, 5.0, 2.0, 0.5)
+tts_display = st.sidebar.empty()
+
+st.sidebar.markdown("---")
+st.sidebar.subheader("📊 Độ trễ từng bước (ms)")
+profile_to_file = st.sidebar.checkbox("Ghi từng khung hình ra JSONL", value=False)
+profile_path = st.sidebar.text_input("File JSONL", PROFILE_JSONL_PATH, disabled=not profile_to_file)
+profile_display = st.sidebar.empty()
+
+st.sidebar.markdown("---")
+with st.sidebar.expander("🚀 Thời gian khởi động"):
+    startup_display = st.empty()
 
 # Xử lý TTS Session
 if 'tts' not in st.session_state:
@@ -87,14 +171,19 @@ desired_engine = 'pyttsx3' if 'pyttsx3' in tts_engine_choice else 'gtts'
 
 if tts_enabled:
     if st.session_state.tts is None or st.session_state.tts_engine != desired_engine:
+        if st.session_state.tts is not None:
+            st.session_state.tts.close()
         try:
             with st.spinner("Đang khởi tạo giọng nói..."):
-                st.session_state.tts = TextToSpeech(engine=desired_engine, lang='vi')
+                st.session_state.tts = TextToSpeech(engine=desired_engine, lang='vi',
+                                                   cache=AudioCache(TTS_CACHE_DIR, TTS_CACHE_MAX_MB * 2**20),
+                                                   queue_size=TTS_QUEUE_SIZE, max_age=TTS_MAX_AGE_SECONDS)
                 st.session_state.tts_engine = desired_engine
         except Exception as e:
             st.sidebar.error(f"Lỗi TTS: {e}")
             tts_enabled = False
 elif not tts_enabled and st.session_state.tts is not None:
+    st.session_state.tts.close()
     st.session_state.tts = None
 
 # ==========================================
@@ -115,69 +204,102 @@ with col2:
     confidence_text = st.empty()
     
     st.markdown("---")
-    fps_display = st.empty()
+    fps_col, display_col, bandwidth_col = st.columns(3)
+    fps_display = fps_col.empty()
+    display_fps_display = display_col.empty()
+    bandwidth_display = bandwidth_col.empty()
+    detector_display = st.empty()
+    pipeline_display = st.empty()
 
 # ==========================================
 # 5. LOGIC XỬ LÝ CAMERA (LOOP)
 # ==========================================
 if run_camera:
-    mp_face_mesh = mp.solutions.face_mesh
-    mp_hands = mp.solutions.hands
-    
-    cap = cv2.VideoCapture(0)
-    expression_handler = ExpressionHandler()
+    with timeline.stage("Import OpenCV + pipeline"):
+        import cv2
+        from utils.pipeline import RecognitionPipeline
+        from utils.profiling import StageProfiler, format_summary
+        from utils.display import DisplayStage
+        from utils.scheduler import DetectorScheduler
+    with timeline.stage("Nạp Visualizer (MediaPipe)"):
+        visualizer = load_visualizer(render_detail)
+    with timeline.stage("Làm nóng detector"):
+        detectors = load_detectors(face_backend, detection_confidence, tracking_confidence)
+    with timeline.stage("Mở camera"):
+        cap = cv2.VideoCapture(0)
+    startup_display.code(timeline.report())
+
+    expression_handler = ExpressionHandler(window_size=smoothing_window, quorum=smoothing_quorum)
     prev_time = 0
+    last_profile_refresh = 0.0
+    profiler = StageProfiler(window=PROFILE_WINDOW,
+                             jsonl_path=profile_path if profile_to_file else None)
+    display = DisplayStage(target_fps=display_fps, width=display_width, quality=jpeg_quality,
+                           max_kbps=display_max_kbps)
+
+    # Camera, MediaPipe, dự đoán và vẽ chạy trên các luồng riêng;
+    # vòng lặp này chỉ lấy khung hình mới nhất và cập nhật giao diện
+    scheduler = DetectorScheduler(
+        face_max_hz=face_max_hz, face_min_hz=min(FACE_DETECTOR_MIN_HZ, face_max_hz),
+        hands_max_hz=hands_max_hz, hands_min_hz=min(HANDS_DETECTOR_MIN_HZ, hands_max_hz),
+        motion_threshold=motion_threshold, adaptive=adaptive_detectors)
+    pipeline = RecognitionPipeline(
+        cap, model, visualizer,
+        min_detection_confidence=detection_confidence,
+        min_tracking_confidence=tracking_confidence,
+        scheduler=scheduler,
+        face_backend=face_backend,
+        face_offset=FACE_CENTER_OFFSET,
+        detectors=detectors,
+        profiler=profiler).start()
 
-    with mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=detection_confidence,
-            min_tracking_confidence=tracking_confidence) as face_mesh, \
-         mp_hands.Hands(
-            max_num_hands=2,
-            min_detection_confidence=detection_confidence,
-            min_tracking_confidence=tracking_confidence) as hands:
-
-        while cap.isOpened() and run_camera:
-            success, image = cap.read()
-            if not success:
-                st.warning("Không tìm thấy camera.")
-                break
+    try:
+        while run_camera:
+            packet = pipeline.get_latest(timeout=1.0)
+            if packet is None:
+                if not pipeline.running:
+                    st.warning(pipeline.error or "Không tìm thấy camera.")
+                    break
+                continue
+
+            if not timeline.has("Khung hình đầu tiên"):
+                timeline.mark("Khung hình đầu tiên")
+                startup_display.code(timeline.report())
+            if packet.label is not None and not timeline.has("Dự đoán đầu tiên"):
+                timeline.mark("Dự đoán đầu tiên")
+                startup_display.code(timeline.report())
+                print(timeline.report())
+
+            ui_start = time.perf_counter()
 
             # Tính FPS
-            curr_time = time.time()
+            curr_time = time.perf_counter()
             fps = 1 / (curr_time - prev_time) if (curr_time - prev_time) > 0 else 0
             prev_time = curr_time
-            fps_display.metric("FPS", f"{int(fps)}")
-
-            # Xử lý hình ảnh
-            image.flags.writeable = False
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            fps_display.metric("FPS nhận diện", f"{int(fps)}")
 
-            # 1. Detect
-            face_results = face_mesh.process(image)
-            hand_results = hands.process(image)
+            detector_display.caption(" · ".join(
+                f"{name}: {stat['hz']:.1f} Hz" for name, stat in scheduler.stats().items()))
 
-            # 2. Vẽ (Sử dụng Visualizer mới)
-            image.flags.writeable = True
-            image = visualizer.draw_landmarks(image, face_results, hand_results)
+            stats = pipeline.stats()
+            pipeline_display.caption(" · ".join(
+                f"{name}: {stat['depth']} chờ / {stat['dropped']} bỏ" for name, stat in stats.items()))
 
-            # 3. Dự đoán
-            # Chỉ dự đoán nếu phát hiện được tay hoặc mặt
-            if face_results.multi_face_landmarks or hand_results.multi_hand_landmarks:
+            # Dự đoán đã được tính ở luồng classify
+            # Chỉ có kết quả nếu phát hiện được tay hoặc mặt
+            if packet.label is not None:
                 try:
-                    feature = extract_features(mp_hands, face_results, hand_results)
-                    
-                    # Dùng hàm mới predict_with_confidence
-                    label, confidence = model.predict_with_confidence(feature)
-                    
+                    label, confidence = packet.label, packet.confidence
+
                     # --- LOGIC MỚI: DUAL CONFIDENCE THRESHOLD ---
                     # Nếu độ tin cậy thấp hơn ngưỡng cho phép -> Coi là "binh_thuong" (Idle)
                     if confidence < PREDICTION_CONFIDENCE_THRESHOLD:
                         label = "binh_thuong"
                     
-                    expression_handler.receive(label)
-                    ui_text = expression_handler.get_message()
+                    # Nhãn hiển thị chỉ đổi khi đủ số phiếu trong cửa sổ trượt
+                    changed = expression_handler.receive(label, float(confidence))
+                    ui_text = expression_handler.get_message() or "..."
+                    confidence = expression_handler.get_confidence()
 
                     # Cập nhật UI
                     prediction_placeholder.markdown(f'<div class="big-font">{ui_text}</div>', unsafe_allow_html=True)
@@ -186,12 +308,12 @@ if run_camera:
                     confidence_bar.progress(float(confidence))
                     confidence_text.text(f"Độ chính xác: {confidence*100:.1f}%")
 
-                    # Đọc giọng nói
-                    if tts_enabled and st.session_state.tts:
+                    # Đọc giọng nói - chỉ khi nhãn hiển thị vừa đổi
+                    if changed and tts_enabled and st.session_state.tts:
                         speech_text = expression_handler.get_speech_message()
 
                         # Do not speak if label is "binh_thuong"
-                        if label != "binh_thuong" and speech_text.strip():
+                        if expression_handler.current_message != "binh_thuong" and speech_text.strip():
                             st.session_state.tts.speak_if_allowed(speech_text, min_interval=min_interval)
 
                 except Exception as e:
@@ -199,14 +321,35 @@ if run_camera:
                     pass
             else:
                 # Nếu không có landmarks (không người, không tay), reset UI
+                expression_handler.reset()
                 prediction_placeholder.markdown(f'<div class="big-font">...</div>', unsafe_allow_html=True)
                 confidence_bar.progress(0)
                 confidence_text.text("Đang chờ tín hiệu...")
 
-            # Hiển thị
-            video_placeholder.image(image, channels="RGB", use_column_width=True)
+            # Hiển thị: thu nhỏ + JPEG, theo FPS hiển thị riêng (khung hình thừa bị bỏ qua)
+            display.show(video_placeholder, packet.image)
 
-    cap.release()
+            # Thời gian cập nhật giao diện + bảng độ trễ (làm mới mỗi PROFILE_REFRESH_SECONDS giây)
+            pipeline.record(packet, "ui", time.perf_counter() - ui_start)
+            profiler.log_frame(packet.index, packet.timings)
+            if curr_time - last_profile_refresh >= PROFILE_REFRESH_SECONDS:
+                last_profile_refresh = curr_time
+                display_stats = display.stats()
+                display_fps_display.metric("FPS hiển thị", f"{display_stats['fps']:.0f}")
+                bandwidth_display.metric("Băng thông", f"{display_stats['bytes_per_second'] / 1024:.0f} KB/s")
+                if tts_enabled and st.session_state.tts:
+                    tts_stats = st.session_state.tts.stats()
+                    delay, duration = tts_stats["queue_delay"], tts_stats["duration"]
+                    tts_display.caption(
+                        f"Đã đọc {tts_stats['spoken']} · gộp {tts_stats['coalesced']} · huỷ {tts_stats['cancelled']}"
+                        + (f" · chờ p50 {delay['p50']:.0f} ms · đọc p50 {duration['p50']:.0f} ms" if delay else ""))
+                profile_display.code(format_summary(profiler.summary()))
+    finally:
+        # Streamlit dừng script (rerun) bằng exception → luôn dừng các luồng trước khi nhả camera
+        pipeline.stop()
+        profiler.close()
+        cap.release()
     # cv2.destroyAllWindows() # Không cần thiết trên Streamlit Cloud và gây lỗi với headless
 else:
+    startup_display.code(timeline.report())
     st.info("👋 Hãy bật camera để bắt đầu trải nghiệm.")
\ No newline at end of file
@@ -0,0 +1,209 @@
+import argparse
+import os, sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from config import MODEL_NAME, FACE_BACKEND, FACE_CENTER_OFFSET
+from utils.feature_extraction import FACE_BACKENDS
+
+# Temporarily ignore warning
+import warnings
+warnings.filterwarnings("ignore")
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+# Tài nguyên riêng của mỗi tiến trình worker (nạp một lần trong initializer)
+_worker = {}
+
+
+def collect_videos(inputs, extensions=VIDEO_EXTENSIONS):
+    """
+    Gom danh sách file video từ các đường dẫn đầu vào (file hoặc thư mục).
+
+    Args:
+        inputs: Danh sách đường dẫn file/thư mục.
+        extensions: Các đuôi file được coi là video.
+
+    Returns:
+        list: Đường dẫn tuyệt đối, đã sắp xếp, không trùng lặp.
+    """
+    videos = set()
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    if name.lower().endswith(extensions):
+                        videos.add(os.path.abspath(os.path.join(root, name)))
+        elif os.path.isfile(path):
+            videos.add(os.path.abspath(path))
+        else:
+            print(f"⚠️ Bỏ qua đường dẫn không tồn tại: {path}")
+    return sorted(videos)
+
+
+def _init_worker(model_path, confidence, face_backend):
+    """Nạp model và module MediaPipe một lần cho mỗi tiến trình."""
+    import cv2
+    import mediapipe as mp
+    from utils.model import ASLClassificationModel
+
+    # Mỗi tiến trình xử lý một video → tránh OpenCV tự sinh thêm luồng gây tranh chấp CPU
+    cv2.setNumThreads(1)
+
+    _worker["cv2"] = cv2
+    _worker["mp"] = mp
+    _worker["model"] = ASLClassificationModel.load_model(model_path)
+    _worker["confidence"] = confidence
+    _worker["face_backend"] = face_backend
+
+
+def process_video(video_path, output_path):
+    """
+    Chạy FaceMesh + Hands + phân loại trên từng khung hình của một video (không hiển thị).
+
+    Kết quả được ghi dạng cột (mỗi cột một mảng) vào file .npz:
+    frame_index, timestamp_ms, label_index, confidence, has_landmarks và classes.
+
+    Returns:
+        dict: Thống kê {video, output, frames, seconds, fps}.
+    """
+    cv2 = _worker["cv2"]
+    mp = _worker["mp"]
+    model = _worker["model"]
+    min_confidence = _worker["confidence"]
+
+    from utils.feature_extraction import FeatureExtractor, create_face_backend
+
+    classes = [model.mapping[i] for i in sorted(model.mapping)]
+    class_index = {name: i for i, name in enumerate(classes)}
+
+    frame_index, timestamps, has_landmarks, features = [], [], [], []
+    extractor = FeatureExtractor()
+
+    mp_hands = mp.solutions.hands
+
+    start = time.perf_counter()
+    cap = cv2.VideoCapture(video_path)
+    with create_face_backend(_worker["face_backend"],
+                             min_detection_confidence=min_confidence,
+                             min_tracking_confidence=min_confidence,
+                             offset=FACE_CENTER_OFFSET) as face_mesh, \
+         mp_hands.Hands(max_num_hands=2,
+                        min_detection_confidence=min_confidence,
+                        min_tracking_confidence=min_confidence) as hands:
+        index = 0
+        while cap.isOpened():
+            success, image = cap.read()
+            if not success:
+                break
+
+            timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+            image.flags.writeable = False
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+            face_results = face_mesh.process(image)
+            hand_results = hands.process(image)
+
+            # Giống main.py: chỉ dự đoán khi phát hiện được tay hoặc mặt
+            detected = bool(face_results.multi_face_landmarks or hand_results.multi_hand_landmarks)
+            if detected:
+                # Bộ đệm của extractor được dùng lại → sao chép trước khi lưu
+                features.append(extractor.extract(face_results, hand_results).copy())
+
+            frame_index.append(index)
+            has_landmarks.append(detected)
+            index += 1
+    cap.release()
+
+    # Phân loại toàn bộ khung hình có landmarks trong một batch
+    has_landmarks = np.asarray(has_landmarks, dtype=bool)
+    label_index = np.full(len(has_landmarks), -1, dtype=np.int16)
+    confidence = np.zeros(len(has_landmarks), dtype=np.float32)
+    if features:
+        labels, scores = model.predict_proba_batch(np.vstack(features))
+        label_index[has_landmarks] = [class_index.get(label, -1) for label in labels]
+        confidence[has_landmarks] = scores
+    seconds = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    np.savez(output_path,
+             frame_index=np.asarray(frame_index, dtype=np.int32),
+             timestamp_ms=np.asarray(timestamps, dtype=np.float64),
+             label_index=label_index,
+             confidence=confidence,
+             has_landmarks=has_landmarks,
+             classes=np.asarray(classes))
+
+    frames = len(frame_index)
+    return {
+        "video": video_path,
+        "output": output_path,
+        "frames": frames,
+        "seconds": seconds,
+        "fps": frames / seconds if seconds > 0 else 0.0,
+    }
+
+
+def output_path_for(video_path, output_dir, common_root):
+    """Giữ nguyên cấu trúc thư mục con của video trong thư mục kết quả."""
+    relative = os.path.relpath(video_path, common_root)
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + ".npz")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Batch inference on recorded videos")
+
+    parser.add_argument("inputs", help="Video files or directories containing videos",
+                        nargs="+")
+    parser.add_argument("--model_path", help="Path of the ASL classification model",
+                        type=str, default=f"models/{MODEL_NAME}")
+    parser.add_argument("--output", help="Directory to write per-video .npz results",
+                        type=str, default="outputs/batch")
+    parser.add_argument("--workers", help="Number of worker processes",
+                        type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--confidence", help="Confidence of the MediaPipe models",
+                        type=float, default=0.5)
+    parser.add_argument("--face_backend", help="Face centre backend",
+                        type=str, default=FACE_BACKEND, choices=FACE_BACKENDS)
+    args = parser.parse_args()
+
+    videos = collect_videos(args.inputs)
+    if not videos:
+        print("❌ Không tìm thấy video nào.")
+        exit(1)
+
+    common_root = os.path.commonpath([os.path.dirname(v) for v in videos])
+    workers = max(1, min(args.workers, len(videos)))
+
+    print(f"🎞️ {len(videos)} video, {workers} tiến trình worker")
+    start = time.perf_counter()
+    total_frames = 0
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(args.model_path, args.confidence, args.face_backend)) as executor:
+        futures = {
+            executor.submit(process_video, video, output_path_for(video, args.output, common_root)): video
+            for video in videos
+        }
+        for future in as_completed(futures):
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"⚠️ Lỗi khi xử lý {futures[future]}: {e}")
+                continue
+            total_frames += stats["frames"]
+            print(f"  + {os.path.basename(stats['video'])}: {stats['frames']} khung hình, "
+                  f"{stats['fps']:.1f} FPS → {stats['output']}")
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Tổng cộng {total_frames} khung hình trong {elapsed:.1f} giây "
+          f"({total_frames / elapsed if elapsed > 0 else 0:.1f} FPS toàn hệ thống)")
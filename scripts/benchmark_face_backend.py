@@ -0,0 +1,103 @@
+import argparse
+import os, sys
+import time
+
+import cv2
+import numpy as np
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from config import FACE_CENTER_OFFSET
+from utils.feature_extraction import FACE_BACKENDS, create_face_backend, extract_face_result
+
+# Temporarily ignore warning
+import warnings
+warnings.filterwarnings("ignore")
+
+REFERENCE = "facemesh"
+
+
+def read_frames(source, count):
+    """Đọc tối đa `count` khung hình RGB từ file video hoặc chỉ số camera."""
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    frames = []
+    while cap.isOpened() and len(frames) < count:
+        success, image = cap.read()
+        if not success:
+            break
+        frames.append(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+
+def run_backend(name, frames, confidence, offset=(0.0, 0.0)):
+    """Chạy một backend trên toàn bộ khung hình, trả về (tâm mặt (N, 2) hoặc NaN, ms/khung, box)."""
+    centres = np.full((len(frames), 2), np.nan)
+    boxes = np.full((len(frames), 4), np.nan)
+    with create_face_backend(name, min_detection_confidence=confidence,
+                             min_tracking_confidence=confidence, offset=offset) as backend:
+        backend.process(frames[0])  # warm-up (khởi tạo graph)
+        start = time.perf_counter()
+        for i, frame in enumerate(frames):
+            results = backend.process(frame)
+            if results.multi_face_landmarks:
+                centres[i] = extract_face_result(results)
+                if getattr(results, "box", None) is not None:
+                    boxes[i] = results.box
+        elapsed = time.perf_counter() - start
+    return centres, elapsed / len(frames) * 1000, boxes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Face backend benchmark")
+
+    parser.add_argument("--source", help="Video file or camera index",
+                        type=str, default="0")
+    parser.add_argument("--frames", help="Number of frames to evaluate",
+                        type=int, default=300)
+    parser.add_argument("--confidence", help="Confidence of the MediaPipe models",
+                        type=float, default=0.5)
+    args = parser.parse_args()
+
+    frames = read_frames(args.source, args.frames)
+    if not frames:
+        print("❌ Không đọc được khung hình nào.")
+        exit(1)
+    height, width = frames[0].shape[:2]
+    print(f"🎞️ {len(frames)} khung hình {width}x{height}")
+
+    reference, reference_ms, _ = run_backend(REFERENCE, frames, args.confidence)
+
+    print(f"{'backend':<15} {'ms/frame':>9} {'speedup':>8} {'found':>7} "
+          f"{'drift mean':>11} {'drift p95':>10} {'(px p95)':>9}")
+    suggested_offset = None
+    for name in FACE_BACKENDS:
+        if name == REFERENCE:
+            centres, ms, boxes = reference, reference_ms, None
+        else:
+            centres, ms, boxes = run_backend(name, frames, args.confidence, offset=FACE_CENTER_OFFSET)
+
+        both = ~np.isnan(centres[:, 0]) & ~np.isnan(reference[:, 0])
+        drift = np.linalg.norm(centres[both] - reference[both], axis=1)
+        drift_px = np.linalg.norm((centres[both] - reference[both]) * (width, height), axis=1)
+        found = np.mean(~np.isnan(centres[:, 0])) * 100
+        mean_drift = drift.mean() if drift.size else float("nan")
+        p95_drift = np.percentile(drift, 95) if drift.size else float("nan")
+        p95_px = np.percentile(drift_px, 95) if drift.size else float("nan")
+        print(f"{name:<15} {ms:>9.2f} {reference_ms / ms:>7.1f}x {found:>6.1f}% "
+              f"{mean_drift:>11.4f} {p95_drift:>10.4f} {p95_px:>9.1f}")
+
+        # Độ lệch hệ thống giữa tâm keypoint và trung bình FaceMesh, tính theo kích thước box
+        if name == "detection" and both.any():
+            sizes = boxes[both][:, 2:4]
+            residual = np.median((reference[both] - centres[both]) / sizes, axis=0)
+            suggested_offset = np.asarray(FACE_CENTER_OFFSET) + residual
+
+    if suggested_offset is not None:
+        print(f"\n💡 Gợi ý cho config.py: FACE_CENTER_OFFSET = "
+              f"({suggested_offset[0]:.4f}, {suggested_offset[1]:.4f})")
+        print("   (chạy lại sau khi cập nhật để kiểm tra drift đã giảm)")
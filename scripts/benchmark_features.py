@@ -0,0 +1,59 @@
+import argparse
+import glob
+import os, sys
+import time
+
+import numpy as np
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from utils.feature_extraction import extract_features, FeatureExtractor
+from utils.synthetic import results_from_feature
+
+
+def time_per_frame(fn, frames, repeats):
+    """Số micro-giây trung bình cho mỗi khung hình (lấy lần đo nhanh nhất)."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for face_results, hand_results in frames:
+            fn(face_results, hand_results)
+        best = min(best, time.perf_counter() - start)
+    return best / len(frames) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Feature extraction micro-benchmark")
+
+    parser.add_argument("--data_dir", help="Directory containing the .npy feature files",
+                        type=str, default="data")
+    parser.add_argument("--frames", help="Number of synthetic frames to replay",
+                        type=int, default=500)
+    parser.add_argument("--repeats", help="Number of timing repeats",
+                        type=int, default=5)
+    args = parser.parse_args()
+
+    rows = np.vstack([np.load(f) for f in sorted(glob.glob(os.path.join(args.data_dir, "*.npy")))])
+    rng = np.random.default_rng(0)
+    rows = rows[rng.integers(0, len(rows), size=args.frames)]
+    frames = [results_from_feature(row, rng=rng) for row in rows]
+
+    # mp_hands không được dùng bên trong extract_features, truyền None là đủ
+    legacy = lambda face, hand: extract_features(None, face, hand)
+    extractor = FeatureExtractor()
+
+    # Kiểm tra tương thích từng bit với đường cũ (ép về float32)
+    mismatches = sum(
+        not np.array_equal(legacy(face, hand).astype(np.float32), extractor.extract(face, hand))
+        for face, hand in frames
+    )
+    print(f"Bit-compatible frames: {len(frames) - mismatches}/{len(frames)}")
+
+    legacy_us = time_per_frame(legacy, frames, args.repeats)
+    extractor_us = time_per_frame(extractor.extract, frames, args.repeats)
+    print(f"extract_features:         {legacy_us:8.1f} µs/frame")
+    print(f"FeatureExtractor.extract: {extractor_us:8.1f} µs/frame ({legacy_us / extractor_us:.1f}x)")
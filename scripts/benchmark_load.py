@@ -0,0 +1,88 @@
+import argparse
+import json
+import os, sys
+import statistics
+import subprocess
+import tempfile
+import time
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from config import MODEL_NAME
+
+# Chạy trong một tiến trình Python mới: đo cả thời gian import (sklearn với pickle)
+# như khi ứng dụng khởi động lạnh
+_PROBE = """
+import sys, time, json, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import numpy as np
+from utils.model import ASLClassificationModel
+imported = time.perf_counter()
+model = ASLClassificationModel.load_model({path!r})
+loaded = time.perf_counter()
+model.predict_with_confidence(np.zeros(86, dtype=np.float32))
+predicted = time.perf_counter()
+print(json.dumps({{"import": imported - start, "load": loaded - imported,
+                  "first_prediction": predicted - loaded, "total": predicted - start}}))
+"""
+
+
+def measure_cold(path, runs):
+    """Mỗi lần đo là một tiến trình mới; trả về trung vị của từng giai đoạn (giây)."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(root=PROJECT_ROOT, path=path)],
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def measure_warm(path, runs):
+    """Thời gian nạp lại khi module đã được import (trung vị, giây)."""
+    from utils.model import ASLClassificationModel
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        ASLClassificationModel.load_model(path)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Benchmark model load time (.pkl vs .npz vs .aslm)")
+
+    parser.add_argument("--model_path", help="Pickled (SVC, mapping) model to convert and compare",
+                        type=str, default=f"models/{os.path.splitext(MODEL_NAME)[0]}.pkl")
+    parser.add_argument("--runs", help="Number of fresh processes per format",
+                        type=int, default=5)
+    args = parser.parse_args()
+
+    import warnings
+    warnings.filterwarnings("ignore")
+    from utils.model import ASLClassificationModel
+
+    model = ASLClassificationModel.load_model(args.model_path)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stem = os.path.join(tmp_dir, os.path.splitext(os.path.basename(args.model_path))[0])
+        model.export_engine(stem + ".npz")
+        model.export_artifact(stem + ".aslm")
+        paths = [args.model_path, stem + ".npz", stem + ".aslm"]
+
+        print(f"⏱️ Thời gian khởi động (trung vị của {args.runs} tiến trình mới, ms):")
+        print(f"{'Định dạng':<10} {'MB':>6} {'import':>8} {'nạp':>8} {'dự đoán 1':>10} {'tổng':>8} {'nạp lại':>8}")
+        baseline = None
+        for path in paths:
+            cold = measure_cold(path, args.runs)
+            warm = measure_warm(path, args.runs)
+            baseline = baseline or cold["total"]
+            print(f"{os.path.splitext(path)[1]:<10} {os.path.getsize(path) / 1e6:>6.2f} "
+                  f"{cold['import'] * 1e3:>8.1f} {cold['load'] * 1e3:>8.1f} "
+                  f"{cold['first_prediction'] * 1e3:>10.1f} {cold['total'] * 1e3:>8.1f} "
+                  f"{warm * 1e3:>8.2f}   ({baseline / cold['total']:.1f}x)")
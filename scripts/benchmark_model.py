@@ -0,0 +1,74 @@
+import argparse
+import glob
+import os, sys
+import time
+
+import numpy as np
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from config import MODEL_NAME
+from utils.model import ASLClassificationModel
+
+# Temporarily ignore warning
+import warnings
+warnings.filterwarnings("ignore")
+
+
+def load_rows(data_dir, count, seed=0):
+    """Lấy ngẫu nhiên `count` dòng đặc trưng thật từ data/*.npy."""
+    files = sorted(glob.glob(os.path.join(data_dir, "*.npy")))
+    if not files:
+        raise FileNotFoundError(f"Không tìm thấy dữ liệu .npy nào trong '{data_dir}'.")
+    rows = np.vstack([np.load(f) for f in files])
+    rng = np.random.default_rng(seed)
+    return rows[rng.integers(0, len(rows), size=count)]
+
+
+def time_call(fn, min_seconds):
+    """Lặp lại `fn` cho tới khi đủ `min_seconds`, trả về số giây trung bình mỗi lần gọi."""
+    fn()  # warm-up
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Batch prediction benchmark")
+
+    parser.add_argument("--model_path", help="Path of the ASL classification model",
+                        type=str, default=f"models/{MODEL_NAME}")
+    parser.add_argument("--data_dir", help="Directory containing the .npy feature files",
+                        type=str, default="data")
+    parser.add_argument("--max_batch", help="Largest batch size (powers of two from 1)",
+                        type=int, default=4096)
+    parser.add_argument("--min_seconds", help="Minimum measuring time per batch size",
+                        type=float, default=1.0)
+    args = parser.parse_args()
+
+    model = ASLClassificationModel.load_model(args.model_path)
+    rows = load_rows(args.data_dir, args.max_batch)
+
+    # Mốc so sánh: gọi predict_with_confidence từng dòng như vòng lặp camera
+    sample = rows[:64]
+    per_row = time_call(lambda: [model.predict_with_confidence(r) for r in sample],
+                        args.min_seconds) / len(sample)
+    print(f"Per-frame predict_with_confidence: {1.0 / per_row:12.0f} rows/s")
+    print("-" * 56)
+    print(f"{'batch':>8} {'ms/batch':>12} {'rows/s':>14} {'speedup':>10}")
+
+    batch = 1
+    while batch <= args.max_batch:
+        features = rows[:batch]
+        seconds = time_call(lambda: model.predict_proba_batch(features), args.min_seconds)
+        rows_per_sec = batch / seconds
+        print(f"{batch:>8} {seconds * 1000:>12.3f} {rows_per_sec:>14.0f} {rows_per_sec * per_row:>9.1f}x")
+        batch *= 2
@@ -0,0 +1,155 @@
+import argparse
+import glob
+import os, sys
+
+import cv2
+import numpy as np
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from config import MODEL_NAME, PREDICTION_CONFIDENCE_THRESHOLD, SMOOTHING_WINDOW, SMOOTHING_QUORUM
+from config import DISPLAY_WIDTH, DISPLAY_JPEG_QUALITY
+from utils.benchmark import (compare_results, environment, format_comparison, format_stats_table,
+                             latency_stats, load_results, save_results, time_each)
+from utils.display import DisplayStage
+from utils.feature_extraction import FeatureExtractor, extract_features
+from utils.model import ASLClassificationModel
+from utils.strings import ExpressionHandler
+from utils.synthetic import random_features, results_from_feature
+from utils.visualizer import Visualizer
+
+# Temporarily ignore warning
+import warnings
+warnings.filterwarnings("ignore")
+
+
+def load_feature_rows(source, data_dir, count, rng):
+    """Dòng đặc trưng để dựng kết quả MediaPipe giả: dữ liệu thật (data) hoặc ngẫu nhiên (random)."""
+    if source == "random":
+        return random_features(count, rng=rng)
+    files = sorted(glob.glob(os.path.join(data_dir, "*.npy")))
+    if not files:
+        raise FileNotFoundError(f"Không tìm thấy dữ liệu .npy nào trong '{data_dir}'.")
+    rows = np.vstack([np.load(f) for f in files])
+    return rows[rng.integers(0, len(rows), size=count)]
+
+
+def run_suite(model, frames, width, height, rng):
+    """
+    Đo từng bước của vòng lặp mỗi khung hình trên kết quả MediaPipe giả.
+
+    Returns:
+        dict: {tên case: thống kê độ trễ (ms)}
+    """
+    extractor = FeatureExtractor()
+    visualizer = Visualizer()  # mức "full", giống mặc định của ứng dụng
+    cheap_visualizers = {detail: Visualizer(detail=detail) for detail in ("contours", "hands")}
+    handler = ExpressionHandler(window_size=SMOOTHING_WINDOW, quorum=SMOOTHING_QUORUM)
+    display = DisplayStage(width=DISPLAY_WIDTH, quality=DISPLAY_JPEG_QUALITY)
+    image_bgr = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    canvas = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+    features = [(extractor.extract(face, hand).copy(),) for face, hand in frames]
+
+    def frame_loop(face_results, hand_results):
+        # Giống detect (đổi màu) → classify → render của pipeline + logic giao diện trong main.py,
+        # chỉ bỏ phần MediaPipe (kết quả đã có sẵn)
+        image = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+        feature = extractor.extract(face_results, hand_results)
+        label, confidence = model.predict_with_confidence(feature)
+        if confidence < PREDICTION_CONFIDENCE_THRESHOLD:
+            label = "binh_thuong"
+        handler.receive(label, float(confidence))
+        visualizer.draw_landmarks(image, face_results, hand_results)
+
+    cases = {
+        # mp_hands không được dùng bên trong extract_features, truyền None là đủ
+        "extract_features": (lambda face, hand: extract_features(None, face, hand), frames),
+        "FeatureExtractor.extract": (extractor.extract, frames),
+        "predict_with_confidence": (model.predict_with_confidence, features),
+        "Visualizer.draw_landmarks": (lambda face, hand: visualizer.draw_landmarks(canvas, face, hand),
+                                      frames),
+        **{f"Visualizer.draw_landmarks[{detail}]": (lambda face, hand, v=cheap: v.draw_landmarks(canvas, face, hand),
+                                                    frames)
+           for detail, cheap in cheap_visualizers.items()},
+        # Nén JPEG khung hình đã vẽ (chỉ chạy cho các khung hình được hiển thị)
+        "DisplayStage.encode": (lambda face, hand: display.encode(canvas), frames),
+        "frame_loop": (frame_loop, frames),
+    }
+    results = {}
+    for name, (fn, inputs) in cases.items():
+        results[name] = latency_stats(time_each(fn, inputs))
+        print(f"  ✓ {name}")
+    return results
+
+
+def print_comparison(baseline_path, current, tolerance):
+    baseline = load_results(baseline_path)
+    rows, regressions = compare_results(baseline, current, tolerance)
+    print(f"\n📈 So sánh với {baseline_path} (commit {baseline['meta'].get('commit')} → "
+          f"{current['meta'].get('commit')}, ngưỡng ±{tolerance * 100:.0f}%):")
+    # Khác cấu hình đo (số khung hình, nguồn dữ liệu, máy...) thì so sánh kém tin cậy
+    keys = ("model", "source", "frames", "resolution", "processor", "cpu_count")
+    differences = [key for key in keys if baseline["meta"].get(key) != current["meta"].get(key)]
+    if differences:
+        print(f"⚠️ Cấu hình đo khác nhau: {', '.join(differences)}")
+    print(format_comparison(rows, tolerance))
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} chỉ số chậm đi quá {tolerance * 100:.0f}%.")
+    else:
+        print("\n✅ Không có hồi quy hiệu năng.")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("End-to-end per-frame benchmark with synthetic MediaPipe results")
+
+    parser.add_argument("--model_path", help="Path of the ASL classification model",
+                        type=str, default=f"models/{MODEL_NAME}")
+    parser.add_argument("--source", help="Feature rows used to build fake landmarks",
+                        choices=["data", "random"], default="data")
+    parser.add_argument("--data_dir", help="Directory containing the .npy feature files",
+                        type=str, default="data")
+    parser.add_argument("--frames", help="Number of frames timed per case",
+                        type=int, default=1000)
+    parser.add_argument("--width", help="Synthetic frame width", type=int, default=640)
+    parser.add_argument("--height", help="Synthetic frame height", type=int, default=480)
+    parser.add_argument("--seed", help="Random seed (same seed = same frames)", type=int, default=0)
+    parser.add_argument("--output", help="JSON file for the results (default: outputs/benchmarks/<commit>.json)",
+                        type=str, default=None)
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against",
+                        type=str, default=None)
+    parser.add_argument("--compare", help="Only compare two existing result files: BASELINE CURRENT",
+                        nargs=2, default=None)
+    parser.add_argument("--tolerance", help="Relative slowdown reported as a regression",
+                        type=float, default=0.15)
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = print_comparison(args.compare[0], load_results(args.compare[1]), args.tolerance)
+        exit(1 if regressions else 0)
+
+    rng = np.random.default_rng(args.seed)
+    rows = load_feature_rows(args.source, args.data_dir, args.frames, rng)
+    frames = [results_from_feature(row, rng=rng) for row in rows]
+    model = ASLClassificationModel.load_model(args.model_path)
+
+    meta = environment(PROJECT_ROOT)
+    meta.update(model=args.model_path, source=args.source, frames=args.frames,
+                resolution=[args.width, args.height], seed=args.seed)
+    print(f"⏱️ Benchmark {args.frames} khung hình ({args.source}, {args.width}x{args.height}), "
+          f"commit {meta['commit']}{' (có thay đổi chưa commit)' if meta['dirty'] else ''}")
+    results = run_suite(model, frames, args.width, args.height, rng)
+
+    print()
+    print(format_stats_table(results))
+    output = args.output or os.path.join("outputs", "benchmarks", f"{meta['commit'] or 'results'}.json")
+    save_results(output, results, meta)
+    print(f"\n💾 Đã lưu kết quả: {output}")
+
+    if args.baseline:
+        regressions = print_comparison(args.baseline, {"meta": meta, "results": results}, args.tolerance)
+        exit(1 if regressions else 0)
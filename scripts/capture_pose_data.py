@@ -3,6 +3,7 @@ import mediapipe as mp
 import argparse
 import time
 import os, sys
+import shutil
 
 # Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
 CURRENT_DIR = os.path.dirname(__file__)
@@ -11,6 +12,10 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from utils.feature_extraction import *
+from utils.visualizer import Visualizer
+from utils.dataset import DatasetStore
+from utils.capture_writer import CaptureWriter, load_capture
+from config import FACE_BACKEND, FACE_CENTER_OFFSET
 
 
 # Temporarily ignore warning
@@ -33,28 +38,42 @@ if __name__ == "__main__":
                         type=float, default=0.6)
     parser.add_argument("--duration", help="Duration to capture pose data",
                         type=int, default=60)
+    parser.add_argument("--dataset", help="Append to this dataset store instead of data/<pose_name>.npy",
+                        type=str, default=None)
+    parser.add_argument("--face_backend", help="Face centre backend",
+                        type=str, default=FACE_BACKEND, choices=FACE_BACKENDS)
+    parser.add_argument("--headless", help="Do not open a preview window (e.g. over SSH)",
+                        action="store_true")
+    parser.add_argument("--session_dir", help="Directory for the streamed capture session "
+                                              "(default: captures/<pose_name>-<timestamp>)",
+                        type=str, default=None)
+    parser.add_argument("--resume", help="Continue an interrupted capture session directory",
+                        type=str, default=None)
+    parser.add_argument("--chunk_rows", help="Rows buffered before each flush to disk",
+                        type=int, default=256)
+    parser.add_argument("--keep_session", help="Keep the session directory after saving",
+                        action="store_true")
     args = parser.parse_args()
 
+    # Mỗi khung hình được ghi ngay vào thư mục phiên; dừng đột ngột thì chạy lại với --resume
+    if args.resume:
+        writer = CaptureWriter.open(args.resume)
+        args.pose_name = writer.pose_name
+        print(f"Resuming {args.resume} ({writer.rows} samples so far)")
+    else:
+        session_dir = args.session_dir or os.path.join(
+            "captures", f"{args.pose_name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        writer = CaptureWriter.create(session_dir, args.pose_name, chunk_rows=args.chunk_rows)
+        print(f"Streaming samples to {session_dir}")
+
     # Initialize the webcam
     cap = cv2.VideoCapture(0)
 
-    # Firstly, wait 5 seconds to get ready
-    print("Get ready!")
-    time.sleep(5)
-    print("Capturing pose data")
-
-    # Record the start time
-    start_time = time.time()
-
-    # Get the array
-    pose_data = []
-
-    # Initialize MediaPipe Face Mesh
-    mp_face_mesh = mp.solutions.face_mesh
-    face_mesh = mp_face_mesh.FaceMesh(max_num_faces=1,
-                                      refine_landmarks=True,
-                                      min_detection_confidence=args.confidence,
-                                      min_tracking_confidence=args.confidence)
+    # Initialize the face backend (FaceMesh by default)
+    face_mesh = create_face_backend(args.face_backend,
+                                    min_detection_confidence=args.confidence,
+                                    min_tracking_confidence=args.confidence,
+                                    offset=FACE_CENTER_OFFSET)
 
     # Initialize MediaPipe Hands
     mp_hands = mp.solutions.hands
@@ -63,76 +82,94 @@ if __name__ == "__main__":
                            min_tracking_confidence=args.confidence)
 
     # Initialize drawing utility
-    mp_drawing = mp.solutions.drawing_utils
-    drawing_spec = mp_drawing.DrawingSpec(thickness=1, circle_radius=1)
-
-    # Set up the holistic model
-    while cap.isOpened():
-        # Check if duration has passed
-        if time.time() - start_time >= args.duration:
-            print("End capturing")
-            break
-
-        # Check if getting frame is successful
-        success, image = cap.read()
-        if not success:
-            print("Ignoring empty camera frame.")
-            continue
-
-        # Convert the image to RGB
-        image.flags.writeable = False
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
-        # Process the image and find faces
-        face_results = face_mesh.process(image)
-
-        # Process the image and find hands
-        hand_results = hands.process(image)
-
-        # Extract feature from face and hand results
-        feature = extract_features(mp_hands, face_results, hand_results)
-        pose_data.append(feature)
-
-        # Draw the face mesh annotations on the image
-        if face_results.multi_face_landmarks:
-            for face_landmarks in face_results.multi_face_landmarks:
-                mp_drawing.draw_landmarks(
-                    image=image,
-                    landmark_list=face_landmarks,
-                    connections=mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1)
-                )
-
-        # Draw the hand annotations on the image
-        if hand_results.multi_hand_landmarks:
-            for hand_landmarks in hand_results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(
-                    image=image,
-                    landmark_list=hand_landmarks,
-                    connections=mp_hands.HAND_CONNECTIONS,
-                    landmark_drawing_spec=mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
-                    connection_drawing_spec=mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2)
-                )
-
-        # Convert back to BGR to render
-        image.flags.writeable = True
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-        # Display the image
-        cv2.imshow('MediaPipe Face and Hand Detection', cv2.flip(image, 1))
-
-        # Press 'q' to quit
-        if cv2.waitKey(5) & 0xFF == ord('q'):
-            break
-
-    # Release the webcam and close windows
-    cap.release()
-    cv2.destroyAllWindows()
-
-    # Convert to numpy array and save
-    pose_data = np.array(pose_data)
+    visualizer = None if args.headless else Visualizer()
+
+    # Bộ đệm dùng lại cho mọi khung hình (không cấp phát mới trong vòng lặp)
+    extractor = FeatureExtractor()
+    frame = rgb = preview = None
+
+    # Firstly, wait 5 seconds to get ready
+    print("Get ready!")
+    time.sleep(5)
+    print("Capturing pose data")
+
+    # Record the start time
+    start_time = last_report = time.time()
+    start_rows = writer.rows
+
+    try:
+        while cap.isOpened():
+            # Check if duration has passed
+            now = time.time()
+            if now - start_time >= args.duration:
+                print("End capturing")
+                break
+
+            # Check if getting frame is successful
+            success, frame = cap.read(frame)
+            if not success:
+                print("Ignoring empty camera frame.")
+                continue
+
+            # Convert the image to RGB
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            rgb.flags.writeable = False
+
+            # Process the image and find faces
+            face_results = face_mesh.process(rgb)
+
+            # Process the image and find hands
+            hand_results = hands.process(rgb)
+
+            # Extract feature from face and hand results
+            writer.append(extractor.extract(face_results, hand_results))
+            rgb.flags.writeable = True
+
+            if args.headless:
+                if now - last_report >= 5:
+                    last_report = now
+                    captured = writer.rows - start_rows
+                    print(f"{captured} samples ({captured / (now - start_time):.1f}/s)", flush=True)
+                continue
+
+            # Draw the face and hand annotations on the image
+            visualizer.draw_landmarks(rgb, face_results, hand_results)
+
+            # Convert back to BGR to render
+            preview = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=preview)
+
+            # Display the image
+            cv2.imshow('MediaPipe Face and Hand Detection', cv2.flip(preview, 1, dst=preview))
+
+            # Press 'q' to quit
+            if cv2.waitKey(5) & 0xFF == ord('q'):
+                break
+    except KeyboardInterrupt:
+        print("Interrupted, saving what was captured")
+    finally:
+        writer.close()
+        # Release the webcam and close windows
+        cap.release()
+        if not args.headless:
+            cv2.destroyAllWindows()
+
+    # Chép ra RAM thay vì giữ memmap: trên Windows không xoá được file đang được map (rmtree bên dưới)
+    pose_data = np.array(load_capture(writer.root))
 
     # Save
-    np.save(f"data/{args.pose_name}.npy", pose_data)
-    print("Save pose data successfully!")
+    if len(pose_data) == 0:
+        print("No pose data captured, nothing saved.")
+    elif args.dataset:
+        # Thêm một phiên mới vào kho dữ liệu (không ghi lại dữ liệu cũ)
+        store = DatasetStore.open_or_create(args.dataset)
+        session = store.append(args.pose_name, pose_data,
+                               source=f"capture_pose_data {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"Appended {len(pose_data)} samples to {args.dataset} (session {session['id']})")
+    else:
+        # Giữ định dạng cũ của data/<pose_name>.npy (float64)
+        np.save(f"data/{args.pose_name}.npy", np.asarray(pose_data, dtype=np.float64))
+
+    if len(pose_data):
+        if not args.keep_session:
+            shutil.rmtree(writer.root)
+        print("Save pose data successfully!")
@@ -0,0 +1,30 @@
+import argparse
+import os, sys
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from utils.dataset import DatasetStore, import_pose_files
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Convert per-class .npy files to a dataset store")
+
+    parser.add_argument("--data_dir", help="Directory containing the per-class .npy files",
+                        type=str, default="data")
+    parser.add_argument("--output", help="Directory of the dataset store",
+                        type=str, default="data/dataset")
+    args = parser.parse_args()
+
+    store = DatasetStore.open_or_create(args.output)
+    added = import_pose_files(store, args.data_dir)
+
+    for session in added:
+        print(f"  + {session['class']}: {session['stop'] - session['start']} mẫu ({session['source']})")
+    if not added:
+        print("Không có file mới để chuyển đổi.")
+
+    size_mb = os.path.getsize(os.path.join(args.output, DatasetStore.FEATURES_FILE)) / 1e6
+    print(f"✅ {args.output}: {store.rows} mẫu, {len(store.classes)} lớp, {size_mb:.1f} MB")
@@ -0,0 +1,67 @@
+import argparse
+import glob
+import os, sys
+import time
+
+import numpy as np
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from config import MODEL_NAME
+from utils.model import ASLClassificationModel
+
+# Temporarily ignore warning
+import warnings
+warnings.filterwarnings("ignore")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Export SVC to NumPy inference engine (.aslm or .npz)")
+
+    parser.add_argument("--model_path", help="Path of the pickled (SVC, mapping) model",
+                        type=str, default=f"models/{os.path.splitext(MODEL_NAME)[0]}.pkl")
+    parser.add_argument("--output", help="Path of the exported engine (.aslm, or .npz for the bare arrays)",
+                        type=str, default=None)
+    parser.add_argument("--data_dir", help="Directory of .npy features used to verify the export",
+                        type=str, default="data")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.model_path)[0] + ".aslm"
+
+    model = ASLClassificationModel.load_model(args.model_path)
+    if output.endswith(".aslm"):
+        model.export_artifact(output)
+    else:
+        model.export_engine(output)
+    engine_model = ASLClassificationModel.load_model(output)
+    engine = engine_model.model
+    print(f"💾 Đã xuất engine: {output} ({os.path.getsize(output) / 1e6:.2f} MB, "
+          f"{engine.n_support_vectors} support vectors, {len(engine.classes_)} lớp)")
+
+    # Kiểm tra độ khớp với SVC gốc trên dữ liệu thật
+    files = sorted(glob.glob(os.path.join(args.data_dir, "*.npy")))
+    if not files:
+        print("⚠️ Không có dữ liệu để kiểm tra.")
+        exit(0)
+    X = np.vstack([np.load(f) for f in files])
+
+    start = time.perf_counter()
+    svc_labels = model.predict_batch(X)
+    svc_probas = model.model.predict_proba(X) if engine.probability else None
+    svc_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine_labels = engine_model.predict_batch(X)
+    engine_probas = engine.predict_proba(X) if engine.probability else None
+    engine_seconds = time.perf_counter() - start
+
+    print(f"→ Nhãn trùng khớp: {np.mean(svc_labels == engine_labels) * 100:.3f}% trên {len(X)} mẫu")
+    if svc_probas is not None:
+        print(f"→ Sai khác xác suất lớn nhất: {np.abs(svc_probas - engine_probas).max():.2e}")
+        print(f"→ argmax xác suất trùng khớp: "
+              f"{np.mean(svc_probas.argmax(axis=1) == engine_probas.argmax(axis=1)) * 100:.3f}%")
+    print(f"⏱️ sklearn: {svc_seconds:.2f}s, engine: {engine_seconds:.2f}s "
+          f"({svc_seconds / engine_seconds:.1f}x)")
@@ -0,0 +1,93 @@
+import argparse
+import glob
+import os, sys
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from config import SERVER_HOST, SERVER_PORT
+from utils.benchmark import latency_stats
+from utils.inference_server import InferenceClient
+from utils.synthetic import random_features
+
+
+def run_client(url, rows, duration, start_at):
+    """Một client (tiến trình riêng): gửi liên tục từng dòng, trả về độ trễ (giây) mỗi request."""
+    client = InferenceClient(url)
+    # Mọi client bắt đầu cùng lúc để đo đúng mức đồng thời
+    time.sleep(max(0.0, start_at - time.time()))
+    latencies, index = [], 0
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        client.predict_proba_batch(rows[index % len(rows)][None, :])
+        latencies.append(time.perf_counter() - start)
+        index += 1
+    return latencies
+
+
+def wait_for_server(url, timeout=30.0):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return InferenceClient(url)
+        except Exception:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Load generator for scripts/serve_model.py")
+
+    parser.add_argument("--url", help="Server URL", type=str, default=f"http://{SERVER_HOST}:{SERVER_PORT}")
+    parser.add_argument("--clients", help="Comma-separated client counts to test",
+                        type=str, default="1,2,4,8,16")
+    parser.add_argument("--duration", help="Seconds per client count", type=float, default=5.0)
+    parser.add_argument("--data_dir", help="Directory of .npy features to replay (random rows if empty)",
+                        type=str, default="data")
+    parser.add_argument("--spawn", help="Start scripts/serve_model.py for the test and stop it afterwards",
+                        action="store_true")
+    parser.add_argument("--server_args", help="Extra arguments for the spawned server, e.g. '--max_delay_ms 0'",
+                        type=str, default="")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.data_dir, "*.npy")))
+    rng = np.random.default_rng(0)
+    rows = (np.vstack([np.load(f) for f in files]) if files else random_features(1000, rng=rng))
+    rows = rows[rng.permutation(len(rows))[:2000]].astype(np.float32)
+
+    server = None
+    if args.spawn:
+        port = args.url.rsplit(":", 1)[-1]
+        server = subprocess.Popen([sys.executable, os.path.join(CURRENT_DIR, "serve_model.py"),
+                                   "--port", port, *args.server_args.split()])
+    try:
+        monitor = wait_for_server(args.url)
+        print(f"🎯 {args.url} - {args.duration:.0f}s cho mỗi mức client")
+        print(f"{'clients':>7} {'req/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'dòng/batch':>11}")
+        for clients in [int(c) for c in args.clients.split(",")]:
+            before = monitor.stats()
+            start_at = time.time() + 1.0
+            with ProcessPoolExecutor(max_workers=clients) as executor:
+                futures = [executor.submit(run_client, args.url, np.roll(rows, i * 97, axis=0),
+                                           args.duration, start_at) for i in range(clients)]
+                latencies = [latency for future in futures for latency in future.result()]
+            after = monitor.stats()
+            batches = after["batches"] - before["batches"]
+            batch_rows = (after["rows"] - before["rows"]) / batches if batches else 0.0
+            stats = latency_stats(latencies)
+            print(f"{clients:>7} {len(latencies) / args.duration:>9.0f} {stats['p50']:>9.2f} "
+                  f"{stats['p95']:>9.2f} {stats['p99']:>9.2f} {batch_rows:>11.1f}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,57 @@
+import argparse
+import os, sys
+import time
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from config import TTS_CACHE_DIR, TTS_CACHE_MAX_MB
+from utils.audio_cache import AudioCache
+from utils.strings import ExpressionHandler
+from utils.tts import TextToSpeech
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Pre-render the speech vocabulary into the TTS audio cache")
+
+    parser.add_argument("--engine", help="TTS engine(s) to render with",
+                        choices=["pyttsx3", "gtts", "both"], default="both")
+    parser.add_argument("--lang", help="Language code", type=str, default="vi")
+    parser.add_argument("--voice", help="pyttsx3 voice id (substring match)", type=str, default=None)
+    parser.add_argument("--rate", help="pyttsx3 speaking rate", type=int, default=None)
+    parser.add_argument("--cache_dir", help="Audio cache directory", type=str, default=TTS_CACHE_DIR)
+    parser.add_argument("--max_mb", help="Cache size limit (MB)", type=float, default=TTS_CACHE_MAX_MB)
+    parser.add_argument("--force", help="Render again even if a phrase is already cached",
+                        action="store_true")
+    args = parser.parse_args()
+
+    cache = AudioCache(args.cache_dir, max_bytes=int(args.max_mb * 2**20))
+    phrases = sorted(set(ExpressionHandler.SPEECH_MAPPING.values()))
+    engines = ["pyttsx3", "gtts"] if args.engine == "both" else [args.engine]
+
+    failed = 0
+    for engine in engines:
+        try:
+            tts = TextToSpeech(engine=engine, lang=args.lang, rate=args.rate, voice=args.voice, cache=cache)
+        except Exception as e:
+            print(f"⚠️ Bỏ qua {engine}: {e}")
+            failed += 1
+            continue
+        print(f"🔊 {engine} (voice: {tts.voice_key}, lang: {args.lang})")
+        for text in phrases:
+            start = time.perf_counter()
+            try:
+                path, rendered = tts.prerender(text, force=args.force)
+            except Exception as e:
+                print(f"  ❌ {text.strip()}: {e}")
+                failed += 1
+                continue
+            status = f"tạo mới {time.perf_counter() - start:.2f}s" if rendered else "đã có"
+            print(f"  ✓ {text.strip():<12} {os.path.getsize(path) / 1024:>7.1f} KB  ({status})")
+        tts.close()
+
+    print(f"\n💾 Cache: {args.cache_dir} - {len(cache.entries())} file, {cache.size() / 2**20:.2f} MB "
+          f"(giới hạn {args.max_mb:g} MB)")
+    exit(1 if failed else 0)
@@ -0,0 +1,44 @@
+import argparse
+import os, sys
+
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from config import MODEL_NAME, SERVER_HOST, SERVER_PORT, SERVER_MAX_BATCH, SERVER_MAX_DELAY_MS
+from utils.inference_server import InferenceServer
+from utils.model import ASLClassificationModel
+
+# Temporarily ignore warning
+import warnings
+warnings.filterwarnings("ignore")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Local inference server with micro-batching")
+
+    parser.add_argument("--model_path", help="Path of the ASL classification model",
+                        type=str, default=f"models/{MODEL_NAME}")
+    parser.add_argument("--host", help="Address to listen on", type=str, default=SERVER_HOST)
+    parser.add_argument("--port", help="Port to listen on", type=int, default=SERVER_PORT)
+    parser.add_argument("--max_batch", help="Maximum rows per micro-batch",
+                        type=int, default=SERVER_MAX_BATCH)
+    parser.add_argument("--max_delay_ms", help="Longest a request waits for others to join its batch",
+                        type=float, default=SERVER_MAX_DELAY_MS)
+    args = parser.parse_args()
+
+    model = ASLClassificationModel.load_model(args.model_path)
+    server = InferenceServer((args.host, args.port), model,
+                             max_batch=args.max_batch, max_delay_ms=args.max_delay_ms)
+    print(f"🚀 Đang phục vụ {args.model_path} tại http://{args.host}:{server.server_port} "
+          f"(batch ≤ {args.max_batch} dòng, chờ ≤ {args.max_delay_ms} ms). Ctrl+C để dừng.", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = server.batcher.stats()
+        print(f"\n📊 {stats['requests']} request, {stats['batches']} batch "
+              f"(trung bình {stats['mean_batch_rows']:.1f} dòng/batch)")
@@ -1,4 +1,4 @@
-import os
+import os, sys, csv, time
 import numpy as np
 import argparse
 import pickle
@@ -9,6 +9,23 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
 from datetime import datetime
 
+# Bảo đảm import được module utils khi chạy trực tiếp file trong thư mục scripts
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from utils.artifact import data_fingerprint
+from utils.coreset import REDUCTION_METHODS, reduce_per_class
+from utils.dataset import DatasetStore
+from utils.distill import distill
+from utils.kernel_approx import APPROX_METHODS, fit_approx, sweep_components
+from utils.hparam_search import (PRECOMPUTE_MAX_ROWS, grid_search, format_table, measure_latency, parse_grid,
+                                 scale_gamma)
+from utils.model import ASLClassificationModel
+from utils.ovo import PairCache, split_class, train_ovo
+from utils.svm_engine import RBFSVMEngine
+
 def plot_confusion_matrix(y_true, y_pred, classes, save_path):
     """Vẽ và lưu ma trận nhầm lẫn"""
     cm = confusion_matrix(y_true, y_pred)
@@ -22,31 +39,22 @@ def plot_confusion_matrix(y_true, y_pred, classes, save_path):
     print(f"📊 Đã lưu biểu đồ Confusion Matrix tại: {save_path}")
     plt.close()
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser("Training model")
-
-    parser.add_argument("--model_name", help="Name of the model",
-                        type=str, default="model")
-    parser.add_argument("--dir", help="Location of the model",
-                        type=str, default="models")
-    args = parser.parse_args()
-
-    print("=" * 80)
-    print(f"🧠 BẮT ĐẦU HUẤN LUYỆN MÔ HÌNH: {args.model_name}")
-    print("=" * 80)
+def load_pose_files(data_dir):
+    """
+    Đọc dữ liệu dạng cũ: mỗi lớp một file data/<lớp>.npy.
 
-    start_time = datetime.now()
+    Returns:
+        tuple: (X, y, mapping)
+    """
     X, y, mapping = [], [], dict()
 
-    data_dir = "data"
     if not os.path.exists(data_dir):
         print(f"❌ Lỗi: Không tìm thấy thư mục '{data_dir}'.")
         exit(1)
 
-    pose_files = list(os.scandir(data_dir))
-    
-    # Lọc chỉ lấy file .npy
-    pose_files = [f for f in pose_files if f.name.endswith('.npy')]
+    # Lọc chỉ lấy file .npy, sắp xếp để chỉ số lớp không phụ thuộc thứ tự của hệ điều hành
+    pose_files = sorted((f for f in os.scandir(data_dir) if f.name.endswith('.npy')),
+                        key=lambda f: f.name)
 
     if not pose_files:
         print(f"❌ Lỗi: Không tìm thấy dữ liệu .npy nào trong '{data_dir}'.")
@@ -55,7 +63,8 @@ if __name__ == "__main__":
     print(f"📂 Tìm thấy {len(pose_files)} file dữ liệu trong '{data_dir}'.")
     print("⏳ Đang tải dữ liệu...")
 
-    for current_class_index, pose_file in enumerate(pose_files):
+    current_class_index = 0
+    for pose_file in pose_files:
         file_path = os.path.join(data_dir, pose_file.name)
         try:
             pose_data = np.load(file_path)
@@ -63,11 +72,12 @@ if __name__ == "__main__":
             if pose_data.size == 0:
                 print(f"⚠️ Cảnh báo: File {pose_file.name} rỗng, bỏ qua.")
                 continue
-                
+
             X.append(pose_data)
             y += [current_class_index] * pose_data.shape[0]
             mapping[current_class_index] = pose_file.name.split(".")[0]
             print(f"  + Đã tải lớp '{mapping[current_class_index]}': {pose_data.shape[0]} mẫu")
+            current_class_index += 1
         except Exception as e:
             print(f"⚠️ Lỗi khi đọc file {pose_file.name}: {e}")
 
@@ -75,18 +85,437 @@ if __name__ == "__main__":
         print("❌ Không có dữ liệu hợp lệ để huấn luyện.")
         exit(1)
 
-    X, y = np.vstack(X), np.array(y)
+    return np.vstack(X), np.array(y), mapping
+
+
+def load_dataset_store(dataset_dir):
+    """
+    Đọc kho dữ liệu hợp nhất bằng memory-map (không nạp hay sao chép vào RAM).
+
+    Returns:
+        tuple: (X float32 memmap, y memmap, mapping)
+    """
+    store = DatasetStore(dataset_dir)
+    X, y = store.arrays()
+    print(f"📂 Kho dữ liệu '{dataset_dir}': {len(store.sessions)} phiên thu.")
+    counts = np.bincount(y, minlength=len(store.classes))
+    for index, name in store.mapping.items():
+        print(f"  + Lớp '{name}': {counts[index]} mẫu")
+
+    if store.rows == 0:
+        print("❌ Không có dữ liệu hợp lệ để huấn luyện.")
+        exit(1)
+    return X, y, store.mapping
+
+
+def run_search(X, y, args):
+    """Chạy tìm C/gamma song song, in bảng xếp hạng và lưu ra CSV."""
+    C_grid = parse_grid(args.C_grid)
+    gamma_grid = parse_grid(args.gamma_grid)
+    workers = args.workers or os.cpu_count()
+    mode = "ma trận khoảng cách tính sẵn" if len(y) <= args.precompute_max_rows else "kernel RBF của libsvm"
+    print(f"🔎 Tìm tham số: {len(C_grid)} C x {len(gamma_grid)} gamma x {args.folds} fold "
+          f"trên {workers} tiến trình ({mode})...")
+
+    def progress(done, total):
+        print(f"  → {done}/{total} tác vụ (fold, gamma)", end="\r")
+
+    results = grid_search(X, y, C_grid, gamma_grid, folds=args.folds, workers=workers,
+                          precompute_max_rows=args.precompute_max_rows, progress=progress)
+    print("\n" + "-" * 30)
+    print("KẾT QUẢ TÌM THAM SỐ (★ = không có cấu hình nào vừa chính xác hơn vừa nhanh hơn)")
+    print("-" * 30)
+    print(format_table(results))
+
+    os.makedirs(args.dir, exist_ok=True)
+    csv_path = os.path.join(args.dir, f"{args.model_name}_search.csv")
+    columns = ["C", "gamma", "accuracy", "accuracy_std", "n_support", "latency_us", "fit_seconds", "pareto"]
+    with open(csv_path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+    best = results[0]
+    print(f"\n💾 Bảng kết quả đã lưu tại: {csv_path}")
+    print(f"👉 Huấn luyện với cấu hình tốt nhất: --C {best['C']:g} --gamma {best['gamma']:.6g}")
+
+
+def split_per_class(X, y, mapping):
+    """
+    Chia train/test theo từng lớp để tập train của lớp không đổi khi lớp khác thay đổi
+    (cần cho --incremental: cache theo nội dung dữ liệu của từng lớp).
+
+    Returns:
+        tuple: (X_train, X_test, y_train, y_test) - các dòng được xếp theo thứ tự lớp.
+    """
+    train_parts, test_parts = [], []
+    for index in sorted(mapping):
+        class_rows = np.asarray(X[y == index])
+        train_index, test_index = split_class(len(class_rows), test_size=0.2, seed=42)
+        train_parts.append(class_rows[train_index])
+        test_parts.append(class_rows[test_index])
+
+    X_train, X_test = np.concatenate(train_parts), np.concatenate(test_parts)
+    y_train = np.repeat(np.arange(len(train_parts)), [len(part) for part in train_parts])
+    y_test = np.repeat(np.arange(len(test_parts)), [len(part) for part in test_parts])
+    return X_train, X_test, y_train, y_test
+
+
+def fit_svc(X_train, y_train, args):
+    # Cấu hình SVM: probability=True để có thể tính độ tin cậy (confidence score) sau này
+    gamma = args.gamma if args.gamma == "scale" else float(args.gamma)
+    model = SVC(decision_function_shape='ovo', kernel='rbf', C=args.C, gamma=gamma, probability=True)
+    return model.fit(X_train, y_train)
+
+
+def fit_incremental(X_train, y_train, mapping, args):
+    """Huấn luyện từng cặp one-vs-one, dùng lại các cặp đã cache (xem utils/ovo.py)."""
+    gamma = args.gamma
+    if gamma == "scale":
+        gamma = scale_gamma(X_train)
+        print(f"⚠️ gamma='scale' = {gamma:.6g} phụ thuộc toàn bộ dữ liệu: khi dữ liệu thay đổi, "
+              f"mọi cặp đều phải huấn luyện lại. Dùng --gamma <số> để chỉ huấn luyện lại các cặp bị ảnh hưởng.")
+    gamma = float(gamma)
+    train_parts = [X_train[y_train == index] for index in sorted(mapping)]
+
+    def progress(done, total, reused):
+        print(f"  → {done}/{total} cặp (dùng lại từ cache: {reused})", end="\r")
+
+    cache = PairCache(args.cache_dir)
+    model, reused, trained = train_ovo(train_parts, cache, args.C, gamma, probability=True,
+                                       params={"test_size": 0.2, "seed": 42}, progress=progress,
+                                       workers=args.workers)
+    print(f"\n♻️ Dùng lại {reused} cặp từ cache '{args.cache_dir}', huấn luyện mới {trained} cặp.")
+    return model
+
+
+def fit_parallel(X_train, y_train, mapping, args, workers=None, progress=True):
+    """
+    Huấn luyện các cặp one-vs-one trên nhiều tiến trình (không cache). Cùng các bài toán
+    nhị phân libsvm mà SVC giải tuần tự, nên model dự đoán như SVC(decision_function_shape='ovo').
+    """
+    gamma = scale_gamma(X_train) if args.gamma == "scale" else float(args.gamma)
+    train_parts = [X_train[y_train == index] for index in sorted(mapping)]
+
+    def report(done, total, reused):
+        print(f"  → {done}/{total} cặp", end="\r")
+
+    model, _, _ = train_ovo(train_parts, None, args.C, gamma, probability=True,
+                            progress=report if progress else None, workers=workers or args.workers)
+    if progress:
+        print()
+    return model
+
+
+def run_workers_sweep(X_train, y_train, X_test, mapping, args):
+    """Đo thời gian huấn luyện one-vs-one theo số tiến trình, so với SVC một nhân."""
+    counts = [int(value) for value in args.workers_sweep.split(",") if value.strip()]
+    n_pairs = len(mapping) * (len(mapping) - 1) // 2
+    print(f"🔎 Huấn luyện {n_pairs} cặp one-vs-one với {counts} tiến trình "
+          f"(máy có {os.cpu_count()} nhân, {len(y_train)} dòng train)")
+
+    start = time.perf_counter()
+    reference = fit_svc(X_train, y_train, args).predict(X_test)
+    svc_seconds = time.perf_counter() - start
+    print(f"{'Tiến trình':>12}{'Thời gian (s)':>16}{'Tăng tốc':>12}{'Hiệu suất':>12}{'Khớp SVC':>12}")
+    print(f"{'SVC':>12}{svc_seconds:>16.1f}{1.0:>11.2f}x{'':>12}{'':>12}")
+
+    results, baseline = [], None
+    for workers in counts:
+        start = time.perf_counter()
+        model = fit_parallel(X_train, y_train, mapping, args, workers=workers, progress=False)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds * counts[0]
+        agreement = float(np.mean(model.predict(X_test) == reference))
+        results.append({"workers": workers, "seconds": seconds, "speedup": svc_seconds / seconds,
+                        "efficiency": baseline / seconds / workers, "agreement": agreement})
+        print(f"{workers:>12}{seconds:>16.1f}{results[-1]['speedup']:>11.2f}x"
+              f"{results[-1]['efficiency'] * 100:>11.0f}%{agreement * 100:>11.2f}%")
+    return results
+
+
+def fit_approx_model(X_train, y_train, args):
+    """Xấp xỉ kernel RBF (Nyström / random Fourier features) + hồi quy logistic, xem utils/kernel_approx.py."""
+    gamma = scale_gamma(X_train) if args.gamma == "scale" else float(args.gamma)
+    return fit_approx(X_train, y_train, args.approx, args.n_components, gamma, args.C, seed=42)
+
+
+def run_approx_sweep(X_train, y_train, X_test, y_test, args):
+    """Đo độ chính xác / độ trễ theo số thành phần xấp xỉ kernel, in bảng và lưu CSV."""
+    components = [int(value) for value in args.approx_sweep.split(",") if value.strip()]
+    gamma = scale_gamma(X_train) if args.gamma == "scale" else float(args.gamma)
+    print(f"🔎 Quét số thành phần {args.approx} (C={args.C:g}, gamma={gamma:.6g}): {components}")
+    print(f"{'Thành phần':>12}{'Test accuracy':>16}{'Độ trễ (µs)':>14}{'Huấn luyện (s)':>16}")
+
+    def progress(result):
+        print(f"{result['n_components']:>12}{result['accuracy'] * 100:>15.2f}%"
+              f"{result['latency_us']:>14.1f}{result['fit_seconds']:>16.1f}")
+
+    results = sweep_components(X_train, y_train, X_test, y_test, args.approx, components, gamma, args.C,
+                               seed=42, progress=progress)
+
+    os.makedirs(args.dir, exist_ok=True)
+    csv_path = os.path.join(args.dir, f"{args.model_name}_{args.approx}_sweep.csv")
+    with open(csv_path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=["n_components", "accuracy", "latency_us", "fit_seconds"])
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"\n💾 Bảng kết quả đã lưu tại: {csv_path}")
+
+
+def reduction_params(args):
+    return {"cell": args.grid_cell, "fraction": args.kcenter_fraction, "radius": args.kcenter_radius}
+
+
+def reduce_training_set(X_train, y_train, mapping, args):
+    """Bỏ các dòng gần trùng trong từng lớp của tập train (tập test giữ nguyên)."""
+    keep, report = reduce_per_class(X_train, y_train, args.reduce, **reduction_params(args))
+    print(f"✂️ Giảm dữ liệu train ({args.reduce}):")
+    for label, (before, after) in report.items():
+        print(f"  → {mapping[label]:<14} {before:>6} → {after:>6} dòng ({after / before * 100:5.1f}%)")
+    print(f"  → Tổng: {len(y_train)} → {len(keep)} dòng\n")
+    return X_train[keep], y_train[keep]
+
+
+def count_support_vectors(model):
+    if hasattr(model, "support_vectors_"):
+        return int(model.support_vectors_.shape[0])
+    if hasattr(model, "n_components"):
+        # Xấp xỉ kernel: số thành phần đóng vai trò của số support vector
+        return int(model.n_components)
+    return int(model.n_support_vectors)
+
+
+def describe_size(model):
+    if hasattr(model, "n_components"):
+        return f"{model.n_components} thành phần"
+    return f"{count_support_vectors(model)} support vectors"
+
+
+def print_reduction_report(full, reduced):
+    """Bảng so sánh huấn luyện trên toàn bộ tập train và trên tập đã giảm."""
+    def change(before, after):
+        return f"{(after - before) / before * 100:+.1f}%" if before else "-"
+
+    print("\n" + "-" * 30)
+    print("SO SÁNH VỚI DỮ LIỆU ĐẦY ĐỦ")
+    print("-" * 30)
+    print(f"{'':<18}{'Đầy đủ':>10}{'Rút gọn':>10}{'Thay đổi':>12}")
+    print(f"{'Dòng train':<18}{full['rows']:>10}{reduced['rows']:>10}{change(full['rows'], reduced['rows']):>12}")
+    print(f"{'Thời gian (s)':<18}{full['seconds']:>10.1f}{reduced['seconds']:>10.1f}"
+          f"{change(full['seconds'], reduced['seconds']):>12}")
+    print(f"{'Support vectors':<18}{full['support_vectors']:>10}{reduced['support_vectors']:>10}"
+          f"{change(full['support_vectors'], reduced['support_vectors']):>12}")
+    delta = (reduced['accuracy'] - full['accuracy']) * 100
+    print(f"{'Test accuracy':<18}{full['accuracy'] * 100:>9.2f}%{reduced['accuracy'] * 100:>9.2f}%"
+          f"{delta:>+8.2f} điểm")
+
+
+def distill_student(model, X_train, X_test, y_test, args):
+    """
+    Chưng cất model SVM (thầy) thành MLP nhỏ (trò) theo xác suất của thầy, rồi so sánh
+    độ chính xác, mức độ trùng khớp và độ trễ dự đoán một dòng.
+
+    Returns:
+        tuple: (student, report)
+    """
+    teacher = model if hasattr(model, "to_arrays") else RBFSVMEngine.from_svc(model)
+    hidden = tuple(int(size) for size in args.student_hidden.split(",") if size.strip())
+    print(f"\n🎓 Đang chưng cất thành MLP {list(hidden)} ({args.student_epochs} epoch, "
+          f"{args.distill_augment} bản sao nhiễu/dòng)...")
+
+    def progress(done, total):
+        print(f"  → epoch {done}/{total}", end="\r")
+
+    start = time.perf_counter()
+    student, rows = distill(teacher, X_train, hidden=hidden, epochs=args.student_epochs,
+                            augment=args.distill_augment, noise=args.distill_noise, seed=42, progress=progress)
+    seconds = time.perf_counter() - start
+
+    teacher_pred, student_pred = teacher.predict(X_test), student.predict(X_test)
+    report = {
+        "hidden": list(hidden),
+        "epochs": args.student_epochs,
+        "augment": args.distill_augment,
+        "noise": args.distill_noise,
+        "rows": rows,
+        "seconds": round(seconds, 2),
+        "agreement": float(np.mean(teacher_pred == student_pred)),
+        "teacher_accuracy": float(accuracy_score(y_test, teacher_pred)),
+        "student_accuracy": float(accuracy_score(y_test, student_pred)),
+        "teacher_latency_us": measure_latency(teacher, X_test),
+        "student_latency_us": measure_latency(student, X_test),
+    }
+
+    print("\n" + "-" * 30)
+    print("KẾT QUẢ CHƯNG CẤT")
+    print("-" * 30)
+    print(f"Dữ liệu chưng cất: {rows} dòng, {seconds:.1f} giây")
+    print(f"{'':<22}{'Thầy':>14}{'Trò (MLP)':>14}")
+    print(f"{'Test accuracy':<22}{report['teacher_accuracy'] * 100:>13.2f}%{report['student_accuracy'] * 100:>13.2f}%")
+    print(f"{'Độ trễ 1 dòng (µs)':<22}{report['teacher_latency_us']:>14.1f}{report['student_latency_us']:>14.1f}")
+    print(f"{'Kích thước':<22}{describe_size(teacher):>14}  {student.n_parameters} tham số")
+    print(f"✅ Trùng khớp với thầy trên tập test: {report['agreement'] * 100:.2f}% "
+          f"(nhanh hơn {report['teacher_latency_us'] / report['student_latency_us']:.0f} lần)")
+    return student, report
+
+
+def save_model(model, mapping, name, hyperparameters, training_data, args):
+    """Lưu model theo --format; trả về danh sách đường dẫn đã ghi."""
+    os.makedirs(args.dir, exist_ok=True)
+    model_paths = []
+    if args.format in ("pkl", "both"):
+        model_paths.append(os.path.join(args.dir, f"{name}.pkl"))
+        with open(model_paths[-1], "wb") as file:
+            pickle.dump((model, mapping), file)
+    if args.format in ("aslm", "both"):
+        model_paths.append(os.path.join(args.dir, f"{name}.aslm"))
+        ASLClassificationModel(model, mapping).export_artifact(model_paths[-1], hyperparameters, training_data)
+    return model_paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Training model")
+
+    parser.add_argument("--model_name", help="Name of the model",
+                        type=str, default="model")
+    parser.add_argument("--dir", help="Location of the model",
+                        type=str, default="models")
+    parser.add_argument("--data_dir", help="Directory containing the per-class .npy files",
+                        type=str, default="data")
+    parser.add_argument("--dataset", help="Dataset store directory (see scripts/convert_dataset.py); "
+                                          "overrides --data_dir",
+                        type=str, default=None)
+    parser.add_argument("--C", help="SVM regularisation parameter",
+                        type=float, default=100.0)
+    parser.add_argument("--gamma", help="RBF kernel gamma ('scale' or a number)",
+                        type=str, default="scale")
+    parser.add_argument("--search", help="Cross-validate a C/gamma grid instead of training a model",
+                        action="store_true")
+    parser.add_argument("--C_grid", help="Comma-separated C values for --search",
+                        type=str, default="1,10,100,1000")
+    parser.add_argument("--gamma_grid", help="Comma-separated gamma values for --search ('scale' allowed)",
+                        type=str, default="scale,0.05,0.1,0.2,0.5")
+    parser.add_argument("--folds", help="Number of cross-validation folds for --search",
+                        type=int, default=3)
+    parser.add_argument("--workers", help="Worker processes for --search, --parallel and --incremental "
+                                          "(default: all cores)",
+                        type=int, default=None)
+    parser.add_argument("--precompute_max_rows",
+                        help="Reuse one precomputed distance matrix across gammas up to this many rows",
+                        type=int, default=PRECOMPUTE_MAX_ROWS)
+    parser.add_argument("--incremental", help="Train one-vs-one pairs separately and reuse cached pairs "
+                                              "whose classes did not change",
+                        action="store_true")
+    parser.add_argument("--parallel", help="Fit the one-vs-one SVM pairs on --workers processes "
+                                           "(same model as the default single-core SVC)",
+                        action="store_true")
+    parser.add_argument("--workers_sweep", help="Comma-separated worker counts: report one-vs-one training "
+                                                "time and speedup for each instead of training a model",
+                        type=str, default=None)
+    parser.add_argument("--format", help="Model file(s) to write: pickle, versioned .aslm, or both",
+                        choices=["pkl", "aslm", "both"], default="both")
+    parser.add_argument("--reduce", help="Drop near-duplicate training rows per class: grid hashing or k-center",
+                        choices=REDUCTION_METHODS, default="none")
+    parser.add_argument("--grid_cell", help="Grid cell size for --reduce grid (feature units)",
+                        type=float, default=0.02)
+    parser.add_argument("--kcenter_fraction", help="Fraction of each class kept by --reduce kcenter",
+                        type=float, default=0.25)
+    parser.add_argument("--kcenter_radius", help="Stop k-center once every row is within this distance "
+                                                 "(overrides --kcenter_fraction)",
+                        type=float, default=None)
+    parser.add_argument("--compare_full", help="Also train on the full training split and report the "
+                                               "time, support-vector and accuracy differences",
+                        action="store_true")
+    parser.add_argument("--distill", help="Also distill the SVM into a small NumPy MLP trained on its "
+                                          "probabilities and save it as <model_name>_student",
+                        action="store_true")
+    parser.add_argument("--student_hidden", help="Comma-separated hidden layer sizes of the distilled MLP",
+                        type=str, default="64")
+    parser.add_argument("--student_epochs", help="Training epochs for the distilled MLP",
+                        type=int, default=100)
+    parser.add_argument("--distill_augment", help="Jittered copies of each training row labelled by the SVM",
+                        type=int, default=2)
+    parser.add_argument("--distill_noise", help="Standard deviation of the jitter for --distill_augment",
+                        type=float, default=0.01)
+    parser.add_argument("--approx", help="Replace the exact SVM by an approximate RBF kernel map "
+                                         "(Nystroem or random Fourier features) + logistic regression (uses --C)",
+                        choices=("none",) + APPROX_METHODS, default="none")
+    parser.add_argument("--n_components", help="Size of the approximate kernel map for --approx",
+                        type=int, default=500)
+    parser.add_argument("--approx_sweep", help="Comma-separated n_components values: report test accuracy and "
+                                               "latency for each instead of training a model (needs --approx)",
+                        type=str, default=None)
+    parser.add_argument("--cache_dir", help="Cache directory for --incremental (default: <dir>/cache)",
+                        type=str, default=None)
+    args = parser.parse_args()
+    args.cache_dir = args.cache_dir or os.path.join(args.dir, "cache")
+    if args.approx != "none" and (args.incremental or args.parallel):
+        parser.error("--approx cannot be combined with --incremental or --parallel")
+    if args.approx_sweep and args.approx == "none":
+        parser.error("--approx_sweep needs --approx nystroem or --approx rff")
+
+    print("=" * 80)
+    print(f"🧠 BẮT ĐẦU HUẤN LUYỆN MÔ HÌNH: {args.model_name}")
+    print("=" * 80)
+
+    start_time = datetime.now()
+
+    if args.dataset:
+        if not DatasetStore.exists(args.dataset):
+            print(f"❌ Lỗi: Không tìm thấy kho dữ liệu '{args.dataset}' "
+                  f"(tạo bằng scripts/convert_dataset.py).")
+            exit(1)
+        X, y, mapping = load_dataset_store(args.dataset)
+    else:
+        X, y, mapping = load_pose_files(args.data_dir)
+
     print(f"✅ Tải dữ liệu thành công.")
     print(f"→ Tổng số mẫu: {X.shape[0]}")
     print(f"→ Số lượng lớp: {len(mapping)} ({list(mapping.values())})\n")
 
-    print("🚀 Đang huấn luyện mô hình SVM...")
-    # Chia tập train/test tỉ lệ 80/20
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    if args.search:
+        run_search(X, y, args)
+        print(f"⏱️ Hoàn thành trong {(datetime.now() - start_time).seconds} giây.")
+        print("=" * 80)
+        exit(0)
 
-    # Cấu hình SVM: probability=True để có thể tính độ tin cậy (confidence score) sau này
-    model = SVC(decision_function_shape='ovo', kernel='rbf', C=100.0, gamma='scale', probability=True)
-    model.fit(X_train, y_train)
+    if args.incremental:
+        X_train, X_test, y_train, y_test = split_per_class(X, y, mapping)
+        fit = lambda X_fit, y_fit: fit_incremental(X_fit, y_fit, mapping, args)
+    else:
+        # Chia tập train/test tỉ lệ 80/20
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        if args.approx != "none":
+            fit = lambda X_fit, y_fit: fit_approx_model(X_fit, y_fit, args)
+        elif args.parallel:
+            fit = lambda X_fit, y_fit: fit_parallel(X_fit, y_fit, mapping, args)
+        else:
+            fit = lambda X_fit, y_fit: fit_svc(X_fit, y_fit, args)
+
+    X_train_full, y_train_full = X_train, y_train
+    if args.reduce != "none":
+        X_train, y_train = reduce_training_set(X_train, y_train, mapping, args)
+
+    if args.approx_sweep:
+        run_approx_sweep(X_train, y_train, X_test, y_test, args)
+        print(f"⏱️ Hoàn thành trong {(datetime.now() - start_time).seconds} giây.")
+        print("=" * 80)
+        exit(0)
+
+    if args.workers_sweep:
+        run_workers_sweep(X_train, y_train, X_test, mapping, args)
+        print(f"⏱️ Hoàn thành trong {(datetime.now() - start_time).seconds} giây.")
+        print("=" * 80)
+        exit(0)
+
+    if args.approx != "none":
+        print(f"🚀 Đang huấn luyện mô hình xấp xỉ kernel ({args.approx}, {args.n_components} thành phần)...")
+    else:
+        print("🚀 Đang huấn luyện mô hình SVM...")
+    fit_start = time.perf_counter()
+    model = fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - fit_start
 
     # Đánh giá
     y_train_pred = model.predict(X_train)
@@ -103,12 +532,43 @@ if __name__ == "__main__":
     print(f"Classes: {len(mapping)}")
     print(f"✅ Train Accuracy: {train_accuracy * 100:.2f}%")
     print(f"✅ Test Accuracy:  {test_accuracy * 100:.2f}%")
+    print(f"⏱️ Thời gian huấn luyện: {fit_seconds:.1f} giây, {describe_size(model)}")
+
+    if args.reduce != "none" and args.compare_full:
+        print("\n🚀 Đang huấn luyện mô hình đối chứng trên toàn bộ tập train...")
+        full_start = time.perf_counter()
+        full_model = fit(X_train_full, y_train_full)
+        full_seconds = time.perf_counter() - full_start
+        print_reduction_report(
+            {"rows": len(y_train_full), "seconds": full_seconds,
+             "support_vectors": count_support_vectors(full_model),
+             "accuracy": accuracy_score(y_test, full_model.predict(X_test))},
+            {"rows": len(y_train), "seconds": fit_seconds,
+             "support_vectors": count_support_vectors(model), "accuracy": test_accuracy})
 
     # Lưu model
-    os.makedirs(args.dir, exist_ok=True)
-    model_path = os.path.join(args.dir, f"{args.model_name}.pkl")
-    with open(model_path, "wb") as file:
-        pickle.dump((model, mapping), file)
+    hyperparameters = {
+        "kernel": "rbf",
+        "C": args.C,
+        "gamma": float(getattr(model, "_gamma", getattr(model, "gamma", 0.0))),
+        "probability": True,
+        "incremental": args.incremental,
+        "reduction": {"method": args.reduce, **reduction_params(args)} if args.reduce != "none" else None,
+        "approximation": {"method": args.approx, "n_components": model.n_components} if args.approx != "none" else None,
+    }
+    training_data = {
+        "sha256": data_fingerprint(X, y),
+        "rows": int(X.shape[0]),
+        "train_rows": int(len(y_train)),
+        "source": args.dataset or args.data_dir,
+    }
+    model_paths = save_model(model, mapping, args.model_name, hyperparameters, training_data, args)
+
+    if args.distill:
+        student, report = distill_student(model, X_train, X_test, y_test, args)
+        student_hyperparameters = {"kind": "mlp", "distillation": report, "teacher": hyperparameters}
+        model_paths += save_model(student, mapping, f"{args.model_name}_student",
+                                  student_hyperparameters, training_data, args)
 
     # Vẽ Confusion Matrix
     try:
@@ -124,6 +584,6 @@ if __name__ == "__main__":
         print(f"\n⚠️ Không thể vẽ biểu đồ (có thể thiếu thư viện matplotlib/seaborn): {e}")
 
     duration = (datetime.now() - start_time).seconds
-    print(f"\n💾 Model đã lưu tại: {model_path}")
+    print(f"\n💾 Model đã lưu tại: {', '.join(model_paths)}")
     print(f"⏱️ Hoàn thành trong {duration} giây.")
     print("=" * 80)
@@ -0,0 +1,39 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from utils.model import ASLClassificationModel
+
+# Model cũ: train.py bỏ qua file rỗng mà không đánh số lại → khoá lớp có chỗ trống
+MAPPING = {0: "a", 2: "b", 3: "c"}
+
+
+@pytest.fixture(scope="module")
+def gapped_model():
+    from sklearn.svm import SVC
+
+    rng = np.random.default_rng(0)
+    X = np.vstack([rng.normal(centre, 0.05, (30, 86)) for centre in (0.2, 0.5, 0.8)])
+    y = np.repeat(list(MAPPING), 30)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        svc = SVC(kernel="rbf", C=10.0, gamma="scale", probability=True, random_state=0).fit(X, y)
+    return ASLClassificationModel(svc, MAPPING), X[[0, 30, 60]]
+
+
+@pytest.mark.parametrize("suffix", [".aslm", ".npz"])
+def test_export_round_trip_keeps_gapped_keys(gapped_model, tmp_path, suffix):
+    model, rows = gapped_model
+    path = str(tmp_path / f"model{suffix}")
+    if suffix == ".aslm":
+        model.export_artifact(path)
+    else:
+        model.export_engine(path)
+
+    loaded = ASLClassificationModel.load_model(path)
+    assert loaded.mapping == MAPPING
+    assert loaded.predict_batch(rows).tolist() == ["a", "b", "c"]
+    for row, expected in zip(rows, ["a", "b", "c"]):
+        label, confidence = loaded.predict_with_confidence(row)
+        assert label == expected and confidence > 0.5
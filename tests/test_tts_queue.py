@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from utils.tts import TextToSpeech
+
+
+@pytest.fixture
+def make_tts(monkeypatch):
+    """TextToSpeech với backend giả: mỗi câu 'đọc' mất `duration` giây."""
+    created = []
+
+    def make(duration, **kwargs):
+        monkeypatch.setattr(TextToSpeech, "_init_backend", lambda self, *args: None)
+        monkeypatch.setattr(TextToSpeech, "_speak_blocking", lambda self, text: time.sleep(duration))
+        tts = TextToSpeech(engine="gtts", **kwargs)
+        created.append(tts)
+        return tts
+
+    yield make
+    for tts in created:
+        tts.close()
+
+
+def wait_for(tts, finished, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = tts.stats()
+        if stats["spoken"] + stats["cancelled"] >= finished:
+            return stats
+        time.sleep(0.02)
+    raise AssertionError(f"TTS worker did not finish: {tts.stats()}")
+
+
+def test_gap_longer_than_max_age_is_not_stale(make_tts):
+    # Câu B chờ khoảng lặng min_gap (dài hơn max_age) sau câu A → vẫn được đọc
+    tts = make_tts(0.05, max_age=0.3)
+    tts.speak("A", min_gap=1.0)
+    time.sleep(0.2)
+    tts.speak("B", min_gap=1.0)
+    stats = wait_for(tts, 2)
+    assert stats["spoken"] == 2 and stats["cancelled"] == 0
+
+
+def test_request_queued_behind_long_utterance_is_cancelled(make_tts):
+    # Câu B phải chờ câu A (0.6 giây) đọc xong, lâu hơn max_age → bị huỷ
+    tts = make_tts(0.6, max_age=0.2)
+    tts.speak("A")
+    time.sleep(0.1)
+    tts.speak("B")
+    stats = wait_for(tts, 2)
+    assert stats["spoken"] == 1 and stats["cancelled"] == 1
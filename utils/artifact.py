@@ -0,0 +1,160 @@
+"""
+Định dạng model `.aslm`: header JSON có phiên bản + các mảng thô, nạp bằng memory-map.
+
+Bố cục file:
+    b"ASLM"                 magic (4 byte)
+    uint32 little-endian    phiên bản định dạng
+    uint64 little-endian    độ dài header JSON (đã đệm)
+    header JSON (UTF-8)     backend, lớp, bố cục đặc trưng, siêu tham số, hash dữ liệu train,
+                            và vị trí/kiểu/kích thước của từng mảng
+    các mảng                dữ liệu thô C-order, mỗi mảng bắt đầu ở offset chia hết cho 64
+
+Khác pickle: không cần đúng phiên bản sklearn, không chạy code khi nạp, và các mảng
+lớn (support vector, hệ số) chỉ là view trên file đã memory-map - nạp gần như tức thì,
+hệ điều hành tự đọc trang khi cần và chia sẻ giữa các tiến trình.
+"""
+import hashlib
+import importlib
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from utils.feature_extraction import FACE_FEATURE_SIZE, FEATURE_SIZE, LEFT_HAND_SLICE, RIGHT_HAND_SLICE
+
+MAGIC = b"ASLM"
+FORMAT_VERSION = 1
+_ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<4sIQ")
+
+# Backend → lớp engine (import khi cần, để nạp model chỉ kéo theo module thật sự dùng)
+BACKENDS = {
+    "rbf_svm": ("utils.svm_engine", "RBFSVMEngine"),
+    "mlp": ("utils.mlp_engine", "MLPEngine"),
+    "nystroem": ("utils.kernel_approx", "NystroemEngine"),
+    "rff": ("utils.kernel_approx", "RFFEngine"),
+}
+
+FEATURE_LAYOUT = {
+    "size": FEATURE_SIZE,
+    "face_center": [0, FACE_FEATURE_SIZE],
+    "right_hand": [RIGHT_HAND_SLICE.start, RIGHT_HAND_SLICE.stop],
+    "left_hand": [LEFT_HAND_SLICE.start, LEFT_HAND_SLICE.stop],
+}
+
+
+def data_fingerprint(*arrays):
+    """sha256 của các mảng dữ liệu huấn luyện (gồm dtype và kích thước)."""
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(memoryview(array).cast("B"))
+    return digest.hexdigest()
+
+
+def backend_name(engine):
+    for name, (module, class_name) in BACKENDS.items():
+        if type(engine).__module__ == module and type(engine).__name__ == class_name:
+            return name
+    raise ValueError(f"No .aslm backend registered for {type(engine).__name__}")
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def save_artifact(path, engine, labels, hyperparameters=None, training_data=None, keys=None):
+    """
+    Ghi `engine` (có `to_arrays()`) và bảng nhãn ra file `.aslm`.
+
+    Args:
+        labels: Tên lớp theo thứ tự khoá lớp.
+        keys: Giá trị lớp mà engine trả về (`classes_`) cho từng nhãn; mặc định 0..k-1.
+            Cần khi khoá có chỗ trống (model cũ bỏ qua file dữ liệu rỗng).
+        hyperparameters: dict siêu tham số (ghi nguyên vào header).
+        training_data: dict mô tả dữ liệu train, ví dụ {"sha256": ..., "rows": ...}.
+    """
+    arrays = {name: np.asarray(array, order="C") for name, array in engine.to_arrays().items()}
+    header = {
+        "format_version": FORMAT_VERSION,
+        "backend": backend_name(engine),
+        "classes": [str(label) for label in labels],
+        "class_keys": np.asarray(range(len(labels)) if keys is None else keys).tolist(),
+        "feature_layout": FEATURE_LAYOUT,
+        "hyperparameters": hyperparameters or {},
+        "training_data": training_data,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "arrays": {},
+    }
+
+    # Offset của mảng phụ thuộc độ dài header → ước lượng, rồi đệm header tới đúng ranh giới
+    def layout(header_size):
+        offset, table = _align(_PREAMBLE.size + header_size), {}
+        for name, array in arrays.items():
+            table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset = _align(offset + array.nbytes)
+        return table
+
+    header_size = 0
+    while True:
+        header["arrays"] = layout(header_size)
+        encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        if len(encoded) <= header_size:
+            break
+        header_size = _align(len(encoded) + _ALIGNMENT)
+    encoded = encoded.ljust(header_size)
+
+    # Ghi file tạm rồi đổi tên → không bao giờ để lại model ghi dở
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_size))
+        file.write(encoded)
+        for name, array in arrays.items():
+            file.seek(header["arrays"][name]["offset"])
+            file.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_header(path):
+    """Chỉ đọc header JSON (không đụng tới các mảng)."""
+    with open(path, "rb") as file:
+        magic, version, header_size = _PREAMBLE.unpack(file.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not an .aslm model file: {path}")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported .aslm format version {version} "
+                             f"(this code reads up to {FORMAT_VERSION})")
+        return json.loads(file.read(header_size).decode("utf-8"))
+
+
+def load_artifact(path):
+    """
+    Nạp file `.aslm`.
+
+    Returns:
+        tuple: (engine, mapping, header) - mapping là {khoá lớp: nhãn} (file cũ không có
+        "class_keys" → khoá 0..k-1); các mảng của engine là view read-only trên memmap.
+    """
+    header = read_header(path)
+    if header["backend"] not in BACKENDS:
+        raise ValueError(f"Unknown .aslm backend: {header['backend']}")
+    if header["feature_layout"]["size"] != FEATURE_SIZE:
+        raise ValueError(f"Model expects {header['feature_layout']['size']} features, "
+                         f"this build extracts {FEATURE_SIZE}")
+
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                     offset=spec["offset"]).reshape(spec["shape"])
+
+    module, class_name = BACKENDS[header["backend"]]
+    engine_class = getattr(importlib.import_module(module), class_name)
+    keys = header.get("class_keys", range(len(header["classes"])))
+    return engine_class.from_arrays(arrays), dict(zip(keys, header["classes"])), header
@@ -0,0 +1,109 @@
+"""
+Cache âm thanh TTS trên đĩa cho bộ từ vựng cố định (`ExpressionHandler.SPEECH_MAPPING`).
+
+Mỗi câu được tổng hợp một lần và lưu theo khoá (engine, voice, lang, text); các lần đọc
+sau chỉ phát file có sẵn - không gọi mạng (gTTS), không tổng hợp lại (pyttsx3).
+Khi tổng dung lượng vượt `max_bytes`, các file lâu không dùng nhất bị xoá (LRU theo mtime).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """Chuẩn hoá câu trước khi lập khoá: NFC + bỏ khoảng trắng thừa ("Buổi sáng " = "Buổi sáng")."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class AudioCache:
+    """
+    Ví dụ:
+        cache = AudioCache("outputs/tts_cache", max_bytes=50 * 2**20)
+        path = cache.get("gtts", "com", "vi", "Xin chào")      # None nếu chưa có
+        path = cache.put("gtts", "com", "vi", "Xin chào", ".mp3", lambda tmp: tts.save(tmp))
+    """
+
+    def __init__(self, cache_dir, max_bytes=50 * 2**20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(engine, voice, lang, text):
+        payload = json.dumps([engine, voice or "", lang, normalize_text(text)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _find(self, key):
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(key) and not name.endswith(".tmp"):
+                return os.path.join(self.cache_dir, name)
+        return None
+
+    def get(self, engine, voice, lang, text):
+        """Đường dẫn file âm thanh đã lưu, hoặc None. Lần dùng được ghi lại cho LRU."""
+        path = self._find(self.key(engine, voice, lang, text))
+        if path is not None:
+            try:
+                os.utime(path)
+            except OSError:
+                return None  # vừa bị xoá bởi tiến trình khác
+        return path
+
+    def put(self, engine, voice, lang, text, suffix, render):
+        """
+        Gọi `render(tmp_path)` để ghi âm thanh ra file tạm, rồi đưa vào cache (ghi nguyên tử).
+
+        Returns:
+            str: đường dẫn file trong cache.
+        """
+        path = os.path.join(self.cache_dir, self.key(engine, voice, lang, text) + suffix)
+        fd, tmp_path = tempfile.mkstemp(suffix=suffix + ".tmp", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            render(tmp_path)
+            if os.path.getsize(tmp_path) == 0:
+                raise RuntimeError(f"TTS engine '{engine}' produced no audio for '{text}'")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+        return path
+
+    def entries(self):
+        """[(path, size, mtime)] của các file trong cache, cũ nhất trước."""
+        items = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            items.append((path, stat.st_size, stat.st_mtime))
+        return sorted(items, key=lambda item: item[2])
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Xoá các file lâu không dùng nhất tới khi tổng dung lượng ≤ `max_bytes`. Trả về số file đã xoá."""
+        with self._lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            return removed
@@ -0,0 +1,114 @@
+"""
+Tiện ích đo độ trễ: phân vị p50/p95/p99, lưu kết quả JSON kèm thông tin môi trường,
+và so sánh hai lần đo để phát hiện hồi quy hiệu năng giữa các commit.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+
+import numpy as np
+
+BENCHMARK_VERSION = 1
+PERCENTILES = (50, 95, 99)
+
+
+def latency_stats(samples):
+    """Thống kê (ms) của danh sách thời gian đo bằng giây."""
+    samples_ms = np.asarray(samples, dtype=np.float64) * 1e3
+    stats = {f"p{q}": float(np.percentile(samples_ms, q)) for q in PERCENTILES}
+    stats.update(mean=float(samples_ms.mean()), min=float(samples_ms.min()),
+                 max=float(samples_ms.max()), n=int(len(samples_ms)))
+    return stats
+
+
+def time_each(fn, inputs, warmup=20):
+    """
+    Gọi `fn(*args)` với từng phần tử của `inputs` và đo riêng từng lần gọi.
+
+    Returns:
+        list: Thời gian (giây) của mỗi lần gọi, không tính các lần làm nóng.
+    """
+    for args in inputs[:warmup]:
+        fn(*args)
+    samples = []
+    for args in inputs:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def environment(root="."):
+    """Thông tin giúp hai lần đo so sánh được: commit, Python, NumPy, CPU."""
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=root, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except Exception:
+            return None
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path, results, meta):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"version": BENCHMARK_VERSION, "meta": meta, "results": results},
+                  file, ensure_ascii=False, indent=2)
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if data.get("version") != BENCHMARK_VERSION:
+        raise ValueError(f"Unsupported benchmark file version: {data.get('version')}")
+    return data
+
+
+def compare_results(baseline, current, tolerance=0.15, metrics=("p50", "p95")):
+    """
+    So sánh từng case có trong cả hai lần đo.
+
+    Returns:
+        tuple: (rows, regressions) - rows là danh sách {case, metric, baseline, current, change};
+        regressions là các dòng chậm đi quá `tolerance` (0.15 = 15%).
+    """
+    rows = []
+    for case, stats in current["results"].items():
+        if case not in baseline["results"]:
+            continue
+        for metric in metrics:
+            before, after = baseline["results"][case][metric], stats[metric]
+            change = (after - before) / before if before > 0 else 0.0
+            rows.append({"case": case, "metric": metric, "baseline": before,
+                         "current": after, "change": change})
+    regressions = [row for row in rows if row["change"] > tolerance]
+    return rows, regressions
+
+
+def format_stats_table(results):
+    lines = [f"{'Case':<34} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'mean':>8} {'n':>6}"]
+    for case, stats in results.items():
+        lines.append(f"{case:<34} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['p99']:>9.3f} "
+                     f"{stats['mean']:>8.3f} {stats['n']:>6}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows, tolerance):
+    lines = [f"{'Case':<34} {'metric':>6} {'trước':>9} {'sau':>9} {'thay đổi':>9}"]
+    for row in rows:
+        flag = "  ⚠️" if row["change"] > tolerance else ("  ✅" if row["change"] < -tolerance else "")
+        lines.append(f"{row['case']:<34} {row['metric']:>6} {row['baseline']:>9.3f} "
+                     f"{row['current']:>9.3f} {row['change'] * 100:>+8.1f}%{flag}")
+    return "\n".join(lines)
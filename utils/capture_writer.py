@@ -0,0 +1,169 @@
+"""
+Ghi dữ liệu thu từ camera theo luồng, chịu được dừng đột ngột.
+
+Cấu trúc một phiên thu (thư mục):
+    features.f32   float32 (N, 86) liền nhau, chỉ ghi nối vào cuối
+    index.json     số dòng đã ghi chắc chắn + danh sách khối (dải dòng, CRC32)
+
+Mỗi khung hình chỉ được chép vào một bộ đệm (chunk_rows, 86) cấp phát sẵn; đầy bộ đệm
+thì cả khối được ghi + fsync, sau đó index mới được cập nhật (ghi file tạm rồi đổi tên).
+Index là nguồn sự thật: dừng giữa chừng chỉ mất phần chưa flush (< chunk_rows dòng),
+phần ghi dở ở cuối file bị cắt bỏ khi mở lại phiên để thu tiếp.
+"""
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+
+from utils.feature_extraction import FEATURE_SIZE
+
+CAPTURE_VERSION = 1
+CAPTURE_DTYPE = np.dtype("<f4")
+
+
+class CaptureWriter:
+    """
+    Ví dụ:
+        writer = CaptureWriter.create("captures/xin_chao-20240501-101500", "xin_chao")
+        writer.append(feature)      # mỗi khung hình, không cấp phát
+        writer.close()              # ghi nốt khối cuối
+        features = load_capture("captures/xin_chao-20240501-101500")   # memmap (N, 86)
+
+        writer = CaptureWriter.open("captures/xin_chao-20240501-101500")   # thu tiếp
+    """
+
+    DATA_FILE = "features.f32"
+    INDEX_FILE = "index.json"
+
+    def __init__(self, root, index):
+        self.root = root
+        self.index = index
+        self.feature_size = index["feature_size"]
+        self._row_bytes = self.feature_size * CAPTURE_DTYPE.itemsize
+        self._block = np.zeros((index["chunk_rows"], self.feature_size), dtype=CAPTURE_DTYPE)
+        self._fill = 0
+
+        # Cắt phần đuôi chưa được index ghi nhận (lần trước dừng giữa lúc ghi khối)
+        self._file = open(self._path(self.DATA_FILE), "r+b")
+        self._file.truncate(index["rows"] * self._row_bytes)
+        self._file.seek(0, os.SEEK_END)
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    @staticmethod
+    def exists(root):
+        return os.path.isfile(os.path.join(root, CaptureWriter.INDEX_FILE))
+
+    @classmethod
+    def create(cls, root, pose_name, chunk_rows=256, feature_size=FEATURE_SIZE):
+        if cls.exists(root):
+            raise FileExistsError(f"Capture session already exists: {root}")
+        os.makedirs(root, exist_ok=True)
+        open(os.path.join(root, cls.DATA_FILE), "wb").close()
+        index = {
+            "version": CAPTURE_VERSION,
+            "pose_name": pose_name,
+            "feature_size": feature_size,
+            "dtype": CAPTURE_DTYPE.str,
+            "chunk_rows": chunk_rows,
+            "rows": 0,
+            "chunks": [],
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "resumed": [],
+        }
+        cls._write_index(root, index)
+        return cls(root, index)
+
+    @classmethod
+    def open(cls, root, verify=True):
+        """Mở lại phiên đã có để thu tiếp (kiểm tra CRC các khối nếu `verify`)."""
+        index = read_index(root)
+        writer = cls(root, index)
+        if verify:
+            writer.verify()
+        index["resumed"].append(time.strftime("%Y-%m-%dT%H:%M:%S"))
+        cls._write_index(root, index)
+        return writer
+
+    @classmethod
+    def _write_index(cls, root, index):
+        # Ghi file tạm rồi đổi tên → index luôn ở trạng thái nhất quán
+        path = os.path.join(root, cls.INDEX_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(index, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    @property
+    def pose_name(self):
+        return self.index["pose_name"]
+
+    @property
+    def rows(self):
+        """Số dòng đã nhận, kể cả phần còn trong bộ đệm."""
+        return self.index["rows"] + self._fill
+
+    def append(self, feature):
+        """Chép một vector đặc trưng vào bộ đệm; ghi xuống đĩa khi đủ một khối."""
+        self._block[self._fill] = feature
+        self._fill += 1
+        if self._fill == len(self._block):
+            self.flush()
+
+    def flush(self):
+        """Ghi phần đang có trong bộ đệm thành một khối, fsync rồi cập nhật index."""
+        if not self._fill:
+            return
+        data = memoryview(self._block[:self._fill]).cast("B")
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        start = self.index["rows"]
+        self.index["chunks"].append({"start": start, "stop": start + self._fill,
+                                     "crc32": zlib.crc32(data), "t": round(time.time(), 3)})
+        self.index["rows"] = start + self._fill
+        self._write_index(self.root, self.index)
+        self._fill = 0
+
+    def verify(self):
+        """Kiểm tra CRC32 của mọi khối; lỗi → ValueError."""
+        features = load_capture(self.root, index=self.index)
+        for chunk in self.index["chunks"]:
+            data = memoryview(np.ascontiguousarray(features[chunk["start"]:chunk["stop"]])).cast("B")
+            if zlib.crc32(data) != chunk["crc32"]:
+                raise ValueError(f"Corrupted capture chunk rows {chunk['start']}-{chunk['stop']} in {self.root}")
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_index(root):
+    with open(os.path.join(root, CaptureWriter.INDEX_FILE), "r", encoding="utf-8") as file:
+        index = json.load(file)
+    if index.get("version") != CAPTURE_VERSION:
+        raise ValueError(f"Unsupported capture version: {index.get('version')}")
+    return index
+
+
+def load_capture(root, index=None):
+    """Các dòng đã ghi chắc chắn của phiên, dạng memmap float32 (N, 86)."""
+    index = index or read_index(root)
+    shape = (index["rows"], index["feature_size"])
+    if not index["rows"]:
+        return np.zeros(shape, dtype=index["dtype"])
+    return np.memmap(os.path.join(root, CaptureWriter.DATA_FILE), dtype=index["dtype"], mode="r", shape=shape)
@@ -0,0 +1,84 @@
+"""
+Giảm dữ liệu huấn luyện: bỏ các dòng gần trùng nhau trong từng lớp.
+
+Dữ liệu thu ở 30 fps nên các khung hình liên tiếp gần như giống hệt nhau. Thời gian
+huấn luyện SVC tăng gần bậc hai theo số dòng, và số support vector quyết định chi phí
+dự đoán, nên giữ lại một tập con đại diện (coreset) cho từng lớp là đủ.
+
+Hai cách chọn:
+    grid     băm toạ độ vào lưới ô vuông cạnh `cell`; mỗi ô giữ một dòng (nhanh, O(N))
+    kcenter  chọn tham lam điểm xa nhất (k-center): giữ `fraction` số dòng của lớp,
+             hoặc dừng khi mọi dòng cách tập đã chọn không quá `radius`
+"""
+import numpy as np
+
+REDUCTION_METHODS = ("none", "grid", "kcenter")
+
+
+def grid_select(X, cell):
+    """
+    Chỉ số các dòng được giữ: dòng đầu tiên trong mỗi ô lưới (theo thứ tự gốc).
+    """
+    keys = np.floor(np.asarray(X, dtype=np.float64) / cell).astype(np.int64)
+    # So sánh cả dòng khoá như một chuỗi byte → np.unique một chiều
+    keys = np.ascontiguousarray(keys).view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1])))
+    _, first = np.unique(keys.ravel(), return_index=True)
+    return np.sort(first)
+
+
+def kcenter_select(X, fraction=0.25, radius=None, seed=0):
+    """
+    Chọn tham lam k-center (Gonzalez): mỗi bước lấy dòng xa tập đã chọn nhất.
+
+    Dừng khi đã chọn `ceil(fraction * N)` dòng, hoặc (nếu có `radius`) khi khoảng cách
+    lớn nhất tới tập đã chọn ≤ `radius`. Kết quả là tập phủ bán kính ≤ 2 lần tối ưu.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    n = len(X)
+    if n == 0:
+        return np.zeros(0, dtype=np.intp)
+    k = n if radius is not None else max(1, int(np.ceil(fraction * n)))
+    rng = np.random.default_rng(seed)
+
+    selected = np.empty(k, dtype=np.intp)
+    selected[0] = rng.integers(n)
+    # Khoảng cách bình phương từ mỗi dòng tới tập đã chọn
+    nearest = ((X - X[selected[0]]) ** 2).sum(axis=1)
+    limit = None if radius is None else radius ** 2
+    count = 1
+    while count < k:
+        farthest = int(np.argmax(nearest))
+        if limit is not None and nearest[farthest] <= limit:
+            break
+        selected[count] = farthest
+        count += 1
+        np.minimum(nearest, ((X - X[farthest]) ** 2).sum(axis=1), out=nearest)
+    return np.sort(selected[:count])
+
+
+def select_rows(X, method, cell=0.02, fraction=0.25, radius=None, seed=0):
+    """Chỉ số các dòng giữ lại của MỘT lớp theo `method` ('none', 'grid', 'kcenter')."""
+    if method == "none":
+        return np.arange(len(X))
+    if method == "grid":
+        return grid_select(X, cell)
+    if method == "kcenter":
+        return kcenter_select(X, fraction=fraction, radius=radius, seed=seed)
+    raise ValueError(f"Unknown reduction method '{method}'. Choose one of {REDUCTION_METHODS}.")
+
+
+def reduce_per_class(X, y, method, **params):
+    """
+    Giảm từng lớp riêng rẽ.
+
+    Returns:
+        tuple: (index, report) - index là chỉ số dòng giữ lại (tăng dần),
+        report là {lớp: (số dòng gốc, số dòng giữ)}.
+    """
+    kept, report = [], {}
+    for label in np.unique(y):
+        rows = np.flatnonzero(y == label)
+        keep = rows[select_rows(X[rows], method, **params)]
+        kept.append(keep)
+        report[label.item()] = (len(rows), len(keep))
+    return np.sort(np.concatenate(kept)), report
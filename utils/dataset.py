@@ -0,0 +1,231 @@
+"""
+Kho dữ liệu huấn luyện hợp nhất, đọc bằng memory-map.
+
+Cấu trúc thư mục:
+    features.npy   float32 (N, 86) - toàn bộ vector đặc trưng
+    labels.npy     int16 (N,)      - chỉ số lớp của từng dòng
+    manifest.json  danh sách lớp (chỉ số cố định) + các phiên thu (session) → dải dòng
+
+Hai file .npy là file NumPy chuẩn (`np.load(..., mmap_mode='r')` đọc được) nhưng
+header được chừa sẵn chỗ, nên thêm dòng mới chỉ cần ghi nối vào cuối file rồi sửa
+số dòng trong header - không phải ghi lại dữ liệu cũ. Manifest được ghi sau cùng
+(atomic) và là nguồn sự thật về số dòng hợp lệ: nếu chương trình dừng giữa chừng,
+phần ghi dở ở cuối file bị bỏ qua và bị ghi đè ở lần thêm sau.
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+from utils.feature_extraction import FEATURE_SIZE
+
+DATASET_VERSION = 1
+FEATURE_DTYPE = np.float32
+LABEL_DTYPE = np.int16
+
+# Header .npy cố định 128 byte (bội số của 64 như NumPy khuyến nghị)
+_HEADER_SIZE = 128
+_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _write_npy_header(file, dtype, shape):
+    """Ghi header .npy v1.0 có độ dài cố định `_HEADER_SIZE` vào đầu file."""
+    header = repr({"descr": np.dtype(dtype).str, "fortran_order": False, "shape": tuple(shape)})
+    body_size = _HEADER_SIZE - len(_MAGIC) - 2
+    header = header.ljust(body_size - 1) + "\n"
+    if len(header) != body_size:
+        raise ValueError("shape too large for the reserved .npy header")
+    file.seek(0)
+    file.write(_MAGIC)
+    file.write(body_size.to_bytes(2, "little"))
+    file.write(header.encode("latin1"))
+
+
+def _append_npy(path, array, offset_rows, row_shape):
+    """
+    Ghi `array` bắt đầu từ dòng `offset_rows` của file .npy rồi cập nhật header.
+
+    Dữ liệu được ghi trước, header sau: nếu bị ngắt giữa chừng, header cũ vẫn hợp lệ.
+    """
+    row_bytes = int(np.prod(row_shape, dtype=np.int64)) * array.dtype.itemsize
+    with open(path, "r+b") as file:
+        file.seek(_HEADER_SIZE + offset_rows * row_bytes)
+        file.write(np.ascontiguousarray(array).tobytes())
+        file.truncate()
+        file.flush()
+        os.fsync(file.fileno())
+        _write_npy_header(file, array.dtype, (offset_rows + len(array),) + tuple(row_shape))
+        file.flush()
+        os.fsync(file.fileno())
+
+
+class DatasetStore:
+    """
+    Kho dữ liệu float32 + nhãn + manifest, hỗ trợ thêm lớp/phiên mới mà không ghi lại.
+
+    Ví dụ:
+        store = DatasetStore.open_or_create("data/dataset")
+        store.append("xin_chao", features, source="capture 2024-05-01")
+        X, y = store.arrays()          # memmap, không sao chép
+        mapping = store.mapping        # {0: "binh_thuong", ...}
+    """
+
+    FEATURES_FILE = "features.npy"
+    LABELS_FILE = "labels.npy"
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, root):
+        self.root = root
+        with open(self._path(self.MANIFEST_FILE), "r", encoding="utf-8") as file:
+            self.manifest = json.load(file)
+        if self.manifest.get("version") != DATASET_VERSION:
+            raise ValueError(f"Unsupported dataset version: {self.manifest.get('version')}")
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    @staticmethod
+    def exists(root):
+        return os.path.isfile(os.path.join(root, DatasetStore.MANIFEST_FILE))
+
+    @classmethod
+    def create(cls, root, feature_size=FEATURE_SIZE):
+        os.makedirs(root, exist_ok=True)
+        if cls.exists(root):
+            raise FileExistsError(f"Dataset already exists: {root}")
+
+        with open(os.path.join(root, cls.FEATURES_FILE), "wb") as file:
+            _write_npy_header(file, FEATURE_DTYPE, (0, feature_size))
+        with open(os.path.join(root, cls.LABELS_FILE), "wb") as file:
+            _write_npy_header(file, LABEL_DTYPE, (0,))
+
+        manifest = {
+            "version": DATASET_VERSION,
+            "feature_size": feature_size,
+            "rows": 0,
+            "classes": [],
+            "sessions": [],
+        }
+        cls._write_manifest(root, manifest)
+        return cls(root)
+
+    @classmethod
+    def open_or_create(cls, root, feature_size=FEATURE_SIZE):
+        return cls(root) if cls.exists(root) else cls.create(root, feature_size)
+
+    @classmethod
+    def _write_manifest(cls, root, manifest):
+        # Ghi file tạm rồi đổi tên → manifest luôn ở trạng thái nhất quán
+        path = os.path.join(root, cls.MANIFEST_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    # --- Thông tin ---
+    @property
+    def rows(self):
+        return self.manifest["rows"]
+
+    @property
+    def feature_size(self):
+        return self.manifest["feature_size"]
+
+    @property
+    def classes(self):
+        return list(self.manifest["classes"])
+
+    @property
+    def mapping(self):
+        """Ánh xạ {chỉ số lớp: tên lớp} giống `mapping` trong file model."""
+        return dict(enumerate(self.manifest["classes"]))
+
+    @property
+    def sessions(self):
+        return list(self.manifest["sessions"])
+
+    def class_index(self, name, create=False):
+        classes = self.manifest["classes"]
+        if name not in classes:
+            if not create:
+                raise KeyError(name)
+            classes.append(name)
+        return classes.index(name)
+
+    # --- Ghi ---
+    def append(self, class_name, features, source=None):
+        """
+        Thêm một phiên dữ liệu của một lớp (lớp mới được gán chỉ số tiếp theo).
+
+        Returns:
+            dict: Bản ghi session {id, class, start, stop, source, created}.
+        """
+        features = np.asarray(features, dtype=FEATURE_DTYPE)
+        if features.ndim != 2 or features.shape[1] != self.feature_size:
+            raise ValueError(f"features must have shape (N, {self.feature_size})")
+
+        start = self.rows
+        label = self.class_index(class_name, create=True)
+        labels = np.full(len(features), label, dtype=LABEL_DTYPE)
+
+        _append_npy(self._path(self.FEATURES_FILE), features, start, (self.feature_size,))
+        _append_npy(self._path(self.LABELS_FILE), labels, start, ())
+
+        session = {
+            "id": len(self.manifest["sessions"]),
+            "class": class_name,
+            "start": start,
+            "stop": start + len(features),
+            "source": source,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self.manifest["sessions"].append(session)
+        self.manifest["rows"] = session["stop"]
+        self._write_manifest(self.root, self.manifest)
+        return session
+
+    # --- Đọc ---
+    def arrays(self, mmap_mode="r"):
+        """
+        (features, labels) dạng memmap - không đọc dữ liệu vào RAM, không sao chép.
+
+        Chỉ lấy `rows` dòng đã được ghi nhận trong manifest.
+        """
+        features = np.load(self._path(self.FEATURES_FILE), mmap_mode=mmap_mode)
+        labels = np.load(self._path(self.LABELS_FILE), mmap_mode=mmap_mode)
+        return features[:self.rows], labels[:self.rows]
+
+    def class_rows(self, name):
+        """Các dòng đặc trưng của một lớp (view memmap khi lớp nằm trong một khối liền)."""
+        features, labels = self.arrays()
+        ranges = [(s["start"], s["stop"]) for s in self.manifest["sessions"] if s["class"] == name]
+        if len(ranges) == 1:
+            return features[ranges[0][0]:ranges[0][1]]
+        return features[labels == self.class_index(name)]
+
+
+def import_pose_files(store, data_dir):
+    """
+    Chuyển dữ liệu cũ (mỗi lớp một file data/<lớp>.npy) vào `store`.
+
+    File đã được nhập trước đó (cùng `source`) sẽ được bỏ qua.
+
+    Returns:
+        list: Các session vừa thêm.
+    """
+    imported = {s["source"] for s in store.sessions}
+    added = []
+    for name in sorted(os.listdir(data_dir)):
+        if not name.endswith(".npy"):
+            continue
+        source = os.path.join(data_dir, name)
+        if source in imported:
+            continue
+        pose_data = np.load(source)
+        if pose_data.size == 0:
+            continue
+        added.append(store.append(os.path.splitext(name)[0], pose_data, source=source))
+    return added
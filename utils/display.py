@@ -0,0 +1,92 @@
+"""
+Bước hiển thị khung hình lên Streamlit, tách khỏi tốc độ suy luận.
+
+Vòng lặp giao diện nhận mọi khung hình đã xử lý, nhưng chỉ gửi tới trình duyệt theo
+FPS mục tiêu riêng: ảnh được thu nhỏ về bề rộng hiển thị và nén JPEG trước khi gửi
+(thay vì đẩy ảnh thô độ phân giải gốc). Nếu lưu lượng vượt giới hạn KB/s, các khung
+hình tiếp theo bị bỏ qua.
+
+Hạn chế: Streamlit không cho biết trình duyệt đã nhận/vẽ khung hình hay chưa -
+`placeholder.image()` chỉ xếp thông điệp vào hàng gửi rồi trả về ngay. Thời gian đo được
+trong `show` vì vậy chỉ gồm thu nhỏ + nén JPEG trên máy chủ, không phản ánh client hay
+đường truyền chậm. Cơ chế thật sự giới hạn lượng dữ liệu đẩy sang client là ngân sách
+KB/s (`max_kbps`, bật mặc định qua DISPLAY_MAX_KBPS).
+"""
+import time
+from collections import deque
+
+import cv2
+
+
+class DisplayStage:
+    """
+    Ví dụ:
+        display = DisplayStage(target_fps=15, width=640, quality=80)
+        display.show(video_placeholder, packet.image)   # False nếu khung hình bị bỏ qua
+        display.stats()   # {fps, bytes_per_second, shown, skipped}
+    """
+
+    def __init__(self, target_fps=15.0, width=640, quality=80, max_kbps=0, window=2.0):
+        self.interval = 1.0 / target_fps
+        self.width = width
+        self.quality = quality
+        self.max_bytes_per_second = max_kbps * 1024
+        self.window = window
+        self._sent = deque()  # (thời điểm, số byte) của các khung hình đã gửi trong `window` giây
+        self._next_due = 0.0
+        self.shown = 0
+        self.skipped = 0
+
+    def _trim(self, now):
+        while self._sent and now - self._sent[0][0] > self.window:
+            self._sent.popleft()
+
+    def due(self, now=None):
+        """Đã tới lượt gửi khung hình mới chưa (theo chu kỳ và giới hạn lưu lượng)."""
+        now = time.perf_counter() if now is None else now
+        if now < self._next_due:
+            return False
+        if self.max_bytes_per_second:
+            self._trim(now)
+            if sum(size for _, size in self._sent) / self.window > self.max_bytes_per_second:
+                return False
+        return True
+
+    def encode(self, image):
+        """Ảnh RGB → JPEG (bytes), thu nhỏ về `width` nếu ảnh rộng hơn."""
+        height, width = image.shape[:2]
+        if width > self.width:
+            image = cv2.resize(image, (self.width, round(height * self.width / width)),
+                               interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(".jpg", cv2.cvtColor(image, cv2.COLOR_RGB2BGR),
+                                  [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        return buffer.tobytes()
+
+    def show(self, placeholder, image):
+        """Gửi `image` (RGB) tới `placeholder` nếu tới lượt. Trả về True nếu đã gửi."""
+        start = time.perf_counter()
+        if not self.due(start):
+            self.skipped += 1
+            return False
+        data = self.encode(image)
+        # Streamlit gửi nguyên bytes JPEG, không nén lại
+        placeholder.image(data, use_column_width=True)
+        end = time.perf_counter()
+        # Nén + xếp hàng lâu hơn một chu kỳ (máy chủ không theo kịp) → giãn chu kỳ tương ứng.
+        # Không đo được client/đường truyền (xem docstring của module) - việc đó do ngân sách KB/s
+        self._next_due = start + max(self.interval, end - start)
+        self._sent.append((end, len(data)))
+        self.shown += 1
+        return True
+
+    def stats(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self._trim(now)
+        return {
+            "fps": len(self._sent) / self.window,
+            "bytes_per_second": sum(size for _, size in self._sent) / self.window,
+            "shown": self.shown,
+            "skipped": self.skipped,
+        }
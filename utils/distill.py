@@ -0,0 +1,105 @@
+"""
+Chưng cất (distillation) RBF-SVM thành MLP nhỏ.
+
+Model học trò được huấn luyện để bắt chước XÁC SUẤT của model thầy (Platt của SVC),
+không chỉ nhãn cứng: xác suất mềm mang thông tin lớp nào dễ nhầm với lớp nào.
+Ngoài các dòng train, có thể thêm các bản sao nhiễu nhẹ (chỉ trên toạ độ khác 0 -
+tay bị thiếu vẫn là 0) để học trò thấy được vùng xung quanh ranh giới của thầy.
+
+Huấn luyện bằng NumPy (Adam + mini-batch), không cần thư viện deep learning.
+"""
+import numpy as np
+
+from utils.mlp_engine import MLPEngine
+
+
+def augment_rows(X, copies, noise, rng):
+    """X cùng `copies` bản sao cộng nhiễu Gauss (độ lệch chuẩn `noise`) trên các toạ độ khác 0."""
+    X = np.asarray(X, dtype=np.float32)
+    if copies <= 0:
+        return X
+    jittered = np.repeat(X[None], copies, axis=0)
+    jittered += (rng.standard_normal(jittered.shape) * noise).astype(np.float32) * (jittered != 0)
+    return np.concatenate([X, jittered.reshape(-1, X.shape[1])])
+
+
+def train_mlp(X, targets, classes, hidden=(64,), epochs=150, batch_size=256, learning_rate=3e-3,
+              weight_decay=1e-5, seed=0, progress=None):
+    """
+    Huấn luyện MLP (ReLU) cực tiểu cross-entropy với phân phối đích `targets` (N, n_classes).
+
+    Returns:
+        MLPEngine: chuẩn hoá đầu vào đã được gộp vào lớp đầu.
+    """
+    rng = np.random.default_rng(seed)
+    X = np.asarray(X, dtype=np.float32)
+    targets = np.asarray(targets, dtype=np.float32)
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0) + 1e-6
+    Xs = (X - mean) / scale
+
+    sizes = [X.shape[1], *hidden, targets.shape[1]]
+    # Khởi tạo He cho ReLU
+    params = []
+    for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+        params.append(rng.standard_normal((fan_in, fan_out)).astype(np.float32) * np.sqrt(2.0 / fan_in))
+        params.append(np.zeros(fan_out, dtype=np.float32))
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    n, step = len(Xs), 0
+    for epoch in range(epochs):
+        # Giảm tốc độ học theo cosine về 0 ở epoch cuối
+        lr = learning_rate * 0.5 * (1.0 + np.cos(np.pi * epoch / epochs))
+        order = rng.permutation(n)
+        for start in range(0, n, batch_size):
+            batch = order[start:start + batch_size]
+            activations = [Xs[batch]]
+            for layer in range(len(sizes) - 2):
+                activations.append(np.maximum(activations[-1] @ params[2 * layer] + params[2 * layer + 1], 0.0))
+            logits = activations[-1] @ params[-2] + params[-1]
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+
+            # Lan truyền ngược: gradient của cross-entropy theo logit là (p - đích) / batch
+            delta = (probs - targets[batch]) / len(batch)
+            grads = [None] * len(params)
+            for layer in range(len(sizes) - 2, -1, -1):
+                grads[2 * layer] = activations[layer].T @ delta + weight_decay * params[2 * layer]
+                grads[2 * layer + 1] = delta.sum(axis=0)
+                if layer:
+                    delta = (delta @ params[2 * layer].T) * (activations[layer] > 0)
+
+            step += 1
+            correction1, correction2 = 1.0 - beta1 ** step, 1.0 - beta2 ** step
+            for p, g, m, v in zip(params, grads, moments, velocities):
+                m *= beta1
+                m += (1.0 - beta1) * g
+                v *= beta2
+                v += (1.0 - beta2) * g * g
+                p -= lr * (m / correction1) / (np.sqrt(v / correction2) + eps)
+        if progress:
+            progress(epoch + 1, epochs)
+
+    weights, biases = params[0::2], params[1::2]
+    # Gộp chuẩn hoá vào lớp đầu: ((x - mean) / scale) @ W + b = x @ (W / scale) + (b - (mean / scale) @ W)
+    biases[0] = biases[0] - (mean / scale) @ weights[0]
+    weights[0] = weights[0] / scale[:, None]
+    return MLPEngine(weights, biases, classes)
+
+
+def distill(teacher, X, hidden=(64,), epochs=150, augment=2, noise=0.01, seed=0, progress=None):
+    """
+    Huấn luyện MLP học trò theo xác suất của `teacher` (có `predict_proba` và `classes_`).
+
+    Returns:
+        tuple: (student, n_rows) - n_rows là số dòng (kể cả bản sao nhiễu) đã dùng để huấn luyện.
+    """
+    rng = np.random.default_rng(seed)
+    rows = augment_rows(X, augment, noise, rng)
+    targets = teacher.predict_proba(rows)
+    student = train_mlp(rows, targets, teacher.classes_, hidden=hidden, epochs=epochs,
+                        seed=seed, progress=progress)
+    return student, len(rows)
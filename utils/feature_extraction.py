@@ -1,6 +1,21 @@
+from operator import attrgetter
+
 import numpy as np
 from config import FEATURES_PER_HAND
 
+# Bố cục vector đặc trưng: [Face (2)] + [Right Hand (42)] + [Left Hand (42)]
+FACE_FEATURE_SIZE = 2
+HAND_FEATURE_SIZE = FEATURES_PER_HAND * 2
+FEATURE_SIZE = FACE_FEATURE_SIZE + HAND_FEATURE_SIZE * 2
+
+RIGHT_HAND_SLICE = slice(FACE_FEATURE_SIZE, FACE_FEATURE_SIZE + HAND_FEATURE_SIZE)
+LEFT_HAND_SLICE = slice(FACE_FEATURE_SIZE + HAND_FEATURE_SIZE, FEATURE_SIZE)
+
+# Lấy toạ độ landmark bằng hàm C, không cần vòng lặp Python cho từng điểm
+_X = attrgetter("x")
+_Y = attrgetter("y")
+
+
 def extract_hand_result(mp_hands: object, hand_results: object) -> np.ndarray:
     """
     Trích xuất đặc trưng bàn tay từ kết quả MediaPipe.
@@ -88,3 +103,204 @@ def extract_features(mp_hands: object, face_results: object, hand_results: objec
     hand_features = extract_hand_result(mp_hands, hand_results)
     
     return np.hstack((face_features, hand_features))
+
+
+def landmarks_to_array(landmarks, out=None) -> np.ndarray:
+    """
+    Chuyển toàn bộ danh sách landmark sang mảng (n, 2) theo từng cột.
+
+    `map(attrgetter)` + `np.fromiter` chạy ở tầng C nên không có bytecode Python
+    cho từng điểm. Nếu truyền `out` có đúng kích thước (n, 2) thì ghi thẳng vào đó.
+    """
+    count = len(landmarks)
+    if out is None or out.shape[0] != count:
+        out = np.empty((count, 2), dtype=np.float64)
+    out[:, 0] = np.fromiter(map(_X, landmarks), dtype=out.dtype, count=count)
+    out[:, 1] = np.fromiter(map(_Y, landmarks), dtype=out.dtype, count=count)
+    return out
+
+
+class FeatureExtractor:
+    """
+    Bộ trích xuất đặc trưng tái sử dụng bộ đệm.
+
+    Ghi kết quả vào một bộ đệm float32 (86,) được cấp phát một lần và dùng lại cho
+    mọi khung hình. Bố cục giống hệt `extract_features`, và giá trị bằng đúng từng bit
+    `extract_features(...).astype(np.float32)`: toạ độ MediaPipe vốn là float32, còn
+    tâm khuôn mặt vẫn được tính trung bình bằng float64 như cũ rồi mới ép kiểu.
+
+    Lưu ý: mảng trả về bị ghi đè ở khung hình tiếp theo, cần `.copy()` nếu muốn giữ lại.
+    """
+
+    def __init__(self):
+        self.output = np.zeros(FEATURE_SIZE, dtype=np.float32)
+        self._face_mean = np.zeros(FACE_FEATURE_SIZE, dtype=np.float64)
+        self._face_points = np.zeros((0, 2), dtype=np.float64)
+        # View (21, 2) của từng tay trên chính bộ đệm output
+        self._right_view = self.output[RIGHT_HAND_SLICE].reshape(FEATURES_PER_HAND, 2)
+        self._left_view = self.output[LEFT_HAND_SLICE].reshape(FEATURES_PER_HAND, 2)
+
+    def extract_face(self, face_results) -> None:
+        """Ghi [mean_x, mean_y] của khuôn mặt đầu tiên vào output[0:2]."""
+        if face_results is None or face_results.multi_face_landmarks is None:
+            self.output[:FACE_FEATURE_SIZE] = 0.0
+            return
+
+        face = face_results.multi_face_landmarks[0]
+        self._face_points = landmarks_to_array(face.landmark, out=self._face_points)
+        np.mean(self._face_points, axis=0, out=self._face_mean)
+        self.output[:FACE_FEATURE_SIZE] = self._face_mean
+
+    def extract_hands(self, hand_results) -> None:
+        """Ghi landmark tay phải vào output[2:44] và tay trái vào output[44:86]."""
+        right_found = left_found = False
+
+        if hand_results is not None and hand_results.multi_hand_landmarks is not None:
+            for hand_landmark, hand_label in zip(hand_results.multi_hand_landmarks,
+                                                 hand_results.multi_handedness):
+                if hand_label.classification[0].label == "Right":
+                    target, right_found = self._right_view, True
+                else:
+                    target, left_found = self._left_view, True
+                landmarks_to_array(hand_landmark.landmark, out=target)
+
+        # Thiếu tay nào thì điền 0 vào vị trí đó
+        if not right_found:
+            self.output[RIGHT_HAND_SLICE] = 0.0
+        if not left_found:
+            self.output[LEFT_HAND_SLICE] = 0.0
+
+    def extract(self, face_results: object, hand_results: object) -> np.ndarray:
+        """
+        Ghép đặc trưng Mặt + Tay vào bộ đệm dùng chung.
+
+        Returns:
+            np.ndarray: Bộ đệm float32 (86,) - được ghi đè ở lần gọi sau.
+        """
+        self.extract_face(face_results)
+        self.extract_hands(hand_results)
+        return self.output
+
+
+# ==========================================
+# Nguồn đặc trưng khuôn mặt (face backend)
+# ==========================================
+# Mô hình chỉ dùng tâm khuôn mặt [mean_x, mean_y], nên không nhất thiết phải chạy
+# FaceMesh đầy đủ. Mọi backend đều trả về kết quả có `multi_face_landmarks` để
+# `extract_face_result` / `FeatureExtractor` dùng được mà không cần sửa gì.
+FACE_BACKENDS = ("facemesh", "facemesh_lite", "detection")
+
+
+class _Point:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.z = 0.0
+
+
+class _PointList:
+    __slots__ = ("landmark",)
+
+    def __init__(self, points):
+        self.landmark = points
+
+
+class FaceCentreResults:
+    """
+    Kết quả giống FaceMesh nhưng chỉ có một landmark: tâm khuôn mặt.
+
+    Trung bình của một điểm chính là điểm đó, nên đặc trưng [mean_x, mean_y]
+    vẫn được tính bằng đúng code cũ. `box` là (xmin, ymin, width, height) tương đối.
+    """
+
+    def __init__(self, centre=None, box=None):
+        self.box = box
+        self.multi_face_landmarks = None if centre is None else [_PointList([_Point(*centre)])]
+
+
+class FaceMeshBackend:
+    """FaceMesh đầy đủ - chuẩn tham chiếu mà các model hiện có được huấn luyện."""
+
+    def __init__(self, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 refine_landmarks=True):
+        import mediapipe as mp
+
+        self._mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=refine_landmarks,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+
+    def process(self, image):
+        return self._mesh.process(image)
+
+    def close(self):
+        self._mesh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FaceDetectionBackend:
+    """
+    Lấy tâm khuôn mặt từ MediaPipe Face Detection (BlazeFace, 6 keypoint).
+
+    Rẻ hơn FaceMesh nhiều. Tâm = trung bình 6 keypoint (mắt, mũi, miệng, tai) -
+    gần với trung bình lưới FaceMesh hơn tâm bounding box - cộng thêm độ lệch
+    hiệu chỉnh `offset` tính theo kích thước box (đo bằng
+    `scripts/benchmark_face_backend.py`).
+    """
+
+    def __init__(self, min_detection_confidence=0.5, offset=(0.0, 0.0), model_selection=0):
+        import mediapipe as mp
+
+        self._detector = mp.solutions.face_detection.FaceDetection(
+            min_detection_confidence=min_detection_confidence,
+            model_selection=model_selection)
+        self.offset = offset
+
+    def process(self, image):
+        results = self._detector.process(image)
+        if not results.detections:
+            return FaceCentreResults()
+
+        detection = max(results.detections, key=lambda d: d.score[0])
+        location = detection.location_data
+        box = location.relative_bounding_box
+        keypoints = location.relative_keypoints
+        centre_x = sum(kp.x for kp in keypoints) / len(keypoints) + self.offset[0] * box.width
+        centre_y = sum(kp.y for kp in keypoints) / len(keypoints) + self.offset[1] * box.height
+        return FaceCentreResults((centre_x, centre_y),
+                                 (box.xmin, box.ymin, box.width, box.height))
+
+    def close(self):
+        self._detector.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def create_face_backend(name="facemesh", min_detection_confidence=0.5,
+                        min_tracking_confidence=0.5, offset=(0.0, 0.0)):
+    """
+    Tạo face backend theo tên.
+
+    - "facemesh": FaceMesh refine_landmarks=True (478 điểm), giống dữ liệu huấn luyện.
+    - "facemesh_lite": FaceMesh không tinh chỉnh mống mắt (468 điểm).
+    - "detection": Face Detection, chỉ tính tâm khuôn mặt.
+    """
+    if name == "facemesh":
+        return FaceMeshBackend(min_detection_confidence, min_tracking_confidence, refine_landmarks=True)
+    if name == "facemesh_lite":
+        return FaceMeshBackend(min_detection_confidence, min_tracking_confidence, refine_landmarks=False)
+    if name == "detection":
+        return FaceDetectionBackend(min_detection_confidence, offset=offset)
+    raise ValueError(f"face backend must be one of {FACE_BACKENDS}")
@@ -0,0 +1,231 @@
+"""
+Tìm C/gamma cho SVC RBF bằng cross-validation, chạy song song trên mọi nhân CPU.
+
+Mỗi tác vụ là một cặp (fold, gamma) và fit lần lượt mọi giá trị C: ma trận kernel
+chỉ phụ thuộc gamma nên được tính một lần rồi dùng lại cho cả lưới C. Khi số mẫu
+đủ nhỏ (`precompute_max_rows`), ma trận khoảng cách bình phương ||x - x'||² của toàn
+bộ dữ liệu được tính MỘT lần, lưu ra file tạm và các tiến trình đọc bằng memmap;
+kernel của mọi gamma chỉ còn là exp(-gamma·D) trên phần tương ứng của fold
+(SVC(kernel='precomputed')). Dữ liệu lớn hơn thì để libsvm tự tính kernel.
+
+Mỗi điểm lưới được dựng thành `RBFSVMEngine` (từ fold đầu tiên) để đo độ trễ dự
+đoán một dòng thực tế - chi phí suy luận tỉ lệ với số support vector, nên bảng kết
+quả cho phép chọn model theo cả độ chính xác lẫn tốc độ.
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.svm_engine import RBFSVMEngine
+
+# Số mẫu tối đa để tính sẵn ma trận khoảng cách (8000² float32 ≈ 256 MB trên đĩa)
+PRECOMPUTE_MAX_ROWS = 8000
+
+# Số dòng mỗi khối khi tính ma trận khoảng cách
+_BLOCK_ROWS = 1024
+
+
+def scale_gamma(X):
+    """Giá trị gamma='scale' của sklearn: 1 / (n_features · Var(X))."""
+    X = np.asarray(X, dtype=np.float64)
+    return 1.0 / (X.shape[1] * X.var())
+
+
+def parse_grid(text):
+    """Chuỗi '1,10,100' → [1.0, 10.0, 100.0] (giữ nguyên 'scale')."""
+    values = []
+    for item in text.split(","):
+        item = item.strip()
+        if item:
+            values.append(item if item == "scale" else float(item))
+    return values
+
+
+def squared_distances(X, out):
+    """Ghi ma trận ||x_i - x_j||² (float32) của X vào `out`, theo từng khối dòng."""
+    X = np.asarray(X, dtype=np.float64)
+    norms = np.einsum("ij,ij->i", X, X)
+    for start in range(0, len(X), _BLOCK_ROWS):
+        stop = start + _BLOCK_ROWS
+        block = norms[start:stop, None] + norms[None, :] - 2.0 * (X[start:stop] @ X.T)
+        np.maximum(block, 0.0, out=block)
+        out[start:stop] = block
+    return out
+
+
+def measure_latency(engine, X, repeats=200, rounds=3):
+    """
+    Thời gian (µs) để dự đoán MỘT dòng bằng `engine`: trung vị của mỗi lượt đo,
+    lấy lượt nhanh nhất (giống `timeit`) để bớt nhiễu từ các tiến trình khác.
+    """
+    rows = np.asarray(X[:repeats], dtype=np.float32)
+    best = float("inf")
+    for _ in range(rounds):
+        timings = []
+        for row in rows:
+            start = time.perf_counter()
+            engine.predict(row[None, :])
+            timings.append(time.perf_counter() - start)
+        best = min(best, float(np.median(timings)))
+    return best * 1e6
+
+
+# --- Tiến trình con ---
+_worker = {}
+
+
+def _init_worker(features_path, labels_path, distances_path):
+    _worker["X"] = np.load(features_path, mmap_mode="r")
+    _worker["y"] = np.load(labels_path, mmap_mode="r")
+    _worker["D"] = np.load(distances_path, mmap_mode="r") if distances_path else None
+
+
+def _evaluate(fold, train_index, test_index, gamma, C_grid, keep_engine):
+    """Fit mọi C của một cặp (fold, gamma). Trả về danh sách kết quả theo thứ tự C_grid."""
+    from sklearn.svm import SVC
+
+    X, y, D = _worker["X"], _worker["y"], _worker["D"]
+    y_train, y_test = y[train_index], y[test_index]
+
+    if D is not None:
+        # Kernel dùng chung cho mọi C của gamma này
+        train_data = np.exp(-gamma * D[np.ix_(train_index, train_index)].astype(np.float64))
+        test_data = np.exp(-gamma * D[np.ix_(test_index, train_index)].astype(np.float64))
+        kernel_params = {"kernel": "precomputed"}
+    else:
+        train_data, test_data = X[train_index], X[test_index]
+        kernel_params = {"kernel": "rbf", "gamma": gamma}
+
+    results = []
+    for C in C_grid:
+        start = time.perf_counter()
+        svc = SVC(C=C, decision_function_shape="ovo", **kernel_params).fit(train_data, y_train)
+        fit_seconds = time.perf_counter() - start
+        result = {
+            "fold": fold,
+            "C": C,
+            "gamma": gamma,
+            "accuracy": float(svc.score(test_data, y_test)),
+            "n_support": int(svc.n_support_.sum()),
+            "fit_seconds": fit_seconds,
+            "engine": None,
+        }
+        if keep_engine:
+            dual_coef, intercept = svc.dual_coef_, svc.intercept_
+            if len(svc.classes_) == 2:
+                # sklearn đảo dấu ở bài toán 2 lớp (xem RBFSVMEngine.from_svc)
+                dual_coef, intercept = -dual_coef, -intercept
+            # SVC precomputed không giữ support vector → lấy lại từ chỉ số trong tập train
+            result["engine"] = RBFSVMEngine.from_libsvm(
+                X[train_index[svc.support_]], svc.n_support_, dual_coef, intercept,
+                gamma, svc.classes_)
+        results.append(result)
+    return results
+
+
+# --- Tiến trình chính ---
+def grid_search(X, y, C_grid, gamma_grid, folds=3, workers=None,
+                precompute_max_rows=PRECOMPUTE_MAX_ROWS, random_state=42, progress=None):
+    """
+    Cross-validation trên lưới C x gamma.
+
+    Args:
+        X, y: Dữ liệu (có thể là memmap).
+        C_grid: Danh sách giá trị C.
+        gamma_grid: Danh sách gamma (số thực hoặc 'scale', tính trên toàn bộ X).
+        folds: Số fold của StratifiedKFold.
+        workers: Số tiến trình (mặc định: số nhân CPU).
+        precompute_max_rows: Tính sẵn ma trận khoảng cách khi số mẫu không vượt quá giá trị này.
+        progress: Hàm gọi lại progress(done, total) sau mỗi tác vụ (tuỳ chọn).
+
+    Returns:
+        list: Mỗi điểm lưới một dict {C, gamma, accuracy, accuracy_std, n_support,
+        fit_seconds, latency_us, engine}, đã xếp hạng (xem `rank_results`).
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    y = np.asarray(y)
+    gammas = [scale_gamma(X) if gamma == "scale" else float(gamma) for gamma in gamma_grid]
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True,
+                                  random_state=random_state).split(np.zeros(len(y)), y))
+
+    with tempfile.TemporaryDirectory(prefix="hparam_search_") as tmp_dir:
+        features_path = os.path.join(tmp_dir, "X.npy")
+        labels_path = os.path.join(tmp_dir, "y.npy")
+        np.save(features_path, np.asarray(X, dtype=np.float64))
+        np.save(labels_path, y)
+
+        distances_path = None
+        if len(y) <= precompute_max_rows:
+            distances_path = os.path.join(tmp_dir, "D.npy")
+            distances = np.lib.format.open_memmap(distances_path, mode="w+", dtype=np.float32,
+                                                  shape=(len(y), len(y)))
+            squared_distances(X, distances)
+            distances.flush()
+            del distances
+
+        tasks = [(fold, train_index, test_index, gamma, list(C_grid), fold == 0)
+                 for fold, (train_index, test_index) in enumerate(splits)
+                 for gamma in gammas]
+        raw = []
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_init_worker,
+                                 initargs=(features_path, labels_path, distances_path)) as executor:
+            futures = [executor.submit(_evaluate, *task) for task in tasks]
+            for done, future in enumerate(futures, 1):
+                raw.extend(future.result())
+                if progress is not None:
+                    progress(done, len(futures))
+
+    # Gộp các fold của cùng một điểm lưới
+    results = []
+    for gamma in gammas:
+        for C in C_grid:
+            points = [r for r in raw if r["C"] == C and r["gamma"] == gamma]
+            accuracies = [r["accuracy"] for r in points]
+            results.append({
+                "C": C,
+                "gamma": gamma,
+                "accuracy": float(np.mean(accuracies)),
+                "accuracy_std": float(np.std(accuracies)),
+                "n_support": float(np.mean([r["n_support"] for r in points])),
+                "fit_seconds": float(np.mean([r["fit_seconds"] for r in points])),
+                "engine": next(r["engine"] for r in points if r["fold"] == 0),
+                "latency_us": None,
+            })
+
+    # Đo độ trễ tuần tự, sau khi pool đã đóng, để các phép đo không tranh CPU với nhau
+    sample = np.asarray(X[splits[0][1]], dtype=np.float32)
+    for result in results:
+        result["latency_us"] = measure_latency(result["engine"], sample)
+
+    return rank_results(results)
+
+
+def rank_results(results):
+    """
+    Xếp theo độ chính xác giảm dần (cùng độ chính xác thì ít support vector hơn lên trước)
+    và đánh dấu `pareto`: không có điểm nào vừa chính xác hơn vừa nhanh hơn.
+    """
+    ranked = sorted(results, key=lambda r: (-r["accuracy"], r["n_support"]))
+    for result in ranked:
+        result["pareto"] = not any(
+            other["accuracy"] >= result["accuracy"] and other["latency_us"] <= result["latency_us"]
+            and (other["accuracy"] > result["accuracy"] or other["latency_us"] < result["latency_us"])
+            for other in ranked)
+    return ranked
+
+
+def format_table(results):
+    """Bảng xếp hạng dạng text."""
+    lines = [f"{'#':>3} {'C':>8} {'gamma':>9} {'accuracy':>15} {'n_SV':>8} "
+             f"{'µs/row':>9} {'fit (s)':>8}  pareto"]
+    for rank, r in enumerate(results, 1):
+        lines.append(f"{rank:>3} {r['C']:>8g} {r['gamma']:>9.4g} "
+                     f"{r['accuracy'] * 100:>7.2f}% ±{r['accuracy_std'] * 100:4.2f} "
+                     f"{r['n_support']:>8.0f} {r['latency_us']:>9.1f} {r['fit_seconds']:>8.2f}"
+                     f"  {'★' if r['pareto'] else ''}")
+    return "\n".join(lines)
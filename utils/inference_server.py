@@ -0,0 +1,257 @@
+"""
+Dịch vụ suy luận cục bộ (HTTP) gom yêu cầu của nhiều client thành micro-batch.
+
+Mọi phiên Streamlit / script dùng chung MỘT model trong một tiến trình. Các yêu cầu
+đến gần nhau được ghép thành một lời gọi `predict_proba_batch` (một phép GEMM cho
+cả batch), nên khi nhiều client cùng gửi, thông lượng tăng mà độ trễ thêm vào
+không vượt quá `max_delay_ms`.
+
+Giao thức:
+    POST /predict   body float32 little-endian (N x 86) với Content-Type
+                    application/octet-stream, hoặc JSON {"features": [[...86 số...], ...]}
+                    → {"labels": [...], "confidences": [...]}
+    GET  /health    → {"classes": [...], "feature_size": 86}
+    GET  /stats     → số request, số batch, kích thước batch trung bình
+"""
+import json
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import numpy as np
+
+from utils.feature_extraction import FEATURE_SIZE
+
+
+class MicroBatcher:
+    """
+    Gom các yêu cầu dự đoán đồng thời thành batch, xử lý trên một luồng riêng.
+
+    Luồng xử lý lấy mọi yêu cầu đang chờ; nếu chưa đủ `max_batch` dòng thì chờ thêm,
+    nhưng không quá `max_delay_ms` kể từ lúc yêu cầu CŨ NHẤT trong batch tới.
+    `max_delay_ms=0`: không chờ - batch chỉ gồm các yêu cầu dồn lại trong lúc model
+    đang bận với batch trước.
+    """
+
+    def __init__(self, model, max_batch=64, max_delay_ms=2.0):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1e3
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        """Đưa (N, 86) vào hàng đợi; Future trả về (labels, confidences)."""
+        features = np.asarray(features, dtype=np.float32).reshape(-1, FEATURE_SIZE)
+        future = Future()
+        self._queue.put((time.monotonic(), features, future))
+        return future
+
+    def predict(self, features, timeout=None):
+        return self.submit(features).result(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "rows": self.rows,
+                "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+                "max_batch": self.max_batch,
+                "max_delay_ms": self.max_delay * 1e3,
+            }
+
+    def _collect(self, first):
+        """Gom thêm yêu cầu vào batch bắt đầu bằng `first`. Trả về (batch, dừng?)."""
+        batch, rows = [first], len(first[1])
+        deadline = first[0] + self.max_delay
+        while rows < self.max_batch:
+            try:
+                # Lấy ngay những gì đang chờ, sau đó mới chờ tới hạn
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            rows += len(item[1])
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+
+            futures = [future for _, _, future in batch]
+            features = np.concatenate([features for _, features, _ in batch])
+            try:
+                labels, confidences = self.model.predict_proba_batch(features)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for (_, part, future) in batch:
+                stop = start + len(part)
+                future.set_result((labels[start:stop].tolist(),
+                                   np.asarray(confidences[start:stop], dtype=float).tolist()))
+                start = stop
+            with self._stats_lock:
+                self.requests += len(batch)
+                self.batches += 1
+                self.rows += len(features)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # giữ kết nối (keep-alive) giữa các request
+    # Header và body được ghi làm hai lần; với Nagle + delayed ACK mỗi request sẽ chậm ~40 ms
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"classes": self.server.model.labels.tolist(),
+                                  "feature_size": FEATURE_SIZE})
+        elif self.path == "/stats":
+            self._send_json(200, self.server.batcher.stats())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "not found"})
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                features = np.asarray(json.loads(body)["features"], dtype=np.float32)
+            else:
+                features = np.frombuffer(body, dtype="<f4")
+            if features.size == 0 or features.size % FEATURE_SIZE:
+                raise ValueError(f"expected N x {FEATURE_SIZE} features, got {features.size} values")
+            labels, confidences = self.server.batcher.predict(features, timeout=self.server.timeout_s)
+        except Exception as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(200, {"labels": labels, "confidences": confidences})
+
+    def log_message(self, format, *args):
+        # Không in mỗi request ra stderr (tốn thời gian khi tải cao)
+        pass
+
+
+class InferenceServer(ThreadingHTTPServer):
+    """
+    Ví dụ:
+        server = InferenceServer(("127.0.0.1", 8765), model, max_batch=64, max_delay_ms=2.0)
+        server.serve_forever()
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, model, max_batch=64, max_delay_ms=2.0, timeout_s=10.0):
+        super().__init__(address, _Handler)
+        self.model = model
+        self.timeout_s = timeout_s
+        self.batcher = MicroBatcher(model, max_batch=max_batch, max_delay_ms=max_delay_ms)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+
+
+class InferenceClient:
+    """
+    Client của `InferenceServer`, cùng giao diện dự đoán với `ASLClassificationModel`
+    (có thể đưa thẳng vào `RecognitionPipeline`). Mỗi luồng giữ một kết nối keep-alive.
+    """
+
+    def __init__(self, url, timeout=10.0):
+        parsed = urlparse(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+        self.labels = np.asarray(self._request("GET", "/health")["classes"])
+        self.mapping = dict(enumerate(self.labels.tolist()))
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = HTTPConnection(self.host, self.port, timeout=self.timeout)
+            connection.connect()
+            connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method, path, body=None, headers=None):
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers or {})
+                response = connection.getresponse()
+                payload = json.loads(response.read())
+            except (ConnectionError, OSError):
+                # Kết nối keep-alive bị đóng → mở lại một lần
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                raise RuntimeError(payload.get("error", f"HTTP {response.status}"))
+            return payload
+
+    def stats(self):
+        return self._request("GET", "/stats")
+
+    def predict_proba_batch(self, features):
+        body = np.ascontiguousarray(features, dtype="<f4").tobytes()
+        payload = self._request("POST", "/predict", body,
+                                {"Content-Type": "application/octet-stream"})
+        return np.asarray(payload["labels"]), np.asarray(payload["confidences"])
+
+    def predict_batch(self, features):
+        return self.predict_proba_batch(features)[0]
+
+    def predict(self, feature):
+        return self.predict_batch(feature)[0]
+
+    def predict_with_confidence(self, feature):
+        try:
+            labels, confidences = self.predict_proba_batch(feature)
+            return labels[0], confidences[0]
+        except Exception as e:
+            print(f"Prediction Error: {e}")
+            return "Error", 0.0
@@ -0,0 +1,186 @@
+"""
+Xấp xỉ kernel RBF bằng ánh xạ đặc trưng cỡ cố định + bộ phân loại tuyến tính.
+
+Dự đoán của SVC chính xác tốn O(số support vector) - tăng theo dữ liệu và số lớp.
+Ở đây mỗi dòng được ánh xạ sang `n_components` đặc trưng rồi nhân với một ma trận
+(n_components, n_classes), nên chi phí chỉ phụ thuộc `n_components`:
+
+    nystroem  kernel RBF tới `n_components` điểm mốc lấy từ tập train (Nyström)
+    rff       cos(x·W + b) với W ngẫu nhiên (random Fourier features)
+
+Bộ phân loại tuyến tính (hồi quy logistic đa lớp) được gộp sẵn vào ma trận cuối
+(chuẩn hoá Nyström / hệ số √(2/m) của RFF), nên suy luận chỉ cần NumPy.
+"""
+import time
+
+import numpy as np
+
+APPROX_METHODS = ("nystroem", "rff")
+
+
+class _LinearKernelEngine:
+    """Phần chung: đặc trưng (N, m) @ weights (m, n_classes) + intercept → softmax."""
+
+    def __init__(self, weights, intercept, gamma, classes):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+        self.intercept = np.asarray(intercept, dtype=np.float32)
+        self.gamma = float(gamma)
+        self.classes_ = np.asarray(classes)
+
+    @property
+    def n_components(self):
+        return self.weights.shape[0]
+
+    def features(self, X):
+        raise NotImplementedError
+
+    def decision_function(self, X):
+        scores = self.features(np.atleast_2d(np.asarray(X, dtype=np.float32))) @ self.weights
+        scores += self.intercept
+        return scores
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.decision_function(X), axis=1)]
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X).astype(np.float64)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+
+class NystroemEngine(_LinearKernelEngine):
+    """Kernel RBF tới các điểm mốc (n_components, n_features), chuẩn hoá đã gộp vào `weights`."""
+
+    def __init__(self, components, weights, intercept, gamma, classes):
+        """
+        Args:
+            components: Các điểm mốc (m, n_features).
+            weights: normalization.T @ coef.T của Nyström + hồi quy logistic (m, n_classes).
+            intercept: Hệ số tự do (n_classes,).
+            gamma: Tham số kernel RBF.
+            classes: Nhãn của các lớp.
+        """
+        super().__init__(weights, intercept, gamma, classes)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.component_norms = np.einsum("ij,ij->i", self.components, self.components, dtype=np.float64).astype(np.float32)
+
+    def to_arrays(self):
+        return {"components": self.components, "weights": self.weights, "intercept": self.intercept,
+                "gamma": np.asarray(self.gamma), "classes": self.classes_}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays["components"], arrays["weights"], arrays["intercept"], float(arrays["gamma"]),
+                   arrays["classes"])
+
+    def features(self, X):
+        # Cùng cách tính với RBFSVMEngine._kernel, chỉ khác tập điểm
+        x_norms = np.einsum("ij,ij->i", X, X, dtype=np.float64).astype(np.float32)
+        K = X @ self.components.T
+        K *= -2.0
+        K += x_norms[:, None]
+        K += self.component_norms[None, :]
+        np.maximum(K, 0.0, out=K)
+        K *= np.float32(-self.gamma)
+        return np.exp(K, out=K)
+
+
+class RFFEngine(_LinearKernelEngine):
+    """Random Fourier features cos(X @ random_weights + random_offset), hệ số √(2/m) đã gộp vào `weights`."""
+
+    def __init__(self, random_weights, random_offset, weights, intercept, gamma, classes):
+        """
+        Args:
+            random_weights: Ma trận chiếu ngẫu nhiên (n_features, m), phân phối N(0, 2·gamma).
+            random_offset: Độ lệch pha (m,), phân phối đều trên [0, 2π).
+            weights: √(2/m) · coef.T của hồi quy logistic (m, n_classes).
+            intercept: Hệ số tự do (n_classes,).
+            gamma: Tham số kernel RBF (chỉ để ghi nhận).
+            classes: Nhãn của các lớp.
+        """
+        super().__init__(weights, intercept, gamma, classes)
+        self.random_weights = np.ascontiguousarray(random_weights, dtype=np.float32)
+        self.random_offset = np.asarray(random_offset, dtype=np.float32)
+
+    def to_arrays(self):
+        return {"random_weights": self.random_weights, "random_offset": self.random_offset,
+                "weights": self.weights, "intercept": self.intercept,
+                "gamma": np.asarray(self.gamma), "classes": self.classes_}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays["random_weights"], arrays["random_offset"], arrays["weights"], arrays["intercept"],
+                   float(arrays["gamma"]), arrays["classes"])
+
+    def features(self, X):
+        Z = X @ self.random_weights
+        Z += self.random_offset
+        return np.cos(Z, out=Z)
+
+
+def _linear_head(coef, intercept):
+    """Hồi quy logistic 2 lớp chỉ có một hàng hệ số: softmax của (-z/2, z/2) đúng bằng sigmoid(z)."""
+    if coef.shape[0] == 1:
+        return np.vstack([-coef, coef]) / 2.0, np.concatenate([-intercept, intercept]) / 2.0
+    return coef, intercept
+
+
+def fit_approx(X, y, method="nystroem", n_components=1000, gamma=0.1, C=10.0, seed=0):
+    """
+    Học ánh xạ xấp xỉ kernel (sklearn Nystroem / RBFSampler) + hồi quy logistic đa lớp.
+
+    Returns:
+        NystroemEngine | RFFEngine
+    """
+    from sklearn.kernel_approximation import Nystroem, RBFSampler
+    from sklearn.linear_model import LogisticRegression
+
+    X = np.asarray(X, dtype=np.float64)
+    if method == "nystroem":
+        mapper = Nystroem(kernel="rbf", gamma=gamma, n_components=min(n_components, len(X)), random_state=seed)
+    elif method == "rff":
+        mapper = RBFSampler(gamma=gamma, n_components=n_components, random_state=seed)
+    else:
+        raise ValueError(f"Unknown approximation '{method}'. Choose one of {APPROX_METHODS}.")
+
+    Z = mapper.fit_transform(X)
+    classifier = LogisticRegression(C=C, max_iter=2000).fit(Z, y)
+    coef, intercept = _linear_head(classifier.coef_, classifier.intercept_)
+
+    if method == "nystroem":
+        # Nystroem.transform(X) = K(X, components) @ normalization.T
+        return NystroemEngine(mapper.components_, mapper.normalization_.T @ coef.T, intercept, gamma,
+                              classifier.classes_)
+    # RBFSampler.transform(X) = √(2/m) · cos(X @ W + b)
+    scale = np.sqrt(2.0 / n_components)
+    return RFFEngine(mapper.random_weights_, mapper.random_offset_, scale * coef.T, intercept, gamma,
+                     classifier.classes_)
+
+
+def sweep_components(X_train, y_train, X_test, y_test, method, components, gamma, C=10.0, seed=0,
+                     progress=None):
+    """
+    Huấn luyện lần lượt với từng giá trị `n_components`, đo độ chính xác trên tập test
+    và độ trễ dự đoán một dòng.
+
+    Returns:
+        list[dict]: mỗi phần tử gồm n_components, accuracy, latency_us, fit_seconds.
+    """
+    from utils.hparam_search import measure_latency
+
+    results = []
+    for n_components in components:
+        start = time.perf_counter()
+        engine = fit_approx(X_train, y_train, method, n_components, gamma, C, seed)
+        fit_seconds = time.perf_counter() - start
+        results.append({
+            "n_components": engine.n_components,
+            "accuracy": float(np.mean(engine.predict(X_test) == y_test)),
+            "latency_us": measure_latency(engine, X_test),
+            "fit_seconds": fit_seconds,
+        })
+        if progress:
+            progress(results[-1])
+    return results
@@ -0,0 +1,74 @@
+"""
+Bộ suy luận MLP nhỏ thuần NumPy - model "học trò" được chưng cất từ RBF-SVM (xem utils/distill.py).
+
+Chi phí mỗi khung hình là vài phép nhân ma trận cỡ cố định (86 → ẩn → số lớp),
+không phụ thuộc số support vector của model thầy.
+"""
+import numpy as np
+
+
+class MLPEngine:
+    """
+    Perceptron nhiều lớp: các lớp ẩn ReLU + softmax, trọng số float32.
+
+    Chuẩn hoá đầu vào (trừ trung bình, chia độ lệch chuẩn) đã được gộp sẵn vào lớp đầu,
+    nên dự đoán chỉ gồm `len(weights)` phép GEMM.
+
+    Giao diện giống estimator của sklearn (`classes_`, `predict`, `predict_proba`)
+    nên có thể đưa thẳng vào `ASLClassificationModel`.
+    """
+
+    def __init__(self, weights, biases, classes):
+        """
+        Args:
+            weights: Danh sách ma trận (d_in, d_out) của từng lớp.
+            biases: Danh sách vector (d_out,) tương ứng.
+            classes: Nhãn của các lớp đầu ra.
+        """
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.classes_ = np.asarray(classes)
+
+    # --- Lưu / nạp ---
+    def to_arrays(self):
+        arrays = {"n_layers": np.asarray(len(self.weights)), "classes": self.classes_}
+        for index, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"w{index}"] = weight
+            arrays[f"b{index}"] = bias
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        n_layers = int(arrays["n_layers"])
+        return cls([arrays[f"w{i}"] for i in range(n_layers)],
+                   [arrays[f"b{i}"] for i in range(n_layers)], arrays["classes"])
+
+    # --- Suy luận ---
+    @property
+    def hidden_sizes(self):
+        return [w.shape[1] for w in self.weights[:-1]]
+
+    @property
+    def n_parameters(self):
+        return sum(w.size + b.size for w, b in zip(self.weights, self.biases))
+
+    def decision_function(self, X):
+        """Logit của từng lớp (N, n_classes)."""
+        h = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        for weight, bias in zip(self.weights[:-1], self.biases[:-1]):
+            h = h @ weight
+            h += bias
+            np.maximum(h, 0.0, out=h)
+        logits = h @ self.weights[-1]
+        logits += self.biases[-1]
+        return logits
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.decision_function(X), axis=1)]
+
+    def predict_proba(self, X):
+        logits = self.decision_function(X).astype(np.float64)
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
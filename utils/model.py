@@ -4,6 +4,14 @@ import numpy as np
 class ASLClassificationModel:
     @staticmethod
     def load_model(model_path):
+        # Định dạng .aslm (header JSON + mảng memory-map) → nạp không cần sklearn
+        if str(model_path).endswith(".aslm"):
+            return ASLClassificationModel.load_artifact(model_path)
+
+        # Engine NumPy đã xuất (.npz) → nạp không cần sklearn
+        if str(model_path).endswith(".npz"):
+            return ASLClassificationModel.load_engine(model_path)
+
         # Load model and mapping from pickle
         with open(model_path, "rb") as file:
             model, mapping = pickle.load(file)
@@ -13,38 +21,131 @@ class ASLClassificationModel:
 
         raise Exception("Model not loaded correctly!")
 
-    def __init__(self, model, mapping):
+    @staticmethod
+    def load_engine(engine_path):
+        """Nạp `RBFSVMEngine` đã xuất bằng `export_engine` (chỉ cần NumPy)."""
+        from utils.svm_engine import RBFSVMEngine
+
+        with np.load(engine_path, allow_pickle=False) as arrays:
+            arrays = {name: arrays[name] for name in arrays.files}
+        labels = arrays.pop("labels").tolist()
+        # File cũ không có "label_keys" → khoá 0..k-1
+        keys = arrays.pop("label_keys").tolist() if "label_keys" in arrays else range(len(labels))
+        return ASLClassificationModel(RBFSVMEngine.from_arrays(arrays), dict(zip(keys, labels)))
+
+    @staticmethod
+    def load_artifact(artifact_path):
+        """Nạp model `.aslm` (xem utils/artifact.py); header được giữ trong `metadata`."""
+        from utils.artifact import load_artifact
+
+        engine, mapping, header = load_artifact(artifact_path)
+        return ASLClassificationModel(engine, mapping, metadata=header)
+
+    def export_artifact(self, artifact_path, hyperparameters=None, training_data=None):
+        """Xuất model hiện tại sang định dạng `.aslm` (SVC sklearn được chuyển sang `RBFSVMEngine`)."""
+        from utils.artifact import save_artifact
+        from utils.svm_engine import RBFSVMEngine
+
+        engine = self.model
+        if not hasattr(engine, "to_arrays"):
+            engine = RBFSVMEngine.from_svc(engine)
+            if hyperparameters is None:
+                hyperparameters = {"kernel": "rbf", "C": float(self.model.C), "gamma": engine.gamma}
+        return save_artifact(artifact_path, engine, self.labels, hyperparameters, training_data, keys=self.keys)
+
+    def export_engine(self, engine_path):
+        """Xuất SVC hiện tại sang `RBFSVMEngine` float32 và lưu kèm bảng nhãn (.npz)."""
+        from utils.svm_engine import RBFSVMEngine
+
+        engine = self.model if isinstance(self.model, RBFSVMEngine) else RBFSVMEngine.from_svc(self.model)
+        # Lưu cả khoá lớp: `classes_` của engine giữ nguyên khoá gốc, có thể không liên tục
+        np.savez(engine_path, labels=self.labels, label_keys=self.keys, **engine.to_arrays())
+        return engine
+
+    def __init__(self, model, mapping, metadata=None):
         self.model = model
         self.mapping = mapping
+        # Header của file .aslm (None với model pickle/npz)
+        self.metadata = metadata
+        # Bảng tra nhãn dạng mảng để ánh xạ cả batch chỉ số → nhãn trong một lần.
+        # Khoá của mapping không nhất thiết là 0..k-1 (train.py cũ bỏ qua file rỗng mà không
+        # đánh số lại) nên tra theo vị trí của khoá trong `self.keys`.
+        self.keys = np.asarray(sorted(mapping))
+        self.labels = np.asarray([mapping[i] for i in self.keys.tolist()])
+
+    def _lookup(self, class_values):
+        """Giá trị lớp (khoá của mapping) → nhãn, cho cả batch."""
+        class_values = np.asarray(class_values)
+        positions = np.minimum(np.searchsorted(self.keys, class_values), len(self.keys) - 1)
+        if not np.array_equal(self.keys[positions], class_values):
+            missing = class_values[self.keys[positions] != class_values]
+            raise KeyError(f"Class {missing[0].item()!r} not in label mapping")
+        return self.labels[positions]
+
+    @staticmethod
+    def _as_batch(features):
+        """Chuẩn hoá đầu vào về mảng 2 chiều (N, 86)."""
+        features = np.asarray(features)
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+        return features
+
+    def predict_batch(self, features):
+        """
+        Dự đoán nhãn cho nhiều vector đặc trưng cùng lúc.
+
+        Args:
+            features: Mảng (N, 86) hoặc một vector (86,).
+
+        Returns:
+            np.ndarray: Mảng nhãn (N,).
+        """
+        features = self._as_batch(features)
+        return self._lookup(self.model.predict(features))
+
+    def predict_proba_batch(self, features):
+        """
+        Dự đoán nhãn VÀ độ tin cậy cho nhiều vector đặc trưng cùng lúc.
+
+        Toàn bộ batch chỉ đi qua sklearn một lần, nên chi phí kiểm tra đầu vào
+        và dispatch được chia đều cho N dòng thay vì trả lại cho từng khung hình.
+
+        Args:
+            features: Mảng (N, 86) hoặc một vector (86,).
+
+        Returns:
+            tuple: (labels, confidences) - hai mảng kích thước (N,).
+        """
+        features = self._as_batch(features)
+
+        # Fallback cho model cũ hoặc model không hỗ trợ xác suất
+        if not hasattr(self.model, "predict_proba"):
+            labels = self.predict_batch(features)
+            return labels, np.ones(len(labels))
+
+        probas = self.model.predict_proba(features)
+        max_index = np.argmax(probas, axis=1)
+        confidences = probas[np.arange(len(probas)), max_index]
+        # Cột xác suất → giá trị lớp theo `classes_` của model (nếu có)
+        classes = getattr(self.model, "classes_", None)
+        return self._lookup(max_index if classes is None else np.asarray(classes)[max_index]), confidences
 
     def predict(self, feature):
         """Trả về nhãn dự đoán (cách cũ)"""
-        return self.mapping[self.model.predict(feature.reshape(1, -1)).item()]
+        return self.predict_batch(feature)[0]
 
     def predict_with_confidence(self, feature):
         """
         Trả về nhãn dự đoán VÀ độ tin cậy (confidence score).
-        
+
         Returns:
             tuple: (label_str, confidence_float)
             Ví dụ: ("xin_chào", 0.95)
         """
-        # Reshape feature để phù hợp input của model
-        feature_reshaped = feature.reshape(1, -1)
-        
-        # Lấy xác suất của tất cả các lớp
         # Lưu ý: Model phải được train với probability=True (đã cập nhật trong train.py)
         try:
-            # Kiểm tra xem model có hỗ trợ predict_proba không (SVC cần probability=True)
-            if hasattr(self.model, "predict_proba"):
-                probas = self.model.predict_proba(feature_reshaped)[0]
-                max_index = np.argmax(probas)
-                confidence = probas[max_index]
-                label = self.mapping[max_index]
-                return label, confidence
-            else:
-                # Fallback cho model cũ hoặc model không hỗ trợ xác suất
-                return self.predict(feature), 1.0
+            labels, confidences = self.predict_proba_batch(feature)
+            return labels[0], confidences[0]
         except Exception as e:
             print(f"Prediction Error: {e}")
-            return "Error", 0.0
\ No newline at end of file
+            return "Error", 0.0
@@ -0,0 +1,253 @@
+"""
+Huấn luyện SVC one-vs-one theo từng cặp lớp, có cache theo nội dung dữ liệu.
+
+libsvm huấn luyện SVC đa lớp bằng k(k-1)/2 bài toán nhị phân độc lập, mỗi bài chỉ
+dùng dữ liệu của hai lớp. Ở đây từng cặp được fit riêng (kể cả Platt scaling khi
+probability=True) và lưu vào cache với khoá là:
+
+    sha256(dấu vân tay dữ liệu lớp a, dấu vân tay lớp b, siêu tham số)
+
+Dấu vân tay của một lớp là sha256 của chính mảng đặc trưng, nên:
+- chạy lại với dữ liệu không đổi → mọi cặp lấy từ cache, không fit lại gì;
+- thêm / thu lại một lớp → chỉ fit lại các cặp có lớp đó (k-1 cặp), phần còn lại dùng lại.
+
+Các cặp được ghép thành một `RBFSVMEngine` (support vector dùng chung theo lớp).
+Lưu ý gamma phải là số cố định: gamma='scale' phụ thuộc phương sai của TOÀN BỘ dữ
+liệu nên mọi thay đổi đều làm khoá của tất cả các cặp thay đổi theo.
+
+Các cặp cần fit là độc lập nên có thể chia cho nhiều tiến trình (`workers`): dữ liệu
+các lớp được ghi một lần ra file .npy, tiến trình con đọc bằng memory-map (chỉ đọc,
+không sao chép qua pipe), chỉ kết quả nhỏ của từng cặp được gửi về. Mỗi cặp fit với
+random_state cố định nên model thu được giống hệt nhau với mọi số tiến trình.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from utils.artifact import data_fingerprint
+from utils.svm_engine import RBFSVMEngine, pair_indices
+
+CACHE_VERSION = 1
+
+
+def class_fingerprint(features):
+    """sha256 của mảng đặc trưng một lớp (gồm cả dtype và kích thước)."""
+    return data_fingerprint(features)
+
+
+def split_class(n_rows, test_size=0.2, seed=42):
+    """
+    Chia train/test RIÊNG cho một lớp, chỉ phụ thuộc số dòng của lớp đó.
+
+    Khác `train_test_split` trên toàn bộ dữ liệu, thêm hay sửa lớp khác không làm
+    thay đổi tập train của lớp này - điều kiện để dùng lại các cặp đã cache.
+    """
+    order = np.random.default_rng(seed).permutation(n_rows)
+    n_test = int(round(n_rows * test_size))
+    return np.sort(order[n_test:]), np.sort(order[:n_test])
+
+
+class PairCache:
+    """Thư mục chứa các cặp đã fit: <cache_dir>/pairs/<khoá>.npz."""
+
+    def __init__(self, cache_dir):
+        self.pair_dir = os.path.join(cache_dir, "pairs")
+        os.makedirs(self.pair_dir, exist_ok=True)
+
+    @staticmethod
+    def key(fingerprint_a, fingerprint_b, params):
+        payload = json.dumps({"version": CACHE_VERSION, "a": fingerprint_a, "b": fingerprint_b,
+                              "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.pair_dir, f"{key}.npz")
+
+    def load(self, key):
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        with np.load(path, allow_pickle=False) as arrays:
+            return {name: arrays[name] for name in arrays.files}
+
+    def save(self, key, entry):
+        # Ghi file tạm rồi đổi tên → không bao giờ để lại entry ghi dở
+        path = self._path(key)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **entry)
+        os.replace(tmp_path, path)
+
+
+def fit_pair(features_a, features_b, C, gamma, probability=True, random_state=42):
+    """
+    Fit SVC nhị phân lớp a (dương) với lớp b.
+
+    Returns:
+        dict: rows_a/rows_b (chỉ số support vector trong mảng của từng lớp), coef_a/coef_b,
+        intercept, và prob_a/prob_b (tham số Platt) nếu probability=True - theo quy ước
+        libsvm, decision > 0 nghĩa là lớp a.
+    """
+    from sklearn.svm import SVC
+
+    X = np.concatenate((features_a, features_b))
+    y = np.repeat([0, 1], (len(features_a), len(features_b)))
+    svc = SVC(kernel="rbf", C=C, gamma=gamma, probability=probability,
+              random_state=random_state).fit(X, y)
+
+    # sklearn đảo dấu dual_coef_/intercept_ ở bài toán 2 lớp, đưa về quy ước libsvm
+    coef = -svc.dual_coef_[0]
+    is_a = svc.support_ < len(features_a)
+    entry = {
+        "rows_a": svc.support_[is_a],
+        "rows_b": svc.support_[~is_a] - len(features_a),
+        "coef_a": coef[is_a],
+        "coef_b": coef[~is_a],
+        "intercept": np.asarray(-svc.intercept_[0]),
+    }
+    if probability:
+        entry["prob_a"] = np.asarray(svc.probA_[0])
+        entry["prob_b"] = np.asarray(svc.probB_[0])
+    return entry
+
+
+def reverse_pair(entry):
+    """Đổi vai trò hai lớp: decision đổi dấu, P(b thắng a) = 1 - P(a thắng b) ⇒ B' = -B."""
+    reversed_entry = {
+        "rows_a": entry["rows_b"], "rows_b": entry["rows_a"],
+        "coef_a": -entry["coef_b"], "coef_b": -entry["coef_a"],
+        "intercept": -entry["intercept"],
+    }
+    if "prob_a" in entry:
+        reversed_entry["prob_a"] = entry["prob_a"]
+        reversed_entry["prob_b"] = -entry["prob_b"]
+    return reversed_entry
+
+
+def assemble_engine(class_features, entries, gamma):
+    """
+    Ghép các cặp (theo thứ tự `pair_indices`) thành một `RBFSVMEngine`.
+
+    Support vector của mỗi lớp là hợp các dòng mà mọi cặp có lớp đó sử dụng.
+    """
+    n_classes = len(class_features)
+    pair_i, pair_j = pair_indices(n_classes)
+
+    # Dòng nào của lớp c là support vector ở ít nhất một cặp
+    used = [set() for _ in range(n_classes)]
+    for entry, i, j in zip(entries, pair_i, pair_j):
+        used[i].update(entry["rows_a"].tolist())
+        used[j].update(entry["rows_b"].tolist())
+    rows = [np.array(sorted(u), dtype=np.intp) for u in used]
+    offsets = np.concatenate(([0], np.cumsum([len(r) for r in rows])))
+
+    support_vectors = np.concatenate([np.asarray(features)[r]
+                                      for features, r in zip(class_features, rows)])
+    pair_coef = np.zeros((len(support_vectors), len(entries)), dtype=np.float64)
+    for p, (entry, i, j) in enumerate(zip(entries, pair_i, pair_j)):
+        pair_coef[offsets[i] + np.searchsorted(rows[i], entry["rows_a"]), p] = entry["coef_a"]
+        pair_coef[offsets[j] + np.searchsorted(rows[j], entry["rows_b"]), p] = entry["coef_b"]
+
+    intercept = np.array([float(entry["intercept"]) for entry in entries])
+    prob_a = prob_b = None
+    if entries and "prob_a" in entries[0]:
+        prob_a = np.array([float(entry["prob_a"]) for entry in entries])
+        prob_b = np.array([float(entry["prob_b"]) for entry in entries])
+    return RBFSVMEngine(support_vectors, pair_coef, intercept, gamma, np.arange(n_classes),
+                        prob_a=prob_a, prob_b=prob_b)
+
+
+# --- Tiến trình con ---
+_worker = {}
+
+
+def _init_worker(features_path, offsets):
+    _worker["X"] = np.load(features_path, mmap_mode="r")
+    _worker["offsets"] = offsets
+
+
+def _fit_pair_task(a, b, C, gamma, probability):
+    X, offsets = _worker["X"], _worker["offsets"]
+    return fit_pair(X[offsets[a]:offsets[a + 1]], X[offsets[b]:offsets[b + 1]], C, gamma, probability)
+
+
+def fit_pairs_parallel(class_features, pairs, C, gamma, probability=True, workers=None):
+    """
+    Fit các cặp (a, b) trên nhiều tiến trình, dữ liệu dùng chung qua memory-map.
+
+    Cặp lớn (nhiều dòng) được gửi trước để các tiến trình kết thúc gần cùng lúc.
+
+    Yields:
+        tuple: ((a, b), entry) theo thứ tự hoàn thành.
+    """
+    offsets = np.concatenate(([0], np.cumsum([len(features) for features in class_features])))
+    sizes = np.diff(offsets)
+    order = sorted(pairs, key=lambda pair: sizes[pair[0]] + sizes[pair[1]], reverse=True)
+
+    with tempfile.TemporaryDirectory(prefix="ovo_") as tmp_dir:
+        features_path = os.path.join(tmp_dir, "X.npy")
+        np.save(features_path, np.concatenate([np.asarray(features) for features in class_features]))
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(order)),
+                                 initializer=_init_worker, initargs=(features_path, offsets)) as executor:
+            futures = {executor.submit(_fit_pair_task, a, b, C, gamma, probability): (a, b)
+                       for a, b in order}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+
+# --- Tiến trình chính ---
+def train_ovo(class_features, cache, C, gamma, probability=True, params=None, progress=None, workers=1):
+    """
+    Huấn luyện (hoặc lấy từ cache) mọi cặp one-vs-one rồi ghép thành engine.
+
+    Args:
+        class_features: Danh sách mảng đặc trưng train của từng lớp (theo chỉ số lớp).
+        cache: `PairCache`, hoặc None để fit mọi cặp mà không lưu lại.
+        C, gamma: Siêu tham số SVC (gamma là số).
+        params: Các tham số khác ảnh hưởng tới kết quả (đưa vào khoá cache).
+        progress: Hàm gọi lại progress(done, total, reused) sau mỗi cặp (tuỳ chọn).
+        workers: Số tiến trình fit các cặp chưa có trong cache (None: số nhân CPU).
+
+    Returns:
+        tuple: (engine, số cặp lấy từ cache, số cặp vừa fit).
+    """
+    params = dict(params or {}, C=float(C), gamma=float(gamma), probability=bool(probability))
+    fingerprints = [class_fingerprint(features) for features in class_features]
+    pair_i, pair_j = pair_indices(len(class_features))
+    total = len(pair_i)
+
+    entries, pending, reused = [None] * total, {}, 0
+    for p, (i, j) in enumerate(zip(pair_i, pair_j)):
+        # Khoá không phụ thuộc thứ tự lớp: cặp luôn được lưu với lớp "nhỏ hơn" làm lớp dương
+        swap = fingerprints[j] < fingerprints[i]
+        a, b = (j, i) if swap else (i, j)
+        key = PairCache.key(fingerprints[a], fingerprints[b], params)
+        entry = cache.load(key) if cache is not None else None
+        if entry is None:
+            pending[(a, b)] = (p, swap, key)
+            continue
+        reused += 1
+        entries[p] = reverse_pair(entry) if swap else entry
+        if progress is not None:
+            progress(reused, total, reused)
+
+    def finish(pair, entry):
+        p, swap, key = pending[pair]
+        if cache is not None:
+            cache.save(key, entry)
+        entries[p] = reverse_pair(entry) if swap else entry
+        if progress is not None:
+            progress(total - entries.count(None), total, reused)
+
+    if (workers or os.cpu_count()) > 1 and len(pending) > 1:
+        for pair, entry in fit_pairs_parallel(class_features, list(pending), C, gamma, probability, workers):
+            finish(pair, entry)
+    else:
+        for a, b in pending:
+            finish((a, b), fit_pair(class_features[a], class_features[b], C, gamma, probability))
+
+    engine = assemble_engine(class_features, entries, gamma)
+    return engine, reused, len(pending)
@@ -0,0 +1,326 @@
+"""
+Pipeline nhiều luồng: capture → detect → classify → render.
+
+Các stage nối với nhau bằng hàng đợi có giới hạn, bỏ phần tử CŨ NHẤT khi đầy:
+camera không bao giờ phải chờ inference, và giao diện luôn lấy được khung hình mới nhất.
+Việc cập nhật Streamlit vẫn ở luồng chính (Streamlit không cho phép gọi `st.*` từ luồng khác).
+"""
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+import cv2
+
+import numpy as np
+
+from utils.feature_extraction import FeatureExtractor, create_face_backend
+from utils.profiling import StageProfiler
+
+
+def create_detectors(face_backend="facemesh", min_detection_confidence=0.5,
+                     min_tracking_confidence=0.5, face_offset=(0.0, 0.0), warm_up_size=None):
+    """
+    Tạo face backend và MediaPipe Hands.
+
+    Args:
+        warm_up_size: (cao, rộng) - nếu có, chạy mỗi detector một lần trên ảnh đen cỡ đó.
+            Lần `process` đầu tiên của MediaPipe khởi tạo graph và chậm hơn hẳn các lần
+            sau; làm trước thì khung hình thật đầu tiên không phải chờ.
+
+    Returns:
+        tuple: (face_detector, hands)
+    """
+    import mediapipe as mp
+
+    face_detector = create_face_backend(face_backend,
+                                        min_detection_confidence=min_detection_confidence,
+                                        min_tracking_confidence=min_tracking_confidence,
+                                        offset=face_offset)
+    hands = mp.solutions.hands.Hands(max_num_hands=2,
+                                     min_detection_confidence=min_detection_confidence,
+                                     min_tracking_confidence=min_tracking_confidence)
+    if warm_up_size is not None:
+        dummy = np.zeros((*warm_up_size, 3), dtype=np.uint8)
+        face_detector.process(dummy)
+        hands.process(dummy)
+    return face_detector, hands
+
+
+class SharedDetectors:
+    """
+    Bộ (face_detector, hands) dùng lại qua nhiều lần chạy pipeline, mỗi lúc chỉ một luồng dùng.
+
+    Graph MediaPipe không an toàn luồng (timestamp và trạng thái tracking dùng chung), nên
+    luồng detect giữ `lock` suốt thời gian dùng: pipeline mới (ví dụ sau rerun của Streamlit)
+    chờ luồng detect cũ trả lại trước khi gọi `process`. `close` cũng chờ như vậy.
+    """
+
+    def __init__(self, face_detector, hands):
+        self.face_detector = face_detector
+        self.hands = hands
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.face_detector.close()
+            self.hands.close()
+
+
+class DropOldestQueue:
+    """Hàng đợi có giới hạn: `put` không bao giờ chặn, đầy thì bỏ phần tử cũ nhất."""
+
+    def __init__(self, maxsize=2):
+        self._items = deque()
+        self._maxsize = maxsize
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self._maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Lấy phần tử cũ nhất; trả về None nếu hết thời gian chờ hoặc hàng đợi đã đóng."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            return self._items.popleft() if self._items else None
+
+    def get_latest(self, timeout=None):
+        """Lấy phần tử MỚI nhất, các phần tử cũ hơn bị bỏ (tính vào `dropped`)."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def depth(self):
+        return len(self._items)
+
+
+class FramePacket:
+    """Dữ liệu của một khung hình khi đi qua các stage."""
+
+    __slots__ = ("index", "timestamp", "image", "face_results", "hand_results",
+                 "fresh", "label", "confidence", "timings")
+
+    def __init__(self, index, image):
+        self.index = index
+        self.timestamp = time.monotonic()
+        self.image = image
+        self.face_results = None
+        self.hand_results = None
+        self.fresh = True  # False nếu cả hai detector đều dùng lại kết quả cũ
+        self.label = None
+        self.confidence = 0.0
+        self.timings = {}  # thời gian (giây) của từng bước đã xử lý khung hình này
+
+    @property
+    def has_landmarks(self):
+        return bool((self.face_results is not None and self.face_results.multi_face_landmarks) or
+                    (self.hand_results is not None and self.hand_results.multi_hand_landmarks))
+
+
+class RecognitionPipeline:
+    """
+    Chạy camera, MediaPipe, phân loại và vẽ landmarks trên các luồng riêng.
+
+    Độ trễ mỗi khung hình không còn là tổng thời gian của mọi stage: trong khi
+    MediaPipe xử lý khung hình n, camera đã đọc khung n+1 và stage vẽ đang xử lý n-1.
+    MediaPipe và OpenCV nhả GIL khi tính toán nên các luồng chạy song song thật sự.
+
+    Ví dụ:
+        pipeline = RecognitionPipeline(cv2.VideoCapture(0), model, visualizer).start()
+        packet = pipeline.get_latest(timeout=1.0)
+        ...
+        pipeline.stop()
+    """
+
+    STAGES = ("capture", "detect", "classify", "render")
+
+    def __init__(self, capture, model, visualizer, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5, queue_size=2, scheduler=None,
+                 face_backend="facemesh", face_offset=(0.0, 0.0), detectors=None, profiler=None):
+        self.capture = capture
+        self.model = model
+        self.visualizer = visualizer
+        # DetectorScheduler (tuỳ chọn): chạy FaceMesh/Hands với tần suất riêng
+        self.scheduler = scheduler
+        self.face_backend = face_backend
+        self.face_offset = face_offset
+        # `SharedDetectors` đã tạo sẵn (ví dụ theo phiên Streamlit); pipeline không đóng chúng
+        self.detectors = detectors
+        # Thời gian từng bước (luôn bật, chi phí không đáng kể)
+        self.profiler = profiler or StageProfiler()
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+
+        # Hàng đợi đầu ra của từng stage
+        self.queues = {name: DropOldestQueue(queue_size) for name in self.STAGES}
+        self.error = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    # --- Điều khiển ---
+    def start(self):
+        targets = {
+            "capture": self._capture_loop,
+            "detect": self._detect_loop,
+            "classify": self._classify_loop,
+            "render": self._render_loop,
+        }
+        for name in self.STAGES:
+            thread = threading.Thread(target=self._run_stage, args=(name, targets[name]),
+                                      name=f"pipeline-{name}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        for queue in self.queues.values():
+            queue.close()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def record(self, packet, stage, seconds):
+        """Ghi thời gian một bước vào packet và profiler."""
+        packet.timings[stage] = seconds
+        self.profiler.record(stage, seconds)
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    def get_latest(self, timeout=None):
+        """Khung hình mới nhất đã được phân loại và vẽ (hoặc None)."""
+        return self.queues["render"].get_latest(timeout)
+
+    def stats(self):
+        """Độ sâu hàng đợi và số khung hình bị bỏ của từng stage."""
+        return {name: {"depth": queue.depth, "dropped": queue.dropped}
+                for name, queue in self.queues.items()}
+
+    # --- Các stage ---
+    def _run_stage(self, name, loop):
+        try:
+            loop()
+        except Exception as e:
+            self.error = f"{name}: {e}"
+        finally:
+            # Một stage dừng thì cả pipeline dừng
+            self._stop.set()
+            for queue in self.queues.values():
+                queue.close()
+
+    def _inputs(self, upstream):
+        """Lặp qua các packet của stage phía trước cho tới khi pipeline dừng."""
+        queue = self.queues[upstream]
+        while not self._stop.is_set():
+            packet = queue.get(timeout=0.1)
+            if packet is not None:
+                yield packet
+
+    def _capture_loop(self):
+        index = 0
+        while not self._stop.is_set() and self.capture.isOpened():
+            start = time.perf_counter()
+            success, image = self.capture.read()
+            if not success:
+                self.error = "capture: Không tìm thấy camera."
+                return
+            packet = FramePacket(index, image)
+            self.record(packet, "capture", time.perf_counter() - start)
+            self.queues["capture"].put(packet)
+            index += 1
+
+    def _detect_loop(self):
+        with ExitStack() as owned:
+            if self.detectors is not None:
+                # Chờ luồng detect của pipeline trước (nếu còn chạy) trả lại bộ detector
+                while not self.detectors.lock.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        return
+                owned.callback(self.detectors.lock.release)
+                if self.detectors.closed:
+                    self.error = "detect: Bộ detector đã bị đóng."
+                    self._stop.set()
+                    return
+                face_detector, hands = self.detectors.face_detector, self.detectors.hands
+            else:
+                # Tạo graph MediaPipe ngay trong luồng sử dụng nó
+                face_detector, hands = create_detectors(
+                    self.face_backend, self.min_detection_confidence,
+                    self.min_tracking_confidence, self.face_offset)
+                owned.enter_context(face_detector)
+                owned.enter_context(hands)
+
+            for packet in self._inputs("capture"):
+                start = time.perf_counter()
+                image = cv2.cvtColor(packet.image, cv2.COLOR_BGR2RGB)
+                self.record(packet, "convert", time.perf_counter() - start)
+                image.flags.writeable = False
+                if self.scheduler is not None:
+                    timings = {}
+                    packet.face_results, packet.hand_results, packet.fresh = \
+                        self.scheduler.process(image, face_detector, hands, timings)
+                    for stage, seconds in timings.items():
+                        self.record(packet, stage, seconds)
+                else:
+                    start = time.perf_counter()
+                    packet.face_results = face_detector.process(image)
+                    middle = time.perf_counter()
+                    packet.hand_results = hands.process(image)
+                    self.record(packet, "face", middle - start)
+                    self.record(packet, "hands", time.perf_counter() - middle)
+                image.flags.writeable = True
+                packet.image = image
+                self.queues["detect"].put(packet)
+
+    def _classify_loop(self):
+        extractor = FeatureExtractor()
+        last_prediction = (None, 0.0)
+        for packet in self._inputs("detect"):
+            # Chỉ dự đoán nếu phát hiện được tay hoặc mặt
+            if packet.has_landmarks:
+                # Landmarks không đổi → đặc trưng không đổi → dùng lại dự đoán trước
+                if packet.fresh or last_prediction[0] is None:
+                    start = time.perf_counter()
+                    feature = extractor.extract(packet.face_results, packet.hand_results)
+                    middle = time.perf_counter()
+                    last_prediction = self.model.predict_with_confidence(feature)
+                    self.record(packet, "extract", middle - start)
+                    self.record(packet, "classify", time.perf_counter() - middle)
+                packet.label, packet.confidence = last_prediction
+            else:
+                last_prediction = (None, 0.0)
+            self.queues["classify"].put(packet)
+
+    def _render_loop(self):
+        for packet in self._inputs("classify"):
+            start = time.perf_counter()
+            packet.image = self.visualizer.draw_landmarks(packet.image, packet.face_results,
+                                                          packet.hand_results)
+            self.record(packet, "draw", time.perf_counter() - start)
+            self.queues["render"].put(packet)
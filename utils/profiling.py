@@ -0,0 +1,120 @@
+"""
+Đo thời gian từng bước xử lý (capture, đổi màu, FaceMesh, Hands, vẽ, đặc trưng, phân loại, UI).
+
+Mỗi bước giữ N lần đo gần nhất trong một bộ đệm vòng cấp phát sẵn; thống kê (phân vị,
+histogram) chỉ được tính khi cần hiển thị. Ghi một lần đo chỉ tốn một cặp
+`time.perf_counter()` và một phép gán - đủ rẻ để luôn bật khi chạy thật.
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Thứ tự hiển thị các bước
+STAGES = ("capture", "convert", "motion", "face", "hands", "extract", "classify", "draw", "ui")
+
+# Cạnh các ô histogram (ms), chia theo thang log từ 0.01 ms tới 1 s
+HISTOGRAM_EDGES_MS = np.logspace(-2, 3, 21)
+
+_BARS = " ▁▂▃▄▅▆▇█"
+
+
+class RollingStage:
+    """Bộ đệm vòng `window` lần đo gần nhất (giây) của một bước."""
+
+    def __init__(self, window=300):
+        self.samples = np.zeros(window)
+        self.times = np.zeros(window)
+        self.count = 0
+
+    def record(self, seconds, now):
+        # Mỗi bước chỉ được ghi từ một luồng nên không cần khoá
+        index = self.count % len(self.samples)
+        self.samples[index] = seconds
+        self.times[index] = now
+        self.count += 1
+
+    def window(self):
+        n = min(self.count, len(self.samples))
+        return self.samples[:n].copy(), self.times[:n].copy()
+
+
+class StageProfiler:
+    """
+    Ví dụ:
+        profiler = StageProfiler(jsonl_path="outputs/profile.jsonl")
+        start = time.perf_counter()
+        ...
+        profiler.record("classify", time.perf_counter() - start)
+        profiler.summary()   # {stage: {p50, p95, p99, mean, hz, histogram}}
+    """
+
+    def __init__(self, window=300, jsonl_path=None):
+        self.window_size = window
+        self._stages = {name: RollingStage(window) for name in STAGES}
+        self._lock = threading.Lock()  # chỉ dùng khi thêm bước mới
+        self._jsonl = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+            self._jsonl = open(jsonl_path, "a", encoding="utf-8", buffering=1 << 16)
+
+    def record(self, stage, seconds):
+        holder = self._stages.get(stage)
+        if holder is None:
+            with self._lock:
+                holder = self._stages.setdefault(stage, RollingStage(self.window_size))
+        holder.record(seconds, time.monotonic())
+
+    def log_frame(self, index, timings):
+        """Ghi thời gian các bước của một khung hình (giây → ms) thành một dòng JSONL."""
+        if self._jsonl is None:
+            return
+        line = {"frame": index, "t": round(time.time(), 4)}
+        line.update((stage, round(seconds * 1e3, 4)) for stage, seconds in timings.items())
+        self._jsonl.write(json.dumps(line) + "\n")
+
+    def close(self):
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+    def summary(self):
+        """Thống kê (ms) của các bước đã có dữ liệu, theo thứ tự `STAGES`."""
+        now = time.monotonic()
+        result = {}
+        for name, holder in list(self._stages.items()):
+            samples, times = holder.window()
+            if not len(samples):
+                continue
+            samples_ms = samples * 1e3
+            p50, p95, p99 = np.percentile(samples_ms, (50, 95, 99))
+            span = now - times.min()
+            result[name] = {
+                "p50": float(p50), "p95": float(p95), "p99": float(p99),
+                "mean": float(samples_ms.mean()),
+                "hz": len(samples) / span if span > 0 else 0.0,
+                # Giá trị ngoài khoảng được dồn vào ô đầu/cuối thay vì bị bỏ
+                "histogram": np.histogram(np.clip(samples_ms, HISTOGRAM_EDGES_MS[0], HISTOGRAM_EDGES_MS[-1]),
+                                          bins=HISTOGRAM_EDGES_MS)[0],
+            }
+        return result
+
+
+def sparkline(counts):
+    """Histogram dạng một dòng ký tự ▁▂▃▄▅▆▇█."""
+    counts = np.asarray(counts)
+    if counts.max() == 0:
+        return " " * len(counts)
+    levels = np.ceil(counts / counts.max() * (len(_BARS) - 1)).astype(int)
+    return "".join(_BARS[level] for level in levels)
+
+
+def format_summary(summary):
+    """Bảng text cho sidebar: phân vị, tần suất và histogram 0.01 ms → 1 s (thang log)."""
+    lines = [f"{'bước':<9}{'p50':>7}{'p95':>7}{'p99':>7}{'Hz':>6}  0.01ms→1s"]
+    for name, stats in summary.items():
+        lines.append(f"{name:<9}{stats['p50']:>7.2f}{stats['p95']:>7.2f}{stats['p99']:>7.2f}"
+                     f"{stats['hz']:>6.1f}  {sparkline(stats['histogram'])}")
+    return "\n".join(lines)
@@ -0,0 +1,134 @@
+"""
+Lập lịch chạy FaceMesh và Hands với tần suất độc lập.
+
+Mỗi detector có tần suất tối đa (không chạy dày hơn) và tối thiểu (luôn làm mới
+sau một khoảng thời gian). Giữa hai mức đó, detector chỉ chạy khi bộ lọc chuyển
+động rẻ tiền (hiệu ảnh thu nhỏ) báo khung hình đã thay đổi đủ nhiều so với lần chạy
+trước của chính detector đó. Khi không chạy, kết quả lần trước được dùng lại.
+"""
+import time
+from collections import deque
+
+import cv2
+
+
+class MotionGate:
+    """Đo chuyển động bằng trung bình |hiệu| giữa hai ảnh xám thu nhỏ (thang 0-255)."""
+
+    def __init__(self, size=(64, 48)):
+        self.size = size
+
+    def thumbnail(self, image):
+        small = cv2.resize(image, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+    @staticmethod
+    def difference(thumbnail, reference):
+        if reference is None:
+            return float("inf")
+        return float(cv2.absdiff(thumbnail, reference).mean())
+
+
+class DetectorSchedule:
+    """Trạng thái lập lịch của một detector."""
+
+    def __init__(self, name, max_hz, min_hz, motion_threshold, window=2.0):
+        self.name = name
+        self.stage = name.lower()  # tên bước trong StageProfiler
+        self.max_hz = max_hz
+        self.min_hz = min_hz
+        self.motion_threshold = motion_threshold
+        self.window = window  # cửa sổ (giây) để tính tần suất thực tế
+
+        self.results = None
+        self.reference = None
+        self.last_run = float("-inf")
+        self.last_motion = 0.0
+        self._runs = deque()
+
+    def should_run(self, now, motion):
+        """
+        Quyết định có chạy detector ở khung hình này không.
+
+        - Chưa đủ 1/max_hz giây kể từ lần trước → không chạy.
+        - Quá 1/min_hz giây → luôn chạy để làm mới.
+        - Ở giữa → chỉ chạy nếu chuyển động vượt ngưỡng.
+        """
+        elapsed = now - self.last_run
+        if self.max_hz > 0 and elapsed < 1.0 / self.max_hz:
+            return False
+        if self.min_hz > 0 and elapsed >= 1.0 / self.min_hz:
+            return True
+        return motion >= self.motion_threshold
+
+    def mark_run(self, now, results, reference):
+        self.results = results
+        self.reference = reference
+        self.last_run = now
+        self._runs.append(now)
+
+    def effective_hz(self, now=None):
+        """Số lần chạy mỗi giây trong `window` giây gần nhất."""
+        now = time.monotonic() if now is None else now
+        while self._runs and now - self._runs[0] > self.window:
+            self._runs.popleft()
+        return len(self._runs) / self.window
+
+
+class DetectorScheduler:
+    """
+    Chạy FaceMesh và Hands theo lịch riêng của từng detector.
+
+    Tâm khuôn mặt (đặc trưng duy nhất lấy từ face backend) gần như không đổi giữa các
+    khung hình, nên FaceMesh có thể chạy thưa hơn Hands nhiều. Cảnh đứng yên
+    (`binh_thuong`) chỉ tốn CPU ở mức `min_hz` của mỗi detector.
+    """
+
+    def __init__(self, face_max_hz=10.0, face_min_hz=1.0, hands_max_hz=30.0, hands_min_hz=5.0,
+                 motion_threshold=3.0, adaptive=True):
+        self.gate = MotionGate()
+        self.adaptive = adaptive
+        self.face = DetectorSchedule("Face", face_max_hz, face_min_hz, motion_threshold)
+        self.hands = DetectorSchedule("Hands", hands_max_hz, hands_min_hz, motion_threshold)
+
+    def process(self, image, face_detector, hands, timings=None):
+        """
+        Chạy (hoặc bỏ qua) từng detector trên ảnh RGB.
+
+        Args:
+            timings: dict (tuỳ chọn) nhận thời gian (giây) của các bước đã chạy:
+                "motion", "face", "hands".
+
+        Returns:
+            tuple: (face_results, hand_results, fresh) - `fresh` là True nếu có ít nhất
+            một detector vừa chạy, tức đặc trưng có thể đã thay đổi.
+        """
+        timings = {} if timings is None else timings
+        now = time.monotonic()
+        if not self.adaptive:
+            for schedule, detector in ((self.face, face_detector), (self.hands, hands)):
+                start = time.perf_counter()
+                schedule.mark_run(now, detector.process(image), None)
+                timings[schedule.stage] = time.perf_counter() - start
+            return self.face.results, self.hands.results, True
+
+        start = time.perf_counter()
+        thumbnail = self.gate.thumbnail(image)
+        timings["motion"] = time.perf_counter() - start
+        fresh = False
+        for schedule, detector in ((self.face, face_detector), (self.hands, hands)):
+            motion = self.gate.difference(thumbnail, schedule.reference)
+            schedule.last_motion = motion
+            if schedule.results is None or schedule.should_run(now, motion):
+                start = time.perf_counter()
+                schedule.mark_run(now, detector.process(image), thumbnail)
+                timings[schedule.stage] = time.perf_counter() - start
+                fresh = True
+        return self.face.results, self.hands.results, fresh
+
+    def stats(self):
+        """Tần suất thực tế (Hz) và mức chuyển động gần nhất của từng detector."""
+        now = time.monotonic()
+        return {schedule.name: {"hz": schedule.effective_hz(now),
+                                "motion": min(schedule.last_motion, 255.0)}
+                for schedule in (self.face, self.hands)}
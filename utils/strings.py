@@ -28,12 +28,91 @@ class ExpressionHandler:
         "xin_loi":"Xin lỗi"
     }
 
-    def __init__(self):
+    def __init__(self, window_size=1, quorum=1):
+        """
+        Args:
+            window_size: Số khung hình gần nhất được giữ trong cửa sổ trượt.
+            quorum: Số phiếu tối thiểu trong cửa sổ để đổi nhãn hiển thị.
+                Mặc định (1, 1) giữ hành vi cũ: luôn hiển thị nhãn mới nhất.
+        """
+        if not 1 <= quorum <= window_size:
+            raise ValueError("quorum must be between 1 and window_size")
+        self.window_size = window_size
+        self.quorum = quorum
+
+        # Cửa sổ trượt dạng vòng (ring buffer) kích thước cố định: (chỉ số nhãn, confidence)
+        self._window_labels = [-1] * window_size
+        self._window_confidences = [0.0] * window_size
+        self._position = 0
+
+        # Số phiếu và tổng confidence của từng nhãn trong cửa sổ, cập nhật O(1) mỗi khung hình
+        self._label_index = {}
+        self._labels = []
+        self._votes = []
+        self._confidence_sums = []
+
         # Save the current message and the time received the current message
         self.current_message = ""
+        self._current_index = -1
+        self.changed = False
+
+    def _index_of(self, message):
+        index = self._label_index.get(message)
+        if index is None:
+            index = len(self._labels)
+            self._label_index[message] = index
+            self._labels.append(message)
+            self._votes.append(0)
+            self._confidence_sums.append(0.0)
+        return index
+
+    def receive(self, message, confidence=1.0):
+        """
+        Đưa nhãn của một khung hình vào cửa sổ.
+
+        Nhãn hiển thị chỉ đổi khi nhãn mới đạt đủ `quorum` phiếu trong cửa sổ.
+
+        Returns:
+            bool: True nếu nhãn hiển thị vừa thay đổi.
+        """
+        index = self._index_of(message)
+        position = self._position
+
+        # Bỏ phần tử cũ nhất ra khỏi cửa sổ
+        old_index = self._window_labels[position]
+        if old_index >= 0:
+            self._votes[old_index] -= 1
+            self._confidence_sums[old_index] -= self._window_confidences[position]
+
+        self._window_labels[position] = index
+        self._window_confidences[position] = confidence
+        self._votes[index] += 1
+        self._confidence_sums[index] += confidence
+        self._position = (position + 1) % self.window_size
+
+        self.changed = index != self._current_index and self._votes[index] >= self.quorum
+        if self.changed:
+            self._current_index = index
+            self.current_message = message
+        return self.changed
+
+    def reset(self):
+        """Xoá cửa sổ (ví dụ khi mất dấu tay/mặt), giữ nguyên bảng nhãn đã gặp."""
+        self._window_labels = [-1] * self.window_size
+        self._window_confidences = [0.0] * self.window_size
+        self._position = 0
+        self._votes = [0] * len(self._labels)
+        self._confidence_sums = [0.0] * len(self._labels)
+        self.current_message = ""
+        self._current_index = -1
+        self.changed = False
 
-    def receive(self, message):
-        self.current_message = message
+    def get_confidence(self):
+        """Confidence trung bình của nhãn đang hiển thị trong cửa sổ."""
+        index = self._current_index
+        if index < 0 or self._votes[index] == 0:
+            return 0.0
+        return self._confidence_sums[index] / self._votes[index]
 
     def get_message(self):
         # Trả về nhãn gốc nếu chưa có mapping thân thiện để tránh lỗi
@@ -0,0 +1,292 @@
+"""
+Bộ suy luận RBF-SVM thuần NumPy, xuất ra từ `sklearn.svm.SVC` đã huấn luyện.
+
+Chỉ cần NumPy khi nạp và dự đoán (không cần sklearn). Kết quả giống SVC:
+cùng nhãn (bỏ phiếu one-vs-one như libsvm) và xác suất gần như trùng khớp
+(Platt scaling + pairwise coupling của libsvm), sai khác chỉ do tính bằng float32.
+"""
+import numpy as np
+
+# libsvm kẹp xác suất từng cặp trong [min_prob, 1 - min_prob]
+_MIN_PROB = 1e-7
+
+# Số dòng tối đa ghép xác suất bằng số thực Python thay vì NumPy
+_SCALAR_ROWS = 8
+
+
+def pair_indices(n_classes):
+    """Thứ tự các cặp (i, j), i < j giống libsvm: (0,1), (0,2), ..., (k-2,k-1)."""
+    first, second = np.triu_indices(n_classes, k=1)
+    return first.astype(np.intp), second.astype(np.intp)
+
+
+class RBFSVMEngine:
+    """
+    RBF-SVM one-vs-one dạng mảng float32.
+
+    Mỗi batch chỉ cần một phép GEMM float32 (N, d) x (d, n_SV) để tính kernel, dùng
+    chuẩn bình phương của support vector đã tính sẵn:
+        ||x - s||² = ||x||² + ||s||² - 2·x·s
+    Sau đó một phép nhân (N, n_SV) x (n_SV, n_pairs) cho ra decision value của toàn
+    bộ các cặp. Phép nhân này cộng dồn bằng float64: với C lớn, các hệ số ±C triệt
+    tiêu nhau mạnh và float32 làm lệch decision value tới vài phần trăm.
+
+    Giao diện giống estimator của sklearn (`classes_`, `predict`, `predict_proba`,
+    `decision_function`) nên có thể đưa thẳng vào `ASLClassificationModel`.
+    """
+
+    # Số dòng tối đa mỗi lần tính kernel, giới hạn bộ nhớ trung gian (N x n_SV)
+    chunk_size = 1024
+
+    def __init__(self, support_vectors, pair_coef, intercept, gamma, classes,
+                 prob_a=None, prob_b=None):
+        """
+        Args:
+            support_vectors: Mảng (n_SV, d).
+            pair_coef: Mảng (n_SV, n_pairs) - hệ số của từng support vector trong từng cặp
+                (bằng 0 nếu support vector không thuộc hai lớp của cặp đó).
+            intercept: Mảng (n_pairs,).
+            gamma: Tham số của kernel RBF.
+            classes: Nhãn của các lớp (giống `SVC.classes_`).
+            prob_a, prob_b: Tham số Platt của từng cặp (None nếu model không có xác suất).
+        """
+        self.support_vectors = np.ascontiguousarray(support_vectors, dtype=np.float32)
+        self.sv_norms = np.einsum("ij,ij->i", self.support_vectors, self.support_vectors,
+                                  dtype=np.float64).astype(np.float32)
+        self.pair_coef = np.ascontiguousarray(pair_coef, dtype=np.float32)
+        self.intercept = np.asarray(intercept, dtype=np.float32)
+        # Bản float64 chỉ dùng khi cộng dồn decision value (xem docstring lớp)
+        self._pair_coef64 = self.pair_coef.astype(np.float64)
+        self.gamma = float(gamma)
+        self.classes_ = np.asarray(classes)
+        self.prob_a = None if prob_a is None else np.asarray(prob_a, dtype=np.float64)
+        self.prob_b = None if prob_b is None else np.asarray(prob_b, dtype=np.float64)
+        self._pair_i, self._pair_j = pair_indices(len(self.classes_))
+
+    @classmethod
+    def from_svc(cls, svc):
+        """
+        Xuất một `SVC(kernel='rbf')` đã fit (one-vs-one của libsvm) sang engine.
+
+        Chỉ đọc các thuộc tính đã fit nên hàm này không import sklearn.
+        """
+        if getattr(svc, "kernel", None) != "rbf":
+            raise ValueError("Only SVC(kernel='rbf') can be exported")
+
+        intercept = np.asarray(svc.intercept_, dtype=np.float64)
+        dual_coef = np.asarray(svc.dual_coef_)
+        if len(svc.classes_) == 2:
+            # sklearn đảo dấu dual_coef_/intercept_ ở bài toán 2 lớp, đưa về quy ước libsvm
+            dual_coef, intercept = -dual_coef, -intercept
+
+        prob_a = prob_b = None
+        if getattr(svc, "probability", False):
+            prob_a, prob_b = np.asarray(svc.probA_), np.asarray(svc.probB_)
+
+        return cls.from_libsvm(svc.support_vectors_, svc.n_support_, dual_coef, intercept,
+                               svc._gamma, svc.classes_, prob_a=prob_a, prob_b=prob_b)
+
+    @classmethod
+    def from_libsvm(cls, support_vectors, n_support, dual_coef, intercept, gamma, classes,
+                    prob_a=None, prob_b=None):
+        """
+        Dựng engine từ các mảng theo bố cục libsvm (support vector xếp theo lớp,
+        `dual_coef` kích thước (k-1, n_SV), `intercept` = -rho của từng cặp).
+
+        Dùng được cả cho SVC huấn luyện với kernel='precomputed' (truyền
+        `support_vectors = X_train[svc.support_]` và gamma đã dùng để tính kernel).
+        """
+        classes = np.asarray(classes)
+        starts = np.concatenate(([0], np.cumsum(n_support)))
+        dual_coef = np.asarray(dual_coef)
+
+        # Với cặp (i, j): SV của lớp i dùng hàng j-1 của dual_coef, SV của lớp j dùng hàng i
+        pair_i, pair_j = pair_indices(len(classes))
+        pair_coef = np.zeros((dual_coef.shape[1], len(pair_i)), dtype=np.float64)
+        for p, (i, j) in enumerate(zip(pair_i, pair_j)):
+            rows_i = slice(starts[i], starts[i + 1])
+            rows_j = slice(starts[j], starts[j + 1])
+            pair_coef[rows_i, p] = dual_coef[j - 1, rows_i]
+            pair_coef[rows_j, p] = dual_coef[i, rows_j]
+
+        return cls(support_vectors, pair_coef, intercept, gamma, classes,
+                   prob_a=prob_a, prob_b=prob_b)
+
+    # --- Lưu / nạp ---
+    def to_arrays(self):
+        """Các mảng cần để dựng lại engine (không gồm giá trị tính lại được)."""
+        arrays = {
+            "support_vectors": self.support_vectors,
+            "pair_coef": self.pair_coef,
+            "intercept": self.intercept,
+            "gamma": np.asarray(self.gamma),
+            "classes": self.classes_,
+        }
+        if self.prob_a is not None:
+            arrays["prob_a"] = self.prob_a
+            arrays["prob_b"] = self.prob_b
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        prob_a = arrays["prob_a"] if "prob_a" in arrays else None
+        prob_b = arrays["prob_b"] if "prob_b" in arrays else None
+        return cls(arrays["support_vectors"], arrays["pair_coef"], arrays["intercept"],
+                   float(arrays["gamma"]), arrays["classes"], prob_a=prob_a, prob_b=prob_b)
+
+    def save(self, path):
+        np.savez(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls.from_arrays({name: arrays[name] for name in arrays.files})
+
+    # --- Suy luận ---
+    @property
+    def probability(self):
+        return self.prob_a is not None
+
+    @property
+    def n_support_vectors(self):
+        return self.support_vectors.shape[0]
+
+    def _kernel(self, X):
+        """Ma trận kernel RBF (N, n_SV) bằng float32."""
+        x_norms = np.einsum("ij,ij->i", X, X, dtype=np.float64).astype(np.float32)
+        K = X @ self.support_vectors.T
+        K *= -2.0
+        K += x_norms[:, None]
+        K += self.sv_norms[None, :]
+        np.maximum(K, 0.0, out=K)  # loại bỏ giá trị âm do sai số làm tròn
+        K *= np.float32(-self.gamma)
+        return np.exp(K, out=K)
+
+    def decision_function(self, X):
+        """Decision value của từng cặp one-vs-one, kích thước (N, n_pairs)."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        dec = np.empty((X.shape[0], len(self.intercept)), dtype=np.float64)
+        for start in range(0, X.shape[0], self.chunk_size):
+            stop = start + self.chunk_size
+            K = self._kernel(X[start:stop]).astype(np.float64)
+            np.matmul(K, self._pair_coef64, out=dec[start:stop])
+        dec += self.intercept
+        return dec
+
+    def _votes(self, dec):
+        n_classes = len(self.classes_)
+        positive = dec > 0
+        votes = np.zeros((dec.shape[0], n_classes), dtype=np.int32)
+        # dec > 0 → phiếu cho lớp i, ngược lại cho lớp j (giống libsvm)
+        for p, (i, j) in enumerate(zip(self._pair_i, self._pair_j)):
+            votes[:, i] += positive[:, p]
+            votes[:, j] += ~positive[:, p]
+        return votes
+
+    def predict(self, X):
+        """Nhãn dự đoán theo bỏ phiếu one-vs-one (giống `SVC.predict`)."""
+        return self.classes_[np.argmax(self._votes(self.decision_function(X)), axis=1)]
+
+    def predict_proba(self, X):
+        """Xác suất từng lớp (N, n_classes), giống `SVC.predict_proba`."""
+        if not self.probability:
+            raise AttributeError("predict_proba is not available when the SVC was trained "
+                                 "without probability=True")
+
+        dec = self.decision_function(X)
+        pairwise = 1.0 / (1.0 + np.exp(dec * self.prob_a + self.prob_b))
+        np.clip(pairwise, _MIN_PROB, 1.0 - _MIN_PROB, out=pairwise)
+
+        n_classes = len(self.classes_)
+        if n_classes == 2:
+            # libsvm dùng thẳng xác suất của cặp duy nhất khi chỉ có 2 lớp
+            return np.column_stack((pairwise[:, 0], 1.0 - pairwise[:, 0]))
+
+        r = np.zeros((dec.shape[0], n_classes, n_classes))
+        r[:, self._pair_i, self._pair_j] = pairwise
+        r[:, self._pair_j, self._pair_i] = 1.0 - pairwise
+        return multiclass_probability(r)
+
+
+def multiclass_probability(r):
+    """
+    Ghép xác suất từng cặp thành xác suất đa lớp (Wu, Lin & Weng 2004, phương pháp 2).
+
+    Bản vector hoá theo dòng của `multiclass_probability` trong libsvm: mỗi dòng
+    lặp Gauss-Seidel riêng và dừng theo đúng điều kiện hội tụ của libsvm.
+
+    Args:
+        r: Mảng (N, k, k), r[:, i, j] là xác suất lớp i thắng lớp j (đường chéo bằng 0).
+
+    Returns:
+        np.ndarray: Mảng (N, k).
+    """
+    n_rows, k = r.shape[0], r.shape[1]
+
+    # Thường chỉ cần 3-4 vòng lặp: với vài dòng, số thực Python nhanh hơn nhiều lời gọi
+    # NumPy trên mảng tí hon (trường hợp dự đoán từng khung hình)
+    if n_rows <= _SCALAR_ROWS:
+        return np.array([_multiclass_probability_row(row.tolist()) for row in r]).reshape(n_rows, k)
+
+    max_iter = max(100, k)
+    eps = 0.005 / k
+
+    # Q[t, j] = -r[j, t] * r[t, j], Q[t, t] = sum_{j != t} r[j, t]^2
+    rt = np.swapaxes(r, 1, 2)
+    Q = -rt * r
+    diag = np.arange(k)
+    Q[:, diag, diag] = (rt * rt).sum(axis=2)
+
+    p = np.full((n_rows, k), 1.0 / k)
+    active = np.arange(n_rows)
+    for _ in range(max_iter):
+        Qa, pa = Q[active], p[active]
+        Qp = np.einsum("ntj,nj->nt", Qa, pa)
+        pQp = np.einsum("nt,nt->n", pa, Qp)
+        converged = np.abs(Qp - pQp[:, None]).max(axis=1) < eps
+        if converged.all():
+            break
+
+        keep = ~converged
+        active, Qa, pa, Qp, pQp = active[keep], Qa[keep], pa[keep], Qp[keep], pQp[keep]
+        for t in range(k):
+            Qtt = Qa[:, t, t]
+            diff = (-Qp[:, t] + pQp) / Qtt
+            pa[:, t] += diff
+            scale = 1.0 + diff
+            pQp = (pQp + diff * (diff * Qtt + 2.0 * Qp[:, t])) / scale / scale
+            Qp = (Qp + diff[:, None] * Qa[:, t, :]) / scale[:, None]
+            pa /= scale[:, None]
+        p[active] = pa
+    return p
+
+
+def _multiclass_probability_row(r):
+    """Bản một dòng bằng list Python, sao chép nguyên văn vòng lặp của libsvm."""
+    k = len(r)
+    max_iter = max(100, k)
+    eps = 0.005 / k
+
+    Q = [[0.0] * k for _ in range(k)]
+    for t in range(k):
+        for j in range(k):
+            if j != t:
+                Q[t][t] += r[j][t] * r[j][t]
+                Q[t][j] = -r[j][t] * r[t][j]
+
+    p = [1.0 / k] * k
+    for _ in range(max_iter):
+        Qp = [sum(Q_t[j] * p[j] for j in range(k)) for Q_t in Q]
+        pQp = sum(p[t] * Qp[t] for t in range(k))
+        if max(abs(Qp[t] - pQp) for t in range(k)) < eps:
+            break
+
+        for t in range(k):
+            diff = (-Qp[t] + pQp) / Q[t][t]
+            p[t] += diff
+            scale = 1.0 + diff
+            pQp = (pQp + diff * (diff * Q[t][t] + 2.0 * Qp[t])) / scale / scale
+            Q_t = Q[t]
+            Qp = [(Qp[j] + diff * Q_t[j]) / scale for j in range(k)]
+            p = [value / scale for value in p]
+    return p
@@ -0,0 +1,109 @@
+"""
+Kết quả MediaPipe giả lập dùng cho benchmark (không cần webcam).
+
+Các lớp ở đây chỉ mô phỏng đúng những thuộc tính mà code của dự án đọc:
+`multi_hand_landmarks`, `multi_handedness`, `multi_face_landmarks`, `.landmark`,
+`.classification[0].label`.
+"""
+import numpy as np
+
+FACE_LANDMARKS = 478  # FaceMesh với refine_landmarks=True
+
+
+class FakeLandmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def HasField(self, name):
+        # mp_drawing kiểm tra visibility/presence trước khi vẽ
+        return False
+
+
+class FakeLandmarkList:
+    __slots__ = ("landmark",)
+
+    def __init__(self, points):
+        self.landmark = [FakeLandmark(float(x), float(y)) for x, y in points]
+
+
+class FakeCategory:
+    __slots__ = ("label", "score", "index")
+
+    def __init__(self, label, score=1.0):
+        self.label = label
+        self.score = score
+        self.index = 0 if label == "Left" else 1
+
+
+class FakeClassificationList:
+    __slots__ = ("classification",)
+
+    def __init__(self, label):
+        self.classification = [FakeCategory(label)]
+
+
+class FakeHandResults:
+    def __init__(self, hands=None):
+        """
+        Args:
+            hands: Danh sách cặp (label "Right"/"Left", mảng (21, 2)).
+        """
+        hands = hands or []
+        self.multi_hand_landmarks = [FakeLandmarkList(points) for _, points in hands] or None
+        self.multi_handedness = [FakeClassificationList(label) for label, _ in hands] or None
+
+
+class FakeFaceResults:
+    def __init__(self, faces=None):
+        """
+        Args:
+            faces: Danh sách mảng (n, 2) toạ độ landmark khuôn mặt.
+        """
+        faces = faces or []
+        self.multi_face_landmarks = [FakeLandmarkList(points) for points in faces] or None
+
+
+def face_points_around(center, count=FACE_LANDMARKS, spread=0.08, rng=None):
+    """Sinh `count` điểm khuôn mặt quanh `center`, dịch sao cho trung bình đúng bằng `center`."""
+    rng = rng if rng is not None else np.random.default_rng(0)
+    points = rng.normal(scale=spread, size=(count, 2))
+    return points - points.mean(axis=0) + np.asarray(center, dtype=np.float64)
+
+
+def results_from_feature(feature, rng=None):
+    """
+    Dựng lại (face_results, hand_results) giả từ một vector 86 chiều của data/*.npy.
+
+    Phần tay được dựng lại chính xác; phần mặt là một đám điểm có trung bình bằng
+    [mean_x, mean_y] (sai khác chỉ ở mức làm tròn số thực).
+    """
+    feature = np.asarray(feature, dtype=np.float64)
+    face, right, left = feature[:2], feature[2:44], feature[44:86]
+
+    faces = [face_points_around(face, rng=rng)] if face.any() else []
+    hands = []
+    if right.any():
+        hands.append(("Right", right.reshape(21, 2)))
+    if left.any():
+        hands.append(("Left", left.reshape(21, 2)))
+    return FakeFaceResults(faces), FakeHandResults(hands)
+
+
+def random_features(count, rng=None, hand_probability=0.7):
+    """
+    Sinh `count` vector 86 chiều ngẫu nhiên (không cần data/*.npy): tâm mặt ở giữa
+    khung hình, mỗi tay xuất hiện với xác suất `hand_probability`, 21 điểm quanh cổ tay.
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    features = np.zeros((count, 86))
+    features[:, :2] = rng.uniform(0.35, 0.65, size=(count, 2))
+    for start in (2, 44):
+        present = rng.random(count) < hand_probability
+        wrist = rng.uniform(0.2, 0.8, size=(count, 1, 2))
+        points = wrist + rng.normal(scale=0.05, size=(count, 21, 2))
+        features[present, start:start + 42] = points[present].reshape(-1, 42)
+    return features
@@ -0,0 +1,51 @@
+"""
+Ghi mốc thời gian khởi động (import, nạp model, làm nóng detector, khung hình đầu tiên...).
+"""
+import time
+from contextlib import contextmanager
+
+
+class StartupTimeline:
+    """
+    Dòng thời gian của một lần chạy, tính từ lúc tạo đối tượng.
+
+    Ví dụ:
+        timeline = StartupTimeline()
+        with timeline.stage("Nạp model"):
+            model = load_model()
+        timeline.mark("Dự đoán đầu tiên")
+        print(timeline.report())
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # (tên, bắt đầu, kết thúc) - tính bằng giây kể từ `start`
+        self.events = []
+
+    @contextmanager
+    def stage(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.events.append((name, begin - self.start, time.perf_counter() - self.start))
+
+    def mark(self, name):
+        """Mốc tức thời (không có thời lượng), ví dụ khung hình đầu tiên."""
+        now = time.perf_counter() - self.start
+        self.events.append((name, now, now))
+
+    def has(self, name):
+        return any(event[0] == name for event in self.events)
+
+    def rows(self):
+        """Danh sách {stage, at_ms, duration_ms} theo thứ tự thời gian."""
+        return [{"stage": name, "at_ms": end * 1e3, "duration_ms": (end - begin) * 1e3}
+                for name, begin, end in sorted(self.events, key=lambda event: event[2])]
+
+    def report(self):
+        lines = [f"{'Giai đoạn':<28} {'mốc (ms)':>10} {'thời lượng (ms)':>16}"]
+        for row in self.rows():
+            duration = f"{row['duration_ms']:.1f}" if row["duration_ms"] > 0 else "-"
+            lines.append(f"{row['stage']:<28} {row['at_ms']:>10.1f} {duration:>16}")
+        return "\n".join(lines)
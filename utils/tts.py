@@ -2,33 +2,101 @@ import threading
 import time
 import tempfile
 import os
+from collections import deque
+from concurrent.futures import Future
 
-try:
-    import pyttsx3
-except Exception:
-    pyttsx3 = None
+from utils.audio_cache import normalize_text
+from utils.benchmark import latency_stats
 
-try:
-    from gtts import gTTS
-    from playsound import playsound
-except Exception:
-    gTTS = None
-    playsound = None
+
+# Backend chỉ được import khi thật sự tạo TextToSpeech với engine tương ứng:
+# tắt TTS thì ứng dụng không phải trả chi phí import pyttsx3/gTTS/playsound lúc khởi động.
+def _import_pyttsx3():
+    try:
+        import pyttsx3
+    except Exception:
+        return None
+    return pyttsx3
+
+
+def _import_gtts():
+    try:
+        from gtts import gTTS
+        from playsound import playsound
+    except Exception:
+        return None, None
+    return gTTS, playsound
+
+
+def _import_playsound():
+    try:
+        from playsound import playsound
+    except Exception:
+        return None
+    return playsound
+
+
+class _Utterance:
+    __slots__ = ("text", "enqueued", "min_gap", "silence")
+
+    def __init__(self, text, enqueued, min_gap):
+        self.text = text
+        self.enqueued = enqueued
+        self.min_gap = min_gap  # khoảng lặng tối thiểu sau câu trước (giây)
+        self.silence = 0.0  # phần thời gian chờ là khoảng lặng bắt buộc (không tính vào tuổi), đặt khi tới lượt
 
 
 class TextToSpeech:
     """TTS wrapper with two backends: 'pyttsx3' (offline) and 'gtts' (online, better Vietnamese).
     Includes debounce to avoid speaking every frame.
+
+    One long-lived worker thread owns the engine and speaks from a small queue. A new request
+    replaces queued requests with the same text, and only the newest `queue_size` requests are
+    kept, so a burst of labels ends with the latest one. Requests that waited more than `max_age`
+    seconds when their turn comes are cancelled; the `min_gap` silence after the previous utterance
+    does not count towards that age, time spent waiting for it to finish playing does.
+
+    With an `AudioCache`, each phrase is synthesized once and replayed from disk afterwards
+    (gTTS then needs no network for phrases already in the cache).
     """
 
     def __init__(self, engine: str = 'pyttsx3', lang: str = 'vi', rate: int | None = None,
-                 volume: float | None = None, voice: str | None = None):
+                 volume: float | None = None, voice: str | None = None, cache=None,
+                 queue_size: int = 1, max_age: float = 3.0):
         self.engine_name = engine.lower()
+        if self.engine_name not in ('pyttsx3', 'gtts'):
+            raise ValueError("engine must be 'pyttsx3' or 'gtts'")
         self.lang = lang
+        self.cache = cache
+        self.queue_size = queue_size
+        self.max_age = max_age
 
-        # Backend initializations
         self._engine = None
+        self._gTTS = self._playsound = None
+        self.voice_key = None
+
+        self._cond = threading.Condition()
+        self._queue = deque()  # _Utterance chờ đọc, cũ nhất trước
+        self._jobs = deque()   # (hàm, Future) phải chạy trên luồng worker, vd. prerender
+        self._closed = False
+        self._current = None
+        self._last_text = None
+        self._last_time = 0.0
+        self._queue_delays = deque(maxlen=100)
+        self._durations = deque(maxlen=100)
+        self.counts = {"spoken": 0, "coalesced": 0, "cancelled": 0, "failed": 0}
+
+        # pyttsx3 phải được tạo và dùng trên cùng một luồng → khởi tạo ngay trong worker
+        ready = Future()
+        self._thread = threading.Thread(target=self._run, args=(rate, volume, voice, ready),
+                                        name=f"tts-{self.engine_name}", daemon=True)
+        self._thread.start()
+        ready.result()  # lỗi khởi tạo backend (thiếu thư viện...) được ném ra ở đây
+
+    # --- Backend initialization (worker thread) ---
+    def _init_backend(self, rate, volume, voice):
         if self.engine_name == 'pyttsx3':
+            pyttsx3 = _import_pyttsx3()
             if pyttsx3 is None:
                 raise RuntimeError("pyttsx3 is not installed. Please install it or choose 'gtts'.")
             self._engine = pyttsx3.init()
@@ -41,72 +109,209 @@ class TextToSpeech:
                     if voice.lower() in (v.id or '').lower():
                         self._engine.setProperty('voice', v.id)
                         break
-        elif self.engine_name == 'gtts':
-            if gTTS is None or playsound is None:
+            # Phát lại file trong cache cần playsound; thiếu thì đọc trực tiếp như trước
+            self._playsound = _import_playsound() if self.cache is not None else None
+            self.voice_key = f"{self._engine.getProperty('voice')}|rate={self._engine.getProperty('rate')}"
+        else:
+            self._gTTS, self._playsound = _import_gtts()
+            if self._gTTS is None or self._playsound is None:
                 raise RuntimeError("gTTS/playsound not installed. Please install requirements or choose 'pyttsx3'.")
+            self.voice_key = "default"
+
+    # --- Audio cache ---
+    def _render(self, text: str, path: str):
+        """Synthesize `text` into an audio file with the current backend."""
+        if self.engine_name == 'pyttsx3':
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
         else:
-            raise ValueError("engine must be 'pyttsx3' or 'gtts'")
+            self._gTTS(text=text, lang=self.lang).save(path)
 
-        self._lock = threading.Lock()
-        self._busy = False
-        self._last_text = None
-        self._last_time = 0.0
+    def _prerender(self, text: str, force: bool):
+        if self.cache is None:
+            raise RuntimeError("TextToSpeech was created without an audio cache")
+        if not force:
+            path = self.cache.get(self.engine_name, self.voice_key, self.lang, text)
+            if path is not None:
+                return path, False
+        suffix = '.wav' if self.engine_name == 'pyttsx3' else '.mp3'
+        path = self.cache.put(self.engine_name, self.voice_key, self.lang, text, suffix,
+                              lambda tmp_path: self._render(normalize_text(text), tmp_path))
+        return path, True
+
+    def prerender(self, text: str, force: bool = False):
+        """Put `text` into the cache. Returns (path, rendered) - rendered is False on a cache hit."""
+        if threading.current_thread() is self._thread:
+            return self._prerender(text, force)
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("TextToSpeech is closed")
+            self._jobs.append((lambda: self._prerender(text, force), future))
+            self._cond.notify()
+        return future.result()
+
+    def _play_cached(self, text: str) -> bool:
+        """Play `text` from the cache (rendering it on a miss). False if no cache/player is available."""
+        if self.cache is None or self._playsound is None:
+            return False
+        path, _ = self._prerender(text, force=False)
+        self._playsound(path)
+        return True
 
-    # --- Backend implementations ---
+    # --- Backend implementations (worker thread) ---
     def _speak_blocking_pyttsx3(self, text: str):
-        try:
-            self._engine.say(text)
-            self._engine.runAndWait()
-        finally:
-            with self._lock:
-                self._busy = False
-                self._last_text = text
-                self._last_time = time.time()
+        self._engine.say(text)
+        self._engine.runAndWait()
 
     def _speak_blocking_gtts(self, text: str):
         tmp_path = None
         try:
-            tts = gTTS(text=text, lang=self.lang)
+            tts = self._gTTS(text=text, lang=self.lang)
             fd, tmp_path = tempfile.mkstemp(suffix='.mp3', prefix='tts_')
             os.close(fd)
             tts.save(tmp_path)
-            playsound(tmp_path)
-        except Exception:
-            pass
+            self._playsound(tmp_path)
         finally:
             if tmp_path and os.path.exists(tmp_path):
                 try:
                     os.remove(tmp_path)
                 except Exception:
                     pass
-            with self._lock:
-                self._busy = False
-                self._last_text = text
-                self._last_time = time.time()
 
-    def speak_if_allowed(self, text: str, min_interval: float = 2.0):
-        """Speak only if enough time has passed since the last utterance and text changed.
-        Run speech in a background thread to avoid blocking the UI.
-        """
-        now = time.time()
-        with self._lock:
-            if self._busy:
-                return
-            if self._last_text == text and (now - self._last_time) < (min_interval * 3):
-                return
-            if (now - self._last_time) < min_interval:
+    def _speak_blocking(self, text: str):
+        try:
+            if self._play_cached(text):
                 return
-            self._busy = True
-
+        except Exception:
+            pass  # cache hỏng / không phát được file → đọc trực tiếp
         if self.engine_name == 'pyttsx3':
-            t = threading.Thread(target=self._speak_blocking_pyttsx3, args=(text,), daemon=True)
+            self._speak_blocking_pyttsx3(text)
         else:
-            t = threading.Thread(target=self._speak_blocking_gtts, args=(text,), daemon=True)
-        t.start()
+            self._speak_blocking_gtts(text)
 
-    def stop(self):
+    # --- Worker ---
+    def _next(self):
+        """Chờ việc tiếp theo: ('job', (hàm, Future)), ('say', _Utterance) hoặc None khi đóng."""
+        with self._cond:
+            while not self._closed:
+                if self._jobs:
+                    return 'job', self._jobs.popleft()
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                item = self._queue[0]
+                wait = self._last_time + item.min_gap - time.monotonic()
+                if wait > 0:
+                    # Có thể bị câu mới thay thế trong lúc chờ → kiểm tra lại sau khi thức dậy
+                    self._cond.wait(wait)
+                    continue
+                self._queue.popleft()
+                # Khoảng lặng bắt buộc sau câu vừa đọc (tính từ khi câu đó kết thúc hoặc từ lúc xếp
+                # hàng nếu muộn hơn) không tính vào tuổi; thời gian chờ câu trước đọc xong thì có
+                item.silence = max(0.0, self._last_time + item.min_gap - max(item.enqueued, self._last_time))
+                self._current = item.text
+                return 'say', item
+            return None
+
+    def _run(self, rate, volume, voice, ready):
+        try:
+            self._init_backend(rate, volume, voice)
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+
+        while True:
+            task = self._next()
+            if task is None:
+                break
+            kind, payload = task
+            if kind == 'job':
+                fn, future = payload
+                try:
+                    future.set_result(fn())
+                except Exception as e:
+                    future.set_exception(e)
+                continue
+
+            started = time.monotonic()
+            if started - payload.enqueued - payload.silence > self.max_age:
+                with self._cond:
+                    self._current = None
+                    self.counts["cancelled"] += 1
+                continue
+            ok = True
+            try:
+                self._speak_blocking(payload.text)
+            except Exception:
+                ok = False
+            ended = time.monotonic()
+            with self._cond:
+                self._current = None
+                self._last_text = payload.text
+                self._last_time = ended
+                self._queue_delays.append(started - payload.enqueued)
+                self._durations.append(ended - started)
+                self.counts["spoken" if ok else "failed"] += 1
+
+    # --- Public API ---
+    def speak(self, text: str, min_gap: float = 0.0) -> bool:
+        """Queue `text`, replacing queued copies of it (and the oldest requests beyond `queue_size`).
+        Returns False if the same text is being spoken right now.
+        """
+        with self._cond:
+            if self._closed or text == self._current:
+                return False
+            for old in [item for item in self._queue if item.text == text]:
+                self._queue.remove(old)
+                self.counts["coalesced"] += 1
+            self._queue.append(_Utterance(text, time.monotonic(), min_gap))
+            while len(self._queue) > self.queue_size:
+                self._queue.popleft()
+                self.counts["coalesced"] += 1
+            self._cond.notify()
+        return True
+
+    def speak_if_allowed(self, text: str, min_interval: float = 2.0):
+        """Speak only if enough time has passed since the last utterance and text changed.
+        Speech runs on the worker thread; the UI never blocks.
+        """
+        with self._cond:
+            if self._last_text == text and (time.monotonic() - self._last_time) < (min_interval * 3):
+                return False
+        return self.speak(text, min_gap=min_interval)
+
+    def cancel(self):
+        """Drop every queued utterance and try to stop the one in progress."""
+        with self._cond:
+            self.counts["cancelled"] += len(self._queue)
+            self._queue.clear()
         try:
             if self.engine_name == 'pyttsx3' and self._engine is not None:
                 self._engine.stop()
         except Exception:
             pass
+
+    def stop(self):
+        self.cancel()
+
+    def close(self, timeout: float = 2.0):
+        """Cancel pending speech and stop the worker thread."""
+        self.cancel()
+        with self._cond:
+            self._closed = True
+            for _, future in self._jobs:
+                future.set_exception(RuntimeError("TextToSpeech is closed"))
+            self._jobs.clear()
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """Queue depth, counters and queue-delay / speak-duration percentiles (ms)."""
+        with self._cond:
+            delays, durations = list(self._queue_delays), list(self._durations)
+            result = {"queued": len(self._queue), **self.counts}
+        result["queue_delay"] = latency_stats(delays) if delays else None
+        result["duration"] = latency_stats(durations) if durations else None
+        return result
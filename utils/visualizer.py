@@ -1,54 +1,118 @@
-import mediapipe as mp
 import cv2
+import numpy as np
+
+from config import VISUALIZER_DETAIL_LEVELS as DETAIL_LEVELS
+from utils.feature_extraction import landmarks_to_array
+
+FACE_COLOR = (0, 255, 0)
+HAND_BONE_COLOR = (0, 255, 0)   # Xương màu xanh
+HAND_JOINT_COLOR = (0, 0, 255)  # Khớp màu đỏ
+WHITE_COLOR = (224, 224, 224)  # "trắng" của mp_drawing
+
+
+def connection_array(connections) -> np.ndarray:
+    """Tập cặp (đầu, cuối) của MediaPipe → mảng (E, 2) chỉ số, thứ tự cố định."""
+    return np.array(sorted(connections), dtype=np.intp).reshape(-1, 2)
+
+
+def to_pixels(landmarks, width, height):
+    """
+    Đổi toàn bộ landmark sang toạ độ pixel trong một bước (giống
+    `_normalized_to_pixel_coordinates` của MediaPipe).
+
+    Returns:
+        tuple: (pixels (n, 2) int32, valid (n,) bool) - điểm nằm ngoài [0, 1] bị đánh dấu không hợp lệ.
+    """
+    points = landmarks_to_array(landmarks.landmark)
+    valid = ((points >= 0.0) & (points <= 1.0)).all(axis=1)
+    pixels = np.minimum(np.floor(points * (width, height)), (width - 1, height - 1)).astype(np.int32)
+    return pixels, valid
+
 
 class Visualizer:
-    def __init__(self):
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.mp_hands = mp.solutions.hands
+    """
+    Vẽ landmarks bằng các mảng chỉ số cạnh tạo sẵn và một lời gọi `cv2.polylines` cho mỗi
+    nhóm cạnh, thay vì `mp_drawing.draw_landmarks` (một `cv2.line` Python cho từng cạnh
+    trong ~2.500 cạnh của lưới khuôn mặt).
+
+    Ví dụ:
+        visualizer = Visualizer(detail="contours")
+        visualizer.draw_landmarks(image, face_results, hand_results)
+    """
+
+    def __init__(self, detail="full"):
+        # Import khi tạo đối tượng (không phải khi import module) để khởi động nhanh hơn
+        import mediapipe as mp
+
+        face_mesh = mp.solutions.face_mesh
+        self._face_edges = {
+            "contours": connection_array(face_mesh.FACEMESH_CONTOURS),
+            # Viền trùng màu và độ dày với lưới nên gộp lại, mỗi cạnh chỉ vẽ một lần
+            "full": connection_array(face_mesh.FACEMESH_TESSELATION | face_mesh.FACEMESH_CONTOURS),
+        }
+        self._hand_edges = connection_array(mp.solutions.hands.HAND_CONNECTIONS)
+        self.detail = detail
+
+    @property
+    def detail(self):
+        return self._detail
+
+    @detail.setter
+    def detail(self, value):
+        if value not in DETAIL_LEVELS:
+            raise ValueError(f"Unknown detail level '{value}'. Choose one of {DETAIL_LEVELS}.")
+        self._detail = value
+
+    @staticmethod
+    def _draw_edges(image, pixels, valid, edges, color, thickness):
+        # Chỉ vẽ cạnh có cả hai đầu nằm trong ảnh (như MediaPipe)
+        edges = edges[valid[edges].all(axis=1)]
+        if len(edges):
+            cv2.polylines(image, pixels[edges], False, color, thickness)
+
+    def _draw_face(self, image, face_results, width, height):
+        # 1a. Backend chỉ có tâm khuôn mặt (Face Detection) → vẽ khung + tâm
+        if getattr(face_results, "box", None) is not None:
+            xmin, ymin, box_w, box_h = face_results.box
+            cv2.rectangle(image, (int(xmin * width), int(ymin * height)),
+                          (int((xmin + box_w) * width), int((ymin + box_h) * height)), FACE_COLOR, 1)
+            centre = face_results.multi_face_landmarks[0].landmark[0]
+            cv2.circle(image, (int(centre.x * width), int(centre.y * height)), 3, FACE_COLOR, -1)
+
+        # 1b. Vẽ lưới khuôn mặt (Face Mesh) hoặc chỉ viền mắt, mũi, miệng
+        elif face_results.multi_face_landmarks:
+            edges = self._face_edges[self._detail]
+            for face_landmarks in face_results.multi_face_landmarks:
+                pixels, valid = to_pixels(face_landmarks, width, height)
+                self._draw_edges(image, pixels, valid, edges, FACE_COLOR, 1)
 
     def draw_landmarks(self, image, face_results, hand_results):
         """
         Vẽ các điểm landmarks (xương khớp) lên hình ảnh camera.
-        
+
         Args:
             image: Ảnh gốc từ camera (đã convert sang RGB hoặc BGR).
             face_results: Kết quả từ face_mesh.process().
             hand_results: Kết quả từ hands.process().
-            
+
         Returns:
             image: Ảnh đã được vẽ các đường landmarks.
         """
-        
-        # 1. Vẽ lưới khuôn mặt (Face Mesh)
-        if face_results.multi_face_landmarks:
-            for face_landmarks in face_results.multi_face_landmarks:
-                self.mp_drawing.draw_landmarks(
-                    image=image,
-                    landmark_list=face_landmarks,
-                    connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1)
-                )
-                # Vẽ viền khuôn mặt & mắt mũi miệng cho rõ hơn (Optional)
-                self.mp_drawing.draw_landmarks(
-                    image=image,
-                    landmark_list=face_landmarks,
-                    connections=self.mp_face_mesh.FACEMESH_CONTOURS,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1)
-                )
+        if self._detail == "none":
+            return image
+        height, width = image.shape[:2]
+
+        if self._detail != "hands":
+            self._draw_face(image, face_results, width, height)
 
         # 2. Vẽ xương bàn tay (Hand Landmarks)
         if hand_results.multi_hand_landmarks:
             for hand_landmarks in hand_results.multi_hand_landmarks:
-                self.mp_drawing.draw_landmarks(
-                    image=image,
-                    landmark_list=hand_landmarks,
-                    connections=self.mp_hands.HAND_CONNECTIONS,
-                    landmark_drawing_spec=self.mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2), # Khớp màu đỏ
-                    connection_drawing_spec=self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2)  # Xương màu xanh
-                )
-        
+                pixels, valid = to_pixels(hand_landmarks, width, height)
+                self._draw_edges(image, pixels, valid, self._hand_edges, HAND_BONE_COLOR, 2)
+                # Khớp: viền trắng rồi tô màu, vẽ sau xương (giống DrawingSpec của MediaPipe)
+                for point in pixels[valid].tolist():
+                    cv2.circle(image, point, 3, WHITE_COLOR, 2)
+                    cv2.circle(image, point, 2, HAND_JOINT_COLOR, 2)
+
         return image